@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Mémoire du PCM décodé des sons du catalogue, stockage stéréo ou compact.
+
+Pour chaque fichier de SOUNDS_DIR, décodé à 44,1 kHz par le cache de PCM :
+
+- taille en stéréo float32 et en stéréo int16 (format des Sound pygame) ;
+- taille compacte : int16, sur un seul canal quand le fichier est mono ou
+  que ses canaux sont identiques (le moteur NumPy l'étend au mixage) ;
+- coût de mixage d'une seconde d'audio, PCM stéréo ou compact.
+
+Le partage est mesuré ensuite : chaque fichier est chargé sous plusieurs
+identifiants de son (catalogue, bibliothèque, preset...) par un mixeur
+NumPy, qui ne garde qu'un tampon par fichier.
+
+Utilisation (depuis la racine du dépôt) :
+    python -m benchmarks.bench_memory
+    python -m benchmarks.bench_memory --copies 3 --json resultats.json
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from src.audio import decoder
+from src.audio.cache import PcmCache
+from src.audio.engine import EngineMixer, MixEngine
+from src.audio.sources import BufferSource
+from src.core.sounds import SOUNDS_DIR
+
+SAMPLERATE = 44100
+BLOCK = 512
+
+# Durée d'audio mixé par mesure du coût (secondes)
+SECONDS = 5
+
+# Identifiants de son chargés pour chaque fichier dans la mesure du partage
+COPIES = 2
+
+# Extensions des fichiers mesurés
+AUDIO_EXTENSIONS = ('.ogg', '.wav', '.flac', '.mp3')
+
+
+class OfflineOutput:
+    """Sortie sans périphérique : le mixeur n'ouvre aucun flux."""
+
+    def __init__(self):
+        self.underruns = 0
+        self.active = False
+
+    def start(self):
+        self.active = True
+
+    def close(self):
+        self.active = False
+
+
+def sound_files() -> List[str]:
+    """Fichiers audio de SOUNDS_DIR, par ordre alphabétique."""
+    return [str(path) for path in sorted(SOUNDS_DIR.iterdir())
+            if path.suffix.lower() in AUDIO_EXTENSIONS]
+
+
+def mix_cost(pcm) -> float:
+    """Temps CPU (secondes) pour mixer une seconde d'audio depuis un PCM."""
+    engine = MixEngine(SAMPLERATE, 2)
+    engine.add_layer('sound', BufferSource(pcm), 0.5)
+    blocks = SECONDS * SAMPLERATE // BLOCK
+    start = time.process_time()
+    for _ in range(blocks):
+        engine.render(BLOCK)
+    return (time.process_time() - start) / SECONDS
+
+
+def measure_files(cache: PcmCache) -> List[Dict[str, float]]:
+    """Tailles et coût de mixage de chaque fichier, stéréo et compact."""
+    results = []
+    for file_path in sound_files():
+        stereo = cache.load(file_path, SAMPLERATE, 2)
+        compact = cache.load(file_path, SAMPLERATE, 2, mono=True)
+        results.append({
+            'file': Path(file_path).name,
+            'mono': compact.shape[1] == 1,
+            'seconds': len(stereo) / SAMPLERATE,
+            'float32_bytes': stereo.size * 4,
+            'int16_bytes': stereo.nbytes,
+            'compact_bytes': compact.nbytes,
+            'stereo_cpu_ms': mix_cost(stereo) * 1000,
+            'compact_cpu_ms': mix_cost(compact) * 1000,
+        })
+    return results
+
+
+def measure_sharing(cache: PcmCache, copies: int) -> Dict[str, int]:
+    """
+    PCM gardé par un mixeur NumPy chargeant chaque fichier `copies` fois.
+
+    Returns:
+        'sounds', 'buffers', 'separate_bytes' (un tampon par son) et
+        'shared_bytes' (un tampon par fichier)
+    """
+    mixer = EngineMixer(cache=cache, idle_timeout=0, normalize_loudness=False)
+    mixer.output = OfflineOutput()
+    for file_path in sound_files():
+        for copy in range(copies):
+            mixer.load_async(f"{Path(file_path).stem}_{copy}", file_path, 'preload').result()
+    buffers = {id(pcm): pcm for pcm in mixer.sounds.values()}
+    result = {
+        'sounds': len(mixer.sounds),
+        'buffers': len(buffers),
+        'separate_bytes': sum(pcm.nbytes for pcm in mixer.sounds.values()),
+        'shared_bytes': sum(pcm.nbytes for pcm in buffers.values()),
+        'reported_bytes': sum(mixer.get_memory_report().values()),
+    }
+    mixer.cleanup()
+    return result
+
+
+def run(copies: int) -> dict:
+    """Exécute toutes les mesures et retourne le rapport."""
+    with tempfile.TemporaryDirectory(prefix="blanket-bench-") as cache_dir:
+        cache = PcmCache(Path(cache_dir))
+        files = measure_files(cache)
+        sharing = measure_sharing(cache, copies)
+    totals = {key: sum(row[key] for row in files)
+              for key in ('float32_bytes', 'int16_bytes', 'compact_bytes')}
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'samplerate': SAMPLERATE,
+        'copies': copies,
+        'files': files,
+        'totals': totals,
+        'sharing': sharing,
+    }
+
+
+def print_report(report: dict):
+    """Affiche le rapport sous forme de tableau."""
+    mb = 1024 * 1024
+    print(f"{'fichier':>18} {'mono':>5} {'durée (s)':>10} {'float32 (Mo)':>13} "
+          f"{'int16 (Mo)':>11} {'compact (Mo)':>13} {'CPU stéréo':>11} {'CPU compact':>12}")
+    for row in report['files']:
+        print(f"{row['file']:>18} {'oui' if row['mono'] else 'non':>5} {row['seconds']:>10.1f} "
+              f"{row['float32_bytes'] / mb:>13.1f} {row['int16_bytes'] / mb:>11.1f} "
+              f"{row['compact_bytes'] / mb:>13.1f} {row['stereo_cpu_ms']:>11.2f} "
+              f"{row['compact_cpu_ms']:>12.2f}")
+    totals = report['totals']
+    print(f"{'total':>18} {'':>5} {'':>10} {totals['float32_bytes'] / mb:>13.1f} "
+          f"{totals['int16_bytes'] / mb:>11.1f} {totals['compact_bytes'] / mb:>13.1f}")
+    saved = 1 - totals['compact_bytes'] / totals['int16_bytes']
+    print(f"Stockage compact : {saved:.0%} de moins que le stéréo int16 "
+          f"(CPU en ms par seconde d'audio mixé)")
+
+    sharing = report['sharing']
+    print()
+    print(f"{sharing['sounds']} sons ({report['copies']} par fichier) : "
+          f"{sharing['separate_bytes'] / mb:.1f} Mo sans partage, "
+          f"{sharing['shared_bytes'] / mb:.1f} Mo en {sharing['buffers']} tampons partagés "
+          f"(rapport mémoire du mixeur : {sharing['reported_bytes'] / mb:.1f} Mo)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.bench_memory",
+        description="Mémoire du PCM décodé des sons du catalogue"
+    )
+    parser.add_argument('--copies', type=int, default=COPIES,
+                        help="Identifiants de son chargés pour chaque fichier")
+    parser.add_argument('--json', metavar='FICHIER',
+                        help="Enregistre le rapport en JSON ('-' : sortie standard)")
+    args = parser.parse_args(argv)
+
+    if not decoder.is_available():
+        raise SystemExit("Erreur: soundfile est nécessaire au benchmark")
+    report = run(max(1, args.copies))
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=1)
+        print()
+        return
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+Coût du mixeur selon le nombre de couches, pour chaque moteur.
+
+Sans carte son : pygame utilise le pilote SDL « dummy », qui mixe en temps
+réel sans rien jouer ; le moteur NumPy reçoit une sortie factice et ses blocs
+sont rendus par le benchmark, aussi vite que possible. Mesures :
+
+- latence de chargement de chaque fichier de SOUNDS_DIR : décodage par
+  pygame, cache de PCM à froid puis à chaud, ouverture d'une lecture en flux ;
+- pour 1, 8, 32 et 128 couches et chaque moteur (PCM préchargé depuis le
+  cache, ou lecture en flux) : temps CPU par seconde d'audio mixé, durée de
+  play_sound et de stop_all, débit de set_volume et de set_master_volume,
+  mémoire résidente maximale.
+
+Chaque mesure tourne dans son propre processus : la mémoire résidente
+maximale est celle de la mesure seule. Le mixeur pygame de l'application est
+limité à 32 canaux ; le benchmark en ouvre autant que de couches.
+
+Utilisation (depuis la racine du dépôt) :
+    python -m benchmarks.bench_mixer
+    python -m benchmarks.bench_mixer --json resultats.json
+    python -m benchmarks.bench_mixer --layers 1 8 --seconds 2 --backends numpy_preload
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Avant tout import de pygame : aucun périphérique audio n'est nécessaire
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from src.audio import decoder
+from src.audio.cache import PcmCache
+from src.audio.mixer import AudioMixer
+from src.audio.streaming import StreamReader
+from src.core.sounds import SOUNDS_DIR
+
+try:
+    import resource
+except ImportError:
+    # Windows : pas de getrusage, la mémoire maximale n'est pas mesurée
+    resource = None
+
+SAMPLERATE = 44100
+BLOCK = 512
+
+# Nombres de couches mesurés
+LAYER_COUNTS = (1, 8, 32, 128)
+
+# Moteurs comparés : (moteur, mode de lecture des fichiers)
+BACKENDS = {
+    'pygame_preload': ('pygame', 'preload'),
+    'pygame_stream': ('pygame', 'stream'),
+    'numpy_preload': ('numpy', 'preload'),
+    'numpy_stream': ('numpy', 'stream'),
+}
+
+# Durée d'audio mixé par mesure (secondes)
+SECONDS = 5.0
+
+# Appels de changement de volume chronométrés
+VOLUME_CALLS = 2000
+
+# Extensions des fichiers mesurés
+AUDIO_EXTENSIONS = ('.ogg', '.wav', '.flac', '.mp3')
+
+
+class OfflineOutput:
+    """Sortie sans périphérique : les blocs du moteur sont rendus par le benchmark."""
+
+    def __init__(self):
+        self.underruns = 0
+        self.active = False
+
+    def start(self):
+        self.active = True
+
+    def close(self):
+        self.active = False
+
+
+def sound_files() -> List[str]:
+    """Fichiers audio de SOUNDS_DIR, par ordre alphabétique."""
+    return [str(path) for path in sorted(SOUNDS_DIR.iterdir())
+            if path.suffix.lower() in AUDIO_EXTENSIONS]
+
+
+def peak_rss() -> Optional[int]:
+    """Mémoire résidente maximale du processus (octets), None si inconnue."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kio sous Linux, octets sous macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def create_mixer(engine: str, cache_dir: str):
+    """Mixeur du moteur demandé, sans délai d'inactivité ni normalisation."""
+    options = dict(cache=PcmCache(Path(cache_dir)), idle_timeout=0, normalize_loudness=False)
+    if engine == 'pygame':
+        return AudioMixer(**options)
+    from src.audio.engine import EngineMixer
+    mixer = EngineMixer(**options)
+    mixer.output = OfflineOutput()
+    return mixer
+
+
+def measure_loading(cache_dir: str) -> List[Dict[str, float]]:
+    """
+    Latence de chargement de chaque fichier (exécuté dans un processus dédié).
+
+    Le cache de PCM est rempli au passage : les mesures de mixage le
+    trouvent ensuite à chaud.
+    """
+    import pygame
+
+    pygame.mixer.init(SAMPLERATE, -16, 2, BLOCK)
+    cache = PcmCache(Path(cache_dir))
+    results = []
+    for file_path in sound_files():
+        result = {'file': Path(file_path).name, 'bytes': os.path.getsize(file_path)}
+
+        start = time.perf_counter()
+        pygame.mixer.Sound(file_path)
+        result['pygame_decode_ms'] = (time.perf_counter() - start) * 1000
+
+        for key in ('cache_cold_ms', 'cache_warm_ms'):
+            start = time.perf_counter()
+            cache.load(file_path, SAMPLERATE, 2)
+            result[key] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        reader = StreamReader(file_path, channels=2)
+        result['stream_open_ms'] = (time.perf_counter() - start) * 1000
+        reader.close()
+        results.append(result)
+    pygame.mixer.quit()
+    return results
+
+
+def measure_mixing(backend: str, layers: int, seconds: float, cache_dir: str) -> dict:
+    """
+    Coût d'un mix de `layers` couches (exécuté dans un processus dédié).
+
+    Returns:
+        Les mesures, en millisecondes, appels par seconde et octets
+    """
+    engine, mode = BACKENDS[backend]
+    files = sound_files()
+    sounds = {f"layer_{i}": files[i % len(files)] for i in range(layers)}
+    mixer = create_mixer(engine, cache_dir)
+
+    # Le premier chargement ouvre le périphérique ; les suivants sont à chaud
+    for sound_id, file_path in sounds.items():
+        mixer.load_async(sound_id, file_path, mode).result()
+    if engine == 'pygame':
+        import pygame
+        pygame.mixer.set_num_channels(max(32, layers))
+
+    start = time.perf_counter()
+    for sound_id, file_path in sounds.items():
+        if not mixer.play_sound(sound_id, file_path, 0.5, mode):
+            raise RuntimeError(f"Lecture impossible: {file_path}")
+    play_time = time.perf_counter() - start
+
+    cpu = mix_cpu(mixer, engine, seconds)
+
+    sound_ids = list(sounds)
+    start = time.perf_counter()
+    for i in range(VOLUME_CALLS):
+        mixer.set_volume(sound_ids[i % layers], (i % 100) / 100.0)
+    volume_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(VOLUME_CALLS):
+        mixer.set_master_volume((i % 100) / 100.0)
+    master_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mixer.stop_all()
+    stop_time = time.perf_counter() - start
+
+    result = {
+        'backend': backend,
+        'layers': layers,
+        'play_sound_ms': play_time / layers * 1000,
+        'cpu_per_second_ms': cpu * 1000,
+        'cpu_percent': cpu * 100,
+        'set_volume_per_second': VOLUME_CALLS / volume_time,
+        'set_master_volume_per_second': VOLUME_CALLS / master_time,
+        'stop_all_ms': stop_time * 1000,
+        'peak_rss': peak_rss(),
+    }
+    mixer.cleanup()
+    return result
+
+
+def mix_cpu(mixer, engine: str, seconds: float) -> float:
+    """Temps CPU du processus (secondes) par seconde d'audio mixé."""
+    if engine == 'pygame':
+        # SDL mixe dans son thread, au rythme du temps réel
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        time.sleep(seconds)
+        return (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+    out = np.zeros((BLOCK, mixer.num_channels), dtype=np.float32)
+    blocks = int(seconds * mixer.frequency / BLOCK)
+    cpu = time.process_time()
+    for _ in range(blocks):
+        mixer.engine.render_into(out)
+    return (time.process_time() - cpu) / (blocks * BLOCK / mixer.frequency)
+
+
+def isolated(function, *args):
+    """Exécute une mesure dans un nouveau processus ; {'error': ...} si elle échoue."""
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(1, mp_context=context) as pool:
+        try:
+            return pool.submit(function, *args).result()
+        except Exception as e:
+            return {'error': str(e)}
+
+
+def run(layer_counts, backends, seconds: float) -> dict:
+    """Exécute toutes les mesures et retourne le rapport."""
+    with tempfile.TemporaryDirectory(prefix="blanket-bench-") as cache_dir:
+        loading = isolated(measure_loading, cache_dir)
+        mixing = []
+        for backend in backends:
+            for layers in layer_counts:
+                result = isolated(measure_mixing, backend, layers, seconds, cache_dir)
+                result.setdefault('backend', backend)
+                result.setdefault('layers', layers)
+                mixing.append(result)
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'platform': platform.platform(),
+        'python': platform.python_version(),
+        'samplerate': SAMPLERATE,
+        'block': BLOCK,
+        'seconds': seconds,
+        'loading': loading,
+        'mixing': mixing,
+    }
+
+
+def print_report(report: dict):
+    """Affiche le rapport sous forme de tableaux."""
+    loading = report['loading']
+    print(f"{'fichier':>18} {'Ko':>7} {'pygame (ms)':>12} {'cache froid':>12} "
+          f"{'cache chaud':>12} {'flux (ms)':>10}")
+    if isinstance(loading, dict):
+        print(f"{'':>18} erreur: {loading['error']}")
+    else:
+        for row in loading:
+            print(f"{row['file']:>18} {row['bytes'] / 1024:>7.0f} {row['pygame_decode_ms']:>12.1f} "
+                  f"{row['cache_cold_ms']:>12.1f} {row['cache_warm_ms']:>12.2f} "
+                  f"{row['stream_open_ms']:>10.2f}")
+
+    print()
+    print(f"{'moteur':>15} {'couches':>8} {'play (ms)':>10} {'CPU/s (ms)':>11} {'CPU (%)':>8} "
+          f"{'volume/s':>10} {'principal/s':>12} {'stop (ms)':>10} {'RSS (Mo)':>9}")
+    for row in report['mixing']:
+        if 'error' in row:
+            print(f"{row['backend']:>15} {row['layers']:>8} erreur: {row['error']}")
+            continue
+        rss = f"{row['peak_rss'] / 1024 / 1024:.0f}" if row['peak_rss'] else "-"
+        print(f"{row['backend']:>15} {row['layers']:>8} {row['play_sound_ms']:>10.2f} "
+              f"{row['cpu_per_second_ms']:>11.1f} {row['cpu_percent']:>8.2f} "
+              f"{row['set_volume_per_second']:>10.0f} {row['set_master_volume_per_second']:>12.0f} "
+              f"{row['stop_all_ms']:>10.1f} {rss:>9}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.bench_mixer",
+        description="Coût du mixeur selon le nombre de couches"
+    )
+    parser.add_argument('--layers', type=int, nargs='+', default=list(LAYER_COUNTS),
+                        help="Nombres de couches mesurés")
+    parser.add_argument('--backends', nargs='+', choices=list(BACKENDS), default=list(BACKENDS),
+                        help="Moteurs comparés")
+    parser.add_argument('--seconds', type=float, default=SECONDS,
+                        help="Durée d'audio mixé par mesure")
+    parser.add_argument('--json', metavar='FICHIER',
+                        help="Enregistre le rapport en JSON ('-' : sortie standard)")
+    args = parser.parse_args(argv)
+
+    if not decoder.is_available():
+        raise SystemExit("Erreur: soundfile est nécessaire au benchmark")
+    report = run(args.layers, args.backends, args.seconds)
+    if args.json == '-':
+        json.dump(report, sys.stdout, indent=1)
+        print()
+        return
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
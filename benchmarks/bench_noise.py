@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""
+Coût des bruits synthétisés face aux anciens fichiers de bruit.
+
+Pour chaque bruit, mesure le temps CPU nécessaire pour produire une seconde
+d'audio par blocs de 512 trames à travers le moteur NumPy, et la mémoire
+résidente de la source. Les fichiers white-noise.ogg et pink-noise.ogg sont
+mesurés de la même façon (décodage complet compris, puis lecture en boucle
+du PCM en mémoire).
+
+Utilisation (depuis la racine du dépôt) :
+    python -m benchmarks.bench_noise
+"""
+
+import time
+
+from src.audio import decoder
+from src.audio.engine import MixEngine
+from src.audio.generators import NOISE_TYPES, GeneratorSource, NoiseGenerator
+from src.audio.sources import BufferSource
+from src.core.sounds import SOUNDS_DIR
+
+SAMPLERATE = 44100
+BLOCK = 512
+
+# Durée d'audio rendue par mesure (secondes)
+SECONDS = 30
+
+NOISE_FILES = ('white-noise.ogg', 'pink-noise.ogg')
+
+
+def render_cost(source) -> float:
+    """Temps CPU (secondes) pour rendre une seconde d'audio depuis une source."""
+    engine = MixEngine(SAMPLERATE, 2)
+    engine.add_layer('noise', source, 0.5)
+    blocks = SECONDS * SAMPLERATE // BLOCK
+    start = time.process_time()
+    for _ in range(blocks):
+        engine.render(BLOCK)
+    return (time.process_time() - start) / SECONDS
+
+
+def main():
+    print(f"{'source':>16} {'préparation (ms)':>17} {'CPU / s audio (ms)':>19} "
+          f"{'CPU (%)':>8} {'mémoire (Ko)':>13}")
+
+    for kind in NOISE_TYPES:
+        start = time.process_time()
+        source = GeneratorSource(NoiseGenerator(kind, SAMPLERATE, 2))
+        setup = time.process_time() - start
+        cost = render_cost(source)
+        print(f"{kind:>16} {setup * 1000:>17.1f} {cost * 1000:>19.2f} "
+              f"{cost * 100:>8.2f} {source.resident_bytes / 1024:>13.1f}")
+
+    for name in NOISE_FILES:
+        path = SOUNDS_DIR / name
+        if not path.exists() or not decoder.is_available():
+            print(f"{name:>16} fichier ou décodeur indisponible")
+            continue
+        start = time.process_time()
+        pcm, _ = decoder.decode(str(path))
+        pcm = decoder.resample(decoder.match_channels(pcm, 2), decoder.probe(str(path)).samplerate,
+                               SAMPLERATE)
+        setup = time.process_time() - start
+        source = BufferSource(pcm)
+        cost = render_cost(source)
+        print(f"{name:>16} {setup * 1000:>17.1f} {cost * 1000:>19.2f} "
+              f"{cost * 100:>8.2f} {source.resident_bytes / 1024:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
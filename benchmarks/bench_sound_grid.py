@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Temps jusqu'au premier affichage de la grille de sons.
+
+Compare la grille virtualisée (SoundGrid) à la construction complète de
+toutes les cartes dans un QGridLayout, pour 10, 100 et 1000 sons.
+
+Utilisation (depuis la racine du dépôt) :
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_sound_grid
+"""
+
+import sys
+import time
+
+from PyQt6.QtCore import QEvent, QObject
+from PyQt6.QtWidgets import QApplication, QGridLayout, QScrollArea, QWidget
+
+from src.core.sounds import SOUNDS_DATA
+from src.ui.sound_card import SoundCard
+from src.ui.sound_grid import SoundGrid
+
+SIZES = (10, 100, 1000)
+
+
+class PaintWatcher(QObject):
+    """Note l'instant du premier évènement de dessin reçu par un widget."""
+
+    def __init__(self):
+        super().__init__()
+        self.painted_at = None
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and self.painted_at is None:
+            self.painted_at = time.perf_counter()
+        return False
+
+
+def make_catalog(count):
+    """Construit un catalogue fictif de `count` sons."""
+    templates = list(SOUNDS_DATA.values())
+    return {
+        f"sound_{i}": dict(templates[i % len(templates)], name=f"Son {i}")
+        for i in range(count)
+    }
+
+
+def build_eager(catalog, scroll_area):
+    """Ancienne construction : une carte par son dans un QGridLayout."""
+    widget = QWidget()
+    layout = QGridLayout(widget)
+    layout.setSpacing(15)
+    for index, (sound_id, sound_data) in enumerate(catalog.items()):
+        row, col = divmod(index, 3)
+        layout.addWidget(SoundCard(sound_id, sound_data, None), row, col)
+    return widget
+
+
+def build_virtual(catalog, scroll_area):
+    """Grille virtualisée."""
+    return SoundGrid(catalog, None, scroll_area)
+
+
+def measure(app, builder, count):
+    """Retourne (secondes jusqu'au premier dessin, cartes construites)."""
+    catalog = make_catalog(count)
+    start = time.perf_counter()
+
+    scroll_area = QScrollArea()
+    scroll_area.setWidgetResizable(True)
+    scroll_area.resize(900, 600)
+    widget = builder(catalog, scroll_area)
+    scroll_area.setWidget(widget)
+
+    watcher = PaintWatcher()
+    widget.installEventFilter(watcher)
+    scroll_area.show()
+    while watcher.painted_at is None:
+        app.processEvents()
+
+    elapsed = watcher.painted_at - start
+    cards = len(widget.findChildren(SoundCard))
+    scroll_area.close()
+    scroll_area.deleteLater()
+    app.processEvents()
+    return elapsed, cards
+
+
+def main():
+    app = QApplication(sys.argv)
+    print(f"{'sons':>6} {'mode':>10} {'1er dessin (ms)':>16} {'cartes':>8}")
+    for count in SIZES:
+        for name, builder in (("complet", build_eager), ("virtualisé", build_virtual)):
+            elapsed, cards = measure(app, builder, count)
+            print(f"{count:>6} {name:>10} {elapsed * 1000:>16.1f} {cards:>8}")
+
+
+if __name__ == "__main__":
+    main()
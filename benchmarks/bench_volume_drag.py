@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Appels au mixeur produits par le glissement d'un curseur de volume.
+
+Simule un glissement d'une seconde (un évènement valueChanged par pas, 0 à
+100 puis retour) sur le curseur d'un son et sur le volume principal, et
+compte les appels au mixeur sans regroupement puis avec VolumeScheduler.
+
+Utilisation (depuis la racine du dépôt) :
+    python -m benchmarks.bench_volume_drag
+"""
+
+import time
+
+from src.audio.volume import VolumeScheduler
+
+# Durée simulée du glissement (secondes)
+DRAG_SECONDS = 1.0
+
+# Pas du curseur parcourus pendant le glissement
+STEPS = list(range(101)) + list(range(99, -1, -1))
+
+
+class CountingMixer:
+    """Mixeur factice qui compte les appels reçus."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def set_volume(self, sound_id, volume):
+        self.calls += 1
+
+    def set_master_volume(self, volume):
+        self.calls += 1
+
+
+def drag(set_volume, set_master_volume):
+    """Rejoue le glissement, au rythme des évènements d'un vrai curseur."""
+    interval = DRAG_SECONDS / len(STEPS)
+    for step in STEPS:
+        set_volume("rain", step / 100.0)
+        set_master_volume(step / 100.0)
+        time.sleep(interval)
+
+
+def main():
+    direct = CountingMixer()
+    drag(direct.set_volume, direct.set_master_volume)
+
+    batched = CountingMixer()
+    scheduler = VolumeScheduler(batched)
+    drag(scheduler.set_volume, scheduler.set_master_volume)
+    scheduler.flush()
+    stats = scheduler.get_stats()
+
+    print(f"{'mode':>10} {'évènements':>11} {'lots':>6} {'appels mixeur':>14}")
+    print(f"{'direct':>10} {len(STEPS) * 2:>11} {'-':>6} {direct.calls:>14}")
+    print(f"{'regroupé':>10} {stats['requests']:>11} {stats['batches']:>6} {stats['mixer_calls']:>14}")
+
+
+if __name__ == "__main__":
+    main()
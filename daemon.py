@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Blanket - service audio
+
+Joue les sons sans interface et se pilote par un socket local (protocole
+JSON-lines, voir src/service/protocol.py). L'application se rattache
+automatiquement au service s'il est lancé : la fenêtre peut être fermée
+sans interrompre les sons.
+
+Exemples :
+    python daemon.py
+    python daemon.py --engine numpy --socket /tmp/blanket.sock
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import signal
+import sys
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Service audio Blanket")
+    address = parser.add_mutually_exclusive_group()
+    address.add_argument('--socket', metavar='CHEMIN', help="Chemin du socket Unix")
+    address.add_argument('--port', type=int, help="Port TCP local (127.0.0.1)")
+    parser.add_argument('--engine', choices=('pygame', 'numpy'), default=None,
+                        help="Moteur audio (défaut : celui des paramètres)")
+    return parser.parse_args(argv[1:])
+
+
+async def run(server):
+    """Sert jusqu'à 'shutdown', SIGINT ou SIGTERM."""
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, server.stop)
+        except NotImplementedError:
+            # Windows : Ctrl+C lève KeyboardInterrupt
+            pass
+    await server.serve()
+
+
+def main():
+    """Point d'entrée du service audio."""
+    args = parse_args(sys.argv)
+
+    from PyQt6.QtCore import QCoreApplication
+    from src.audio.mixer import create_mixer
+    from src.core import library
+    from src.core.settings import Settings
+    from src.service.protocol import default_address
+    from src.service.server import MixerServer
+
+    # Mêmes identifiants que main.py, pour lire les mêmes paramètres et presets
+    QCoreApplication.setOrganizationName("Jason Madi")
+    QCoreApplication.setApplicationName("Blanket")
+
+    if args.socket:
+        address = args.socket
+    elif args.port:
+        address = ('127.0.0.1', args.port)
+    else:
+        address = default_address()
+
+    settings = Settings()
+    # Sons de la bibliothèque de l'utilisateur, joués par leur identifiant dans les presets
+    library.register(settings.sound_library().cached_sounds())
+    engine = args.engine or settings.audio_engine
+    mixer = create_mixer(engine, **settings.mixer_options())
+    # Taille de bloc apprise, reprise au prochain lancement sur cette machine
+    mixer.buffer_tuner.on_change = settings.save_learned_buffer
+    server = MixerServer(mixer, address)
+    where = address if isinstance(address, str) else f"{address[0]}:{address[1]}"
+    print(f"Service Blanket à l'écoute sur {where}", flush=True)
+    try:
+        asyncio.run(run(server))
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        raise SystemExit(f"Erreur: {e}")
+
+
+if __name__ == "__main__":
+    # Processus de rééchantillonnage et d'analyse dans l'exécutable Windows
+    multiprocessing.freeze_support()
+    main()
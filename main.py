@@ -9,57 +9,88 @@ Basé sur Blanket par Rafael Mardojai CM
 Licence: GPL-3.0
 """
 
+import argparse
+import multiprocessing
 import sys
 from pathlib import Path
 
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import Qt, QLocale
-from PyQt6.QtGui import QIcon
-
-from src.ui.main_window import MainWindow
-from src.core.settings import Settings
+from src.core.profiling import StartupProfiler
 
 # Version de l'application
 VERSION = "1.0.0"
 
 
+def parse_args(argv):
+    """Analyse les options propres à Blanket ; les autres sont laissées à Qt."""
+    parser = argparse.ArgumentParser(description="Blanket - sons d'ambiance")
+    parser.add_argument(
+        '--profile-startup',
+        action='store_true',
+        help="Affiche le temps passé dans chaque phase du démarrage"
+    )
+    return parser.parse_known_args(argv[1:])
+
+
 def main():
     """Point d'entrée principal de l'application."""
-    # Configuration de l'application
-    QApplication.setApplicationName("Blanket")
-    QApplication.setApplicationVersion(VERSION)
-    QApplication.setOrganizationName("Jason Madi")
-    QApplication.setOrganizationDomain("github.com/madijason")
-    
-    # Active le support des hautes résolutions
-    QApplication.setHighDpiScaleFactorRoundingPolicy(
-        Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
-    )
-    
-    # Créer l'application Qt
-    app = QApplication(sys.argv)
-    
-    # Définir l'icône de l'application
-    icon_path = Path(__file__).parent / "assets" / "icon.png"
-    if icon_path.exists():
-        app.setWindowIcon(QIcon(str(icon_path)))
-    
-    # Charger les paramètres
-    settings = Settings()
-    
-    # Appliquer le thème
-    if settings.dark_mode:
-        app.setStyle("Fusion")
-        from src.ui.styles import apply_dark_theme
-        apply_dark_theme(app)
-    
-    # Créer et afficher la fenêtre principale
-    window = MainWindow()
-    window.show()
-    
-    # Lancer la boucle d'événements
+    args, qt_args = parse_args(sys.argv)
+    profiler = StartupProfiler(enabled=args.profile_startup)
+
+    with profiler.phase("imports"):
+        from PyQt6.QtWidgets import QApplication
+        from PyQt6.QtCore import Qt, QTimer
+        from PyQt6.QtGui import QIcon
+
+        from src.ui.main_window import MainWindow
+        from src.core.settings import Settings
+
+    with profiler.phase("QApplication"):
+        # Configuration de l'application
+        QApplication.setApplicationName("Blanket")
+        QApplication.setApplicationVersion(VERSION)
+        QApplication.setOrganizationName("Jason Madi")
+        QApplication.setOrganizationDomain("github.com/madijason")
+
+        # Active le support des hautes résolutions
+        QApplication.setHighDpiScaleFactorRoundingPolicy(
+            Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
+        )
+
+        # Créer l'application Qt
+        app = QApplication(sys.argv[:1] + qt_args)
+
+        # Définir l'icône de l'application
+        icon_path = Path(__file__).parent / "assets" / "icon.png"
+        if icon_path.exists():
+            app.setWindowIcon(QIcon(str(icon_path)))
+
+    with profiler.phase("chargement des paramètres"):
+        # Charger les paramètres (instance partagée avec la fenêtre)
+        settings = Settings()
+
+        # Appliquer le thème
+        if settings.dark_mode:
+            app.setStyle("Fusion")
+            from src.ui.styles import apply_dark_theme
+            apply_dark_theme(app)
+
+    with profiler.phase("construction de la fenêtre"):
+        # Créer et afficher la fenêtre principale
+        window = MainWindow(settings, restore_state=False)
+        window.show()
+
+    with profiler.phase("restauration de l'état"):
+        window.load_saved_state()
+
+    if profiler.enabled:
+        # Affiché au premier tour de la boucle d'évènements, une fois la fenêtre peinte
+        QTimer.singleShot(0, lambda: print(profiler.report()))
+
+    # Lancer la boucle d'évènements
     sys.exit(app.exec())
 
 
 if __name__ == "__main__":
+    # Processus de rééchantillonnage et d'analyse dans l'exécutable Windows
+    multiprocessing.freeze_support()
     main()
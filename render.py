@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Blanket - rendu hors ligne
+
+Mixe un preset (ou une liste de sons) dans un fichier WAV, FLAC ou OGG, sans
+interface ni périphérique audio, bien plus vite que le temps réel.
+
+Exemples :
+    python render.py --preset "Pluie d'été" --duration 8h sommeil.flac
+    python render.py --sound rain=0.6 --sound brown_noise=0.3 -d 90m pluie.ogg
+"""
+
+import argparse
+import re
+import sys
+import time
+
+# Unités acceptées pour la durée
+DURATION_UNITS = {'h': 3600, 'm': 60, 's': 1}
+
+
+def parse_duration(text: str) -> float:
+    """Convertit '8h', '1h30m', '90m', '45s' ou '3600' en secondes."""
+    if re.fullmatch(r'\d+(\.\d+)?', text):
+        return float(text)
+    parts = re.findall(r'(\d+(?:\.\d+)?)([hms])', text)
+    if not parts or ''.join(value + unit for value, unit in parts) != text:
+        raise argparse.ArgumentTypeError(f"durée invalide: {text}")
+    return sum(float(value) * DURATION_UNITS[unit] for value, unit in parts)
+
+
+def parse_sound(text: str):
+    """Convertit 'sound_id=volume' en couple (sound_id, volume)."""
+    sound_id, _, volume = text.partition('=')
+    try:
+        return sound_id, float(volume) if volume else 0.5
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"volume invalide: {text}")
+
+
+def load_preset(name: str):
+    """
+    Lit un preset enregistré par l'application.
+
+    Returns:
+        Le volume de chaque son et les effets enregistrés avec le preset
+    """
+    from PyQt6.QtCore import QCoreApplication
+    from src.core import library
+    from src.core.settings import Settings
+
+    # Mêmes identifiants que main.py, pour lire les mêmes paramètres
+    QCoreApplication.setOrganizationName("Jason Madi")
+    QCoreApplication.setApplicationName("Blanket")
+    settings = Settings()
+    # Un preset peut contenir des sons de la bibliothèque de l'utilisateur
+    library.register(settings.sound_library().cached_sounds())
+    if name not in settings.presets:
+        names = ", ".join(settings.get_preset_names()) or "aucun"
+        raise SystemExit(f"Erreur: preset introuvable: {name} (presets: {names})")
+    return settings.load_preset(name), settings.load_preset_effects(name)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Rendu hors ligne d'un preset Blanket")
+    parser.add_argument('output', help="Fichier de sortie (.wav, .flac ou .ogg)")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--preset', help="Nom d'un preset enregistré")
+    source.add_argument('--sound', action='append', type=parse_sound, metavar='ID=VOLUME',
+                        help="Son à inclure (répétable), ex. rain=0.6")
+    parser.add_argument('-d', '--duration', type=parse_duration, default=3600.0,
+                        help="Durée : 8h, 1h30m, 90m, 45s ou secondes (défaut : 1h)")
+    parser.add_argument('--master', type=float, default=1.0, help="Volume principal (0-1)")
+    parser.add_argument('--fade', type=float, default=10.0,
+                        help="Fondus d'entrée et de sortie (secondes)")
+    parser.add_argument('--frequency', type=int, default=44100, help="Fréquence (Hz)")
+    parser.add_argument('--channels', type=int, default=2, help="Nombre de canaux")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="Processus de rendu (défaut : un par cœur)")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="Graine des bruits synthétisés (rendu reproductible)")
+    return parser.parse_args(argv[1:])
+
+
+def main():
+    """Point d'entrée du rendu hors ligne."""
+    args = parse_args(sys.argv)
+    sounds, effects = load_preset(args.preset) if args.preset else (dict(args.sound), {})
+    if not sounds:
+        raise SystemExit("Erreur: aucun son à rendre")
+
+    from src.audio.render import render_preset
+
+    def progress(done, total):
+        print(f"\rRendu : {done}/{total} segments", end='', flush=True)
+
+    start = time.perf_counter()
+    try:
+        frames = render_preset(
+            sounds, args.output, args.duration,
+            samplerate=args.frequency, channels=args.channels, master=args.master,
+            fade_seconds=args.fade, jobs=args.jobs, seed=args.seed, effects=effects,
+            progress=progress
+        )
+    except (ValueError, RuntimeError) as e:
+        raise SystemExit(f"\nErreur: {e}")
+    elapsed = time.perf_counter() - start
+
+    seconds = frames / args.frequency
+    print(f"\n{args.output}: {seconds / 60:.1f} min rendues en {elapsed:.1f} s "
+          f"({seconds / elapsed:.0f}x le temps réel)")
+
+
+if __name__ == "__main__":
+    main()
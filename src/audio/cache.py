@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+Cache disque du PCM décodé.
+
+Chaque fichier est décodé une seule fois au format du mixeur puis enregistré
+sous le répertoire de cache de l'utilisateur. Les lectures suivantes
+projettent le fichier en mémoire (mmap) : la restauration est quasi
+instantanée et les pages sont partagées entre les processus.
+
+Un fichier dont la fréquence diffère de celle du mixeur est rééchantillonné
+une fois, avant sa mise en cache ; le mixeur confie ce travail coûteux à un
+processus séparé (voir resampler), qui écrit lui-même l'entrée.
+
+Un fichier mono, ou stéréo à canaux identiques, peut être gardé sur un seul
+canal (option mono) : le moteur NumPy l'étend à tous les canaux au mixage.
+
+Utilisation en ligne de commande :
+    python -m src.audio.cache prewarm   # décode tous les sons de SOUNDS_DATA
+    python -m src.audio.cache clear     # vide le cache
+    python -m src.audio.cache info      # affiche l'occupation du cache
+"""
+
+import argparse
+import hashlib
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from src.audio import decoder
+from src.audio.loops import LoopPoints, apply_loop
+
+# Taille maximale du cache avant éviction des entrées les moins récentes
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+# Processus de rééchantillonnage partagé, lancé au premier besoin
+_resampler: Optional[ProcessPoolExecutor] = None
+_resampler_lock = threading.Lock()
+
+
+def default_cache_dir() -> Path:
+    """Retourne le répertoire de cache de l'utilisateur pour Blanket."""
+    if sys.platform == 'win32':
+        base = Path(os.environ.get('LOCALAPPDATA', Path.home() / 'AppData' / 'Local'))
+        return base / 'Blanket' / 'cache'
+    base = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache'))
+    return base / 'blanket'
+
+
+def resampler() -> ProcessPoolExecutor:
+    """
+    Retourne le processus de rééchantillonnage partagé.
+
+    Il est lancé par « spawn » : un processus neuf, sans les threads audio
+    ni l'interface du processus principal.
+    """
+    global _resampler
+    with _resampler_lock:
+        if _resampler is None:
+            _resampler = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn'))
+        return _resampler
+
+
+def convert(file_path: str, samplerate: int, channels: int, dtype: str = 'int16',
+            loop: Optional[LoopPoints] = None, mono: bool = False) -> np.ndarray:
+    """
+    Décode un fichier au format demandé (voir PcmCache.load), sans le cache.
+
+    Returns:
+        Le PCM de forme (trames, canaux), ou (trames, 1) pour un fichier mono
+        si mono est vrai
+    """
+    pcm, source_rate = decoder.decode(file_path, dtype=dtype)
+    if mono and decoder.is_mono(pcm):
+        pcm = np.ascontiguousarray(pcm[:, :1])
+    else:
+        pcm = decoder.match_channels(pcm, channels)
+    pcm = decoder.resample(pcm, source_rate, samplerate)
+    if loop is not None:
+        pcm = apply_loop(pcm, loop.scaled(samplerate))
+    return pcm
+
+
+def _convert_entry(cache_dir: str, max_bytes: int, key: str, file_path: str, samplerate: int,
+                   channels: int, dtype: str, loop: Optional[LoopPoints],
+                   mono: bool = False) -> Optional[np.ndarray]:
+    """
+    Tâche du processus de rééchantillonnage : convertit un fichier et l'écrit en cache.
+
+    Returns:
+        None une fois l'entrée écrite ; le PCM lui-même si l'écriture a échoué
+    """
+    pcm = convert(file_path, samplerate, channels, dtype, loop, mono)
+    try:
+        PcmCache(Path(cache_dir), max_bytes).put(key, pcm)
+    except OSError as e:
+        print(f"Avertissement: impossible d'écrire dans le cache audio: {e}")
+        return pcm
+    return None
+
+
+class PcmCache:
+    """Cache LRU de PCM décodé, un fichier .npy projeté en mémoire par entrée."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: Répertoire des entrées (par défaut sous le cache utilisateur)
+            max_bytes: Taille totale au-delà de laquelle les entrées les
+                moins récemment utilisées sont supprimées
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir() / 'pcm'
+        self.max_bytes = max_bytes
+
+    def key(self, file_path: str, samplerate: int, channels: int, dtype: str = 'int16',
+            loop: Optional[LoopPoints] = None, mono: bool = False) -> str:
+        """
+        Calcule la clé d'une entrée.
+
+        La clé couvre le chemin, la date de modification et la taille de la
+        source ainsi que le format cible et les points de boucle : toute
+        modification du fichier, de sa boucle ou du format du mixeur produit
+        une nouvelle entrée.
+        """
+        path = Path(file_path).resolve()
+        stat = path.stat()
+        identity = f"{path}|{stat.st_mtime_ns}|{stat.st_size}|{samplerate}|{channels}|{dtype}"
+        if loop is not None:
+            identity += f"|{loop.start}:{loop.end}:{loop.crossfade}"
+        if mono:
+            identity += "|mono"
+        return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Retourne le PCM d'une entrée, projeté en mémoire en lecture seule.
+
+        Returns:
+            Le PCM de forme (trames, canaux), ou None si l'entrée est absente
+        """
+        entry = self._entry_path(key)
+        try:
+            pcm = np.load(entry, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        self._touch(entry)
+        return pcm
+
+    def put(self, key: str, pcm: np.ndarray) -> np.ndarray:
+        """
+        Enregistre une entrée puis la retourne projetée en mémoire.
+
+        L'écriture passe par un fichier temporaire renommé atomiquement : un
+        autre processus ne voit jamais d'entrée partielle.
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entry = self._entry_path(key)
+        temp = entry.with_name(f"{entry.stem}.{os.getpid()}.tmp")
+        with open(temp, 'wb') as f:
+            np.save(f, np.ascontiguousarray(pcm))
+        os.replace(temp, entry)
+        self.evict(keep=entry)
+        return np.load(entry, mmap_mode='r')
+
+    def load(self, file_path: str, samplerate: int, channels: int, dtype: str = 'int16',
+             loop: Optional[LoopPoints] = None, pool: Optional[Executor] = None,
+             mono: bool = False) -> np.ndarray:
+        """
+        Retourne le PCM d'un fichier au format demandé, en le décodant au besoin.
+
+        Args:
+            file_path: Chemin vers le fichier audio
+            samplerate: Fréquence d'échantillonnage cible (Hz)
+            channels: Nombre de canaux cible
+            dtype: Format des échantillons ('int16' ou 'float32')
+            loop: Points de boucle ; le PCM est alors découpé et son raccord
+                fondu une fois pour toutes avant d'être mis en cache
+            pool: Processus (voir resampler) auquel confier un fichier à
+                rééchantillonner ; None pour tout faire dans le thread appelant
+            mono: Garder un fichier mono, ou à canaux identiques, sur un seul
+                canal (le lecteur l'étend lui-même aux autres)
+
+        Returns:
+            Le PCM de forme (trames, canaux), ou (trames, 1) pour un fichier
+            mono si mono est vrai
+        """
+        key = self.key(file_path, samplerate, channels, dtype, loop, mono)
+        pcm = self.get(key)
+        if pcm is not None:
+            return pcm
+
+        if pool is not None:
+            info = decoder.probe(file_path)
+            if info is not None and info.samplerate != samplerate:
+                try:
+                    pcm = pool.submit(_convert_entry, str(self.cache_dir), self.max_bytes, key,
+                                      str(file_path), samplerate, channels, dtype, loop,
+                                      mono).result()
+                except Exception as e:
+                    print(f"Avertissement: rééchantillonnage dans le processus principal: {e}")
+                else:
+                    pcm = pcm if pcm is not None else self.get(key)
+                    if pcm is not None:
+                        return pcm
+
+        pcm = convert(file_path, samplerate, channels, dtype, loop, mono)
+        try:
+            return self.put(key, pcm)
+        except OSError as e:
+            print(f"Avertissement: impossible d'écrire dans le cache audio: {e}")
+            return pcm
+
+    def entries(self) -> List[Path]:
+        """Retourne les entrées, de la moins à la plus récemment utilisée."""
+        if not self.cache_dir.exists():
+            return []
+        return sorted(self.cache_dir.glob('*.npy'), key=lambda p: p.stat().st_mtime)
+
+    def total_bytes(self) -> int:
+        """Taille totale des entrées."""
+        return sum(entry.stat().st_size for entry in self.entries())
+
+    def evict(self, keep: Optional[Path] = None):
+        """Supprime les entrées les moins récentes jusqu'à respecter max_bytes."""
+        entries = self.entries()
+        total = sum(entry.stat().st_size for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry == keep:
+                continue
+            size = entry.stat().st_size
+            try:
+                entry.unlink()
+            except OSError:
+                # Entrée encore projetée par un autre processus (Windows)
+                continue
+            total -= size
+
+    def clear(self) -> int:
+        """Supprime toutes les entrées et retourne le nombre d'octets libérés."""
+        freed = 0
+        for entry in self.entries():
+            size = entry.stat().st_size
+            try:
+                entry.unlink()
+            except OSError:
+                continue
+            freed += size
+        return freed
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npy"
+
+    def _touch(self, entry: Path):
+        """Marque une entrée comme récemment utilisée (date de modification)."""
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+
+
+def _mixer_frequency() -> int:
+    """
+    Fréquence à laquelle l'application ouvre ses mixeurs.
+
+    Même calcul qu'AudioMixer._open_device avec les options de
+    Settings.mixer_options() : la fréquence native du périphérique si
+    l'option est active, 44,1 kHz sinon.
+    """
+    from PyQt6.QtCore import QCoreApplication
+    from src.audio.output import native_samplerate
+    from src.core.settings import Settings
+
+    # Mêmes identifiants que main.py, pour lire les mêmes paramètres
+    QCoreApplication.setOrganizationName("Jason Madi")
+    QCoreApplication.setApplicationName("Blanket")
+    frequency = 44100
+    if Settings().mixer_options()['native_rate']:
+        frequency = native_samplerate() or frequency
+    return frequency
+
+
+def main(argv=None):
+    """Point d'entrée de la ligne de commande du cache."""
+    from src.core.sounds import SOUNDS_DATA
+
+    parser = argparse.ArgumentParser(
+        prog="python -m src.audio.cache",
+        description="Gestion du cache de PCM décodé de Blanket"
+    )
+    parser.add_argument('command', choices=['prewarm', 'clear', 'info'])
+    parser.add_argument('--dir', type=Path, default=None, help="Répertoire du cache")
+    parser.add_argument('--max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help="Taille maximale du cache (Mo)")
+    parser.add_argument('--frequency', type=int, default=None,
+                        help="Fréquence cible (Hz), par défaut celle des mixeurs "
+                             "de l'application")
+    parser.add_argument('--channels', type=int, default=2, help="Nombre de canaux cible")
+    parser.add_argument('--engine', choices=['pygame', 'numpy'], default=None,
+                        help="Moteur dont les entrées sont préparées (par défaut les deux)")
+    args = parser.parse_args(argv)
+
+    cache = PcmCache(args.dir, args.max_mb * 1024 * 1024)
+
+    if args.command == 'prewarm':
+        from src.audio.loops import LoopIndex
+
+        loops = LoopIndex()
+        frequency = args.frequency or _mixer_frequency()
+        # pygame lit le PCM stéréo ; le moteur NumPy et le rendu, le PCM compact
+        forms = {'pygame': (False,), 'numpy': (True,)}.get(args.engine, (False, True))
+        for sound_id, sound_data in SOUNDS_DATA.items():
+            file_path = sound_data.get('file')
+            if not file_path or not Path(file_path).exists():
+                print(f"{sound_id}: fichier introuvable, ignoré")
+                continue
+            for mono in forms:
+                pcm = cache.load(file_path, frequency, args.channels,
+                                 loop=loops.get(file_path), mono=mono)
+                print(f"{sound_id}{' (compact)' if mono else ''}: "
+                      f"{pcm.nbytes / 1024 / 1024:.1f} Mo")
+    elif args.command == 'clear':
+        freed = cache.clear()
+        print(f"Cache vidé: {freed / 1024 / 1024:.1f} Mo libérés")
+
+    entries = cache.entries()
+    print(f"{cache.cache_dir}: {len(entries)} entrées, "
+          f"{cache.total_bytes() / 1024 / 1024:.1f} Mo / {args.max_mb} Mo")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Décodage des fichiers audio via libsndfile.
+
+Permet de lire un fichier OGG Vorbis (ou WAV/FLAC) bloc par bloc au lieu de
+le décoder entièrement en mémoire comme le fait ``pygame.mixer.Sound``.
+"""
+
+import math
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+
+try:
+    import soundfile
+except (ImportError, OSError):
+    # soundfile absent ou libsndfile introuvable : pas de lecture par blocs
+    soundfile = None
+
+# Trames prolongées circulairement à chaque extrémité avant le filtrage
+# polyphase : le son est joué en boucle, son début suit sa fin
+RESAMPLE_WRAP = 256
+
+
+class AudioInfo(NamedTuple):
+    """Caractéristiques d'un fichier audio lues depuis son en-tête."""
+
+    samplerate: int
+    channels: int
+    frames: int
+
+    @property
+    def duration(self) -> float:
+        """Durée du fichier en secondes."""
+        return self.frames / self.samplerate if self.samplerate else 0.0
+
+
+def is_available() -> bool:
+    """Indique si le décodage par blocs est disponible."""
+    return soundfile is not None
+
+
+def probe(file_path: str) -> Optional[AudioInfo]:
+    """
+    Lit les caractéristiques d'un fichier sans le décoder.
+
+    Args:
+        file_path: Chemin vers le fichier audio
+
+    Returns:
+        Les informations du fichier, ou None s'il est illisible
+    """
+    if soundfile is None:
+        return None
+    try:
+        info = soundfile.info(str(file_path))
+    except Exception as e:
+        print(f"Erreur lors de l'analyse de {file_path}: {e}")
+        return None
+    return AudioInfo(info.samplerate, info.channels, info.frames)
+
+
+def open_file(file_path: str):
+    """
+    Ouvre un fichier audio pour une lecture par blocs.
+
+    Args:
+        file_path: Chemin vers le fichier audio
+
+    Returns:
+        Un objet ``soundfile.SoundFile`` positionné au début du fichier
+    """
+    if soundfile is None:
+        raise RuntimeError("Le module soundfile n'est pas installé")
+    return soundfile.SoundFile(str(Path(file_path)))
+
+
+def decode(file_path: str, dtype: str = 'int16') -> Tuple[np.ndarray, int]:
+    """
+    Décode entièrement un fichier audio.
+
+    Args:
+        file_path: Chemin vers le fichier audio
+        dtype: Format des échantillons ('int16' ou 'float32')
+
+    Returns:
+        Le PCM de forme (trames, canaux) et sa fréquence d'échantillonnage
+    """
+    if soundfile is None:
+        raise RuntimeError("Le module soundfile n'est pas installé")
+    return soundfile.read(str(Path(file_path)), dtype=dtype, always_2d=True)
+
+
+def match_channels(pcm: np.ndarray, channels: int) -> np.ndarray:
+    """
+    Adapte le nombre de canaux d'un PCM (duplication du mono, troncature sinon).
+
+    Args:
+        pcm: PCM de forme (trames, canaux)
+        channels: Nombre de canaux voulu
+
+    Returns:
+        Le PCM de forme (trames, channels)
+    """
+    if pcm.shape[1] == channels:
+        return pcm
+    if pcm.shape[1] == 1:
+        return np.ascontiguousarray(np.repeat(pcm, channels, axis=1))
+    return np.ascontiguousarray(pcm[:, :channels])
+
+
+def is_mono(pcm: np.ndarray) -> bool:
+    """
+    Indique si un PCM est mono : un seul canal, ou des canaux tous identiques.
+
+    Beaucoup de bruits et d'ambiances sont distribués en stéréo avec deux
+    canaux égaux ; les garder sur un seul canal divise leur taille par deux.
+
+    Args:
+        pcm: PCM de forme (trames, canaux)
+    """
+    if pcm.shape[1] == 1:
+        return True
+    return all(np.array_equal(pcm[:, 0], pcm[:, channel]) for channel in range(1, pcm.shape[1]))
+
+
+def resample(pcm: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Convertit la fréquence d'échantillonnage.
+
+    Avec scipy, le filtre polyphase de resample_poly (fenêtre de Kaiser)
+    évite le repliement et l'atténuation des aigus de l'interpolation
+    linéaire, utilisée sinon. Le PCM est traité comme une boucle : ses
+    extrémités sont prolongées circulairement avant le filtrage, si bien
+    que le raccord fin-début ne porte pas la transitoire du filtre.
+
+    Args:
+        pcm: PCM de forme (trames, canaux)
+        source_rate: Fréquence du PCM (Hz)
+        target_rate: Fréquence voulue (Hz)
+
+    Returns:
+        Le PCM rééchantillonné, dans le même format
+    """
+    if source_rate == target_rate or len(pcm) == 0:
+        return pcm
+    # Importé ici : scipy alourdirait le démarrage de l'interface
+    try:
+        from scipy import signal
+    except (ImportError, OSError):
+        print("Avertissement: scipy absent, rééchantillonnage par interpolation linéaire")
+    else:
+        return _resample_poly(signal, pcm, source_rate, target_rate)
+    frames = int(round(len(pcm) * target_rate / source_rate))
+    positions = np.arange(frames) * (source_rate / target_rate)
+    source_positions = np.arange(len(pcm))
+    out = np.empty((frames, pcm.shape[1]), dtype=pcm.dtype)
+    for channel in range(pcm.shape[1]):
+        out[:, channel] = np.interp(positions, source_positions, pcm[:, channel])
+    return out
+
+
+def _resample_poly(signal, pcm: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Rééchantillonnage polyphase d'un PCM bouclé (voir resample)."""
+    divisor = math.gcd(source_rate, target_rate)
+    up, down = target_rate // divisor, source_rate // divisor
+    # Prolongement multiple de `down` : il correspond à un nombre entier de trames en sortie
+    wrap = min(len(pcm), RESAMPLE_WRAP)
+    wrap = -(-wrap // down) * down
+    padded = np.take(pcm, np.arange(-wrap, len(pcm) + wrap), axis=0, mode='wrap')
+    padded = padded.astype(np.float32, copy=False)
+    out = signal.resample_poly(padded, up, down, axis=0)
+    trim = wrap * up // down
+    out = out[trim:trim + int(math.ceil(len(pcm) * up / down))]
+    if np.issubdtype(pcm.dtype, np.integer):
+        limits = np.iinfo(pcm.dtype)
+        out = np.clip(np.round(out), limits.min, limits.max)
+    return np.ascontiguousarray(out, dtype=pcm.dtype)
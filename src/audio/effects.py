@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+Effets appliqués à un son : égaliseur, filtres passe-bas/passe-haut, largeur
+stéréo et balance.
+
+Les paramètres d'un son sont un dictionnaire JSON, enregistré avec les
+presets :
+
+    {
+        'lowpass': 4000,          # fréquence de coupure (Hz)
+        'highpass': 80,
+        'eq': [{'type': 'lowshelf', 'freq': 200, 'gain': -6, 'q': 0.707}],
+        'width': 0.5,             # 0 : mono, 1 : inchangée, 2 : élargie
+        'pan': -0.2,              # -1 : gauche, 1 : droite
+    }
+
+Les filtres sont des biquads (formules du « Audio EQ Cookbook ») mis en
+cascade et appliqués bloc par bloc par scipy.signal.sosfilt, l'état des
+filtres étant conservé d'un bloc à l'autre. Largeur et balance se réduisent
+à une matrice 2x2 : un seul produit matriciel par bloc. Un son sans effet
+n'a pas de chaîne du tout.
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# Types de bandes de l'égaliseur
+EQ_TYPES = {
+    'peak': "Cloche",
+    'lowshelf': "Plateau grave",
+    'highshelf': "Plateau aigu",
+}
+
+# Nombre maximal de bandes de l'égaliseur par son
+MAX_EQ_BANDS = 8
+
+# Facteur de qualité par défaut (Butterworth pour les passe-bas/passe-haut)
+DEFAULT_Q = 0.7071
+
+# Bornes des paramètres
+MIN_FREQUENCY = 20.0
+MAX_FREQUENCY = 20000.0
+MAX_EQ_GAIN = 24.0
+
+# Les fréquences de coupure sont ramenées sous cette fraction de la fréquence
+# d'échantillonnage (au-delà de Nyquist, le biquad n'a plus de sens)
+MAX_FREQUENCY_RATIO = 0.45
+
+_filters_warned = False
+
+# scipy.signal.sosfilt, importé au premier filtre : l'import de scipy coûte
+# plus d'une seconde et ne doit pas ralentir le démarrage (False si absent)
+_sosfilt = None
+
+
+def _load_sosfilt():
+    """Retourne scipy.signal.sosfilt, ou None si scipy est absent."""
+    global _sosfilt
+    if _sosfilt is None:
+        try:
+            from scipy.signal import sosfilt
+        except (ImportError, OSError):
+            # scipy absent : les filtres sont ignorés, largeur et balance restent
+            sosfilt = False
+        _sosfilt = sosfilt
+    return _sosfilt or None
+
+
+def filters_available() -> bool:
+    """Indique si les filtres (égaliseur, passe-bas, passe-haut) sont disponibles."""
+    return _load_sosfilt() is not None
+
+
+def normalize(params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Valide des paramètres d'effets et retire les valeurs neutres.
+
+    Args:
+        params: Paramètres (voir le format en tête du module), ou None
+
+    Returns:
+        Les paramètres validés ; un dictionnaire vide si aucun effet n'agit
+
+    Raises:
+        ValueError: Paramètre inconnu ou hors bornes
+    """
+    if not params:
+        return {}
+    unknown = set(params) - {'lowpass', 'highpass', 'eq', 'width', 'pan'}
+    if unknown:
+        raise ValueError(f"Effet inconnu: {', '.join(sorted(unknown))}")
+
+    normalized: Dict[str, Any] = {}
+    for key in ('lowpass', 'highpass'):
+        if params.get(key) is not None:
+            normalized[key] = _frequency(params[key], key)
+
+    bands = []
+    for band in params.get('eq') or []:
+        kind = band.get('type', 'peak')
+        if kind not in EQ_TYPES:
+            raise ValueError(f"Type de bande inconnu: {kind}")
+        gain = float(band.get('gain', 0.0))
+        if abs(gain) > MAX_EQ_GAIN:
+            raise ValueError(f"Gain de bande hors bornes: {gain} dB")
+        q = float(band.get('q', DEFAULT_Q))
+        if not 0.1 <= q <= 10.0:
+            raise ValueError(f"Facteur de qualité hors bornes: {q}")
+        if gain:
+            bands.append({'type': kind, 'freq': _frequency(band.get('freq'), 'freq'),
+                          'gain': gain, 'q': q})
+    if len(bands) > MAX_EQ_BANDS:
+        raise ValueError(f"Au plus {MAX_EQ_BANDS} bandes d'égaliseur")
+    if bands:
+        normalized['eq'] = bands
+
+    width = float(params.get('width', 1.0))
+    if not 0.0 <= width <= 2.0:
+        raise ValueError(f"Largeur stéréo hors bornes: {width}")
+    if width != 1.0:
+        normalized['width'] = width
+
+    pan = float(params.get('pan', 0.0))
+    if not -1.0 <= pan <= 1.0:
+        raise ValueError(f"Balance hors bornes: {pan}")
+    if pan:
+        normalized['pan'] = pan
+    return normalized
+
+
+def _frequency(value, name: str) -> float:
+    """Valide une fréquence (Hz)."""
+    try:
+        frequency = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Fréquence invalide pour {name}: {value}")
+    if not MIN_FREQUENCY <= frequency <= MAX_FREQUENCY:
+        raise ValueError(f"Fréquence hors bornes pour {name}: {frequency} Hz")
+    return frequency
+
+
+def biquad(kind: str, frequency: float, samplerate: int, gain: float = 0.0,
+           q: float = DEFAULT_Q) -> np.ndarray:
+    """
+    Calcule les coefficients d'un biquad.
+
+    Args:
+        kind: 'lowpass', 'highpass', 'peak', 'lowshelf' ou 'highshelf'
+        frequency: Fréquence de coupure ou centrale (Hz)
+        samplerate: Fréquence d'échantillonnage (Hz)
+        gain: Gain de la bande (dB, bandes de l'égaliseur uniquement)
+        q: Facteur de qualité
+
+    Returns:
+        Une section au format de sosfilt : [b0, b1, b2, 1, a1, a2]
+    """
+    frequency = min(frequency, samplerate * MAX_FREQUENCY_RATIO)
+    w0 = 2.0 * np.pi * frequency / samplerate
+    cos_w0 = np.cos(w0)
+    alpha = np.sin(w0) / (2.0 * q)
+    a = 10.0 ** (gain / 40.0)
+
+    if kind == 'lowpass':
+        b = [(1 - cos_w0) / 2, 1 - cos_w0, (1 - cos_w0) / 2]
+        den = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    elif kind == 'highpass':
+        b = [(1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2]
+        den = [1 + alpha, -2 * cos_w0, 1 - alpha]
+    elif kind == 'peak':
+        b = [1 + alpha * a, -2 * cos_w0, 1 - alpha * a]
+        den = [1 + alpha / a, -2 * cos_w0, 1 - alpha / a]
+    elif kind == 'lowshelf':
+        root = 2 * np.sqrt(a) * alpha
+        b = [a * ((a + 1) - (a - 1) * cos_w0 + root),
+             2 * a * ((a - 1) - (a + 1) * cos_w0),
+             a * ((a + 1) - (a - 1) * cos_w0 - root)]
+        den = [(a + 1) + (a - 1) * cos_w0 + root,
+               -2 * ((a - 1) + (a + 1) * cos_w0),
+               (a + 1) + (a - 1) * cos_w0 - root]
+    elif kind == 'highshelf':
+        root = 2 * np.sqrt(a) * alpha
+        b = [a * ((a + 1) + (a - 1) * cos_w0 + root),
+             -2 * a * ((a - 1) + (a + 1) * cos_w0),
+             a * ((a + 1) + (a - 1) * cos_w0 - root)]
+        den = [(a + 1) - (a - 1) * cos_w0 + root,
+               2 * ((a - 1) - (a + 1) * cos_w0),
+               (a + 1) - (a - 1) * cos_w0 - root]
+    else:
+        raise ValueError(f"Type de filtre inconnu: {kind}")
+
+    return np.array([b[0], b[1], b[2], den[0], den[1], den[2]]) / den[0]
+
+
+def filter_sections(params: Dict[str, Any], samplerate: int) -> Optional[np.ndarray]:
+    """
+    Met en cascade les filtres de paramètres validés.
+
+    Returns:
+        Un tableau (sections, 6) pour sosfilt, None sans filtre
+    """
+    sections = []
+    if 'highpass' in params:
+        sections.append(biquad('highpass', params['highpass'], samplerate))
+    for band in params.get('eq', ()):
+        sections.append(biquad(band['type'], band['freq'], samplerate, band['gain'], band['q']))
+    if 'lowpass' in params:
+        sections.append(biquad('lowpass', params['lowpass'], samplerate))
+    return np.array(sections) if sections else None
+
+
+def stereo_matrix(params: Dict[str, Any]) -> Optional[np.ndarray]:
+    """
+    Réunit largeur stéréo et balance en une matrice appliquée à droite d'un
+    bloc (trames, 2).
+
+    Returns:
+        Une matrice float32 (2, 2), None si le champ stéréo est inchangé
+    """
+    width = params.get('width', 1.0)
+    pan = params.get('pan', 0.0)
+    if width == 1.0 and not pan:
+        return None
+    # Milieu/côtés : le signal de côté (L - R) est mis à l'échelle de la largeur
+    direct, cross = (1.0 + width) / 2.0, (1.0 - width) / 2.0
+    matrix = np.array([[direct, cross], [cross, direct]])
+    # Balance : le canal opposé est atténué, le centre reste à gain unitaire
+    matrix *= [min(1.0, 1.0 - pan), min(1.0, 1.0 + pan)]
+    return matrix.astype(np.float32)
+
+
+class EffectChain:
+    """Effets d'une couche, appliqués bloc par bloc en gardant l'état des filtres."""
+
+    def __init__(self, params: Dict[str, Any], samplerate: int, channels: int,
+                 previous: Optional["EffectChain"] = None):
+        """
+        Args:
+            params: Paramètres validés (voir normalize)
+            samplerate: Fréquence d'échantillonnage (Hz)
+            channels: Nombre de canaux des blocs
+            previous: Chaîne remplacée ; son état de filtre est repris si la
+                cascade a la même forme (pas de clic quand un réglage change)
+        """
+        global _filters_warned
+
+        self.params = params
+        self.sos = filter_sections(params, samplerate)
+        self._sosfilt = _load_sosfilt() if self.sos is not None else None
+        if self.sos is not None and self._sosfilt is None:
+            if not _filters_warned:
+                print("Avertissement: scipy absent, égaliseur et filtres ignorés")
+                _filters_warned = True
+            self.sos = None
+        self.matrix = stereo_matrix(params) if channels == 2 else None
+
+        self._zi = None
+        if self.sos is not None:
+            if previous is not None and previous._zi is not None \
+                    and previous._zi.shape[0] == len(self.sos):
+                self._zi = previous._zi
+            else:
+                self._zi = np.zeros((len(self.sos), 2, channels))
+
+    @property
+    def active(self) -> bool:
+        """True si la chaîne modifie le signal."""
+        return self.sos is not None or self.matrix is not None
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """
+        Applique les effets à un bloc (thread audio).
+
+        Tous les effets sont linéaires : le bloc peut être dans l'échelle de
+        sa source (int16), le facteur de conversion est appliqué ensuite.
+
+        Args:
+            block: Bloc (trames, canaux)
+
+        Returns:
+            Un nouveau bloc float32
+        """
+        if self.sos is not None:
+            block, self._zi = self._sosfilt(self.sos, block, axis=0, zi=self._zi)
+        if self.matrix is not None:
+            block = block @ self.matrix
+        return block.astype(np.float32, copy=False)
@@ -0,0 +1,1028 @@
+# -*- coding: utf-8 -*-
+"""
+Moteur de mixage NumPy : toutes les couches sont sommées dans un seul flux.
+
+Contrairement à pygame, qui attribue un canal SDL à chaque son (32 au plus),
+le moteur lit un bloc de chaque couche, applique son gain par une
+multiplication-accumulation vectorisée dans un tampon float32 unique, puis
+écrête en douceur le résultat avant de le remettre au périphérique.
+
+Les gains forment un graphe à trois niveaux : chaque couche a son gain,
+peut être rattachée à un bus (une catégorie de sons), et le gain principal
+est appliqué une seule fois au bloc final. Une couche peut aussi porter une
+chaîne d'effets (voir effects.py), appliquée à son bloc avant son gain.
+
+Le moteur tient aussi l'horloge audio (les trames mixées hors pause) : des
+actions planifiées à une trame de cette horloge, comme le départ d'une
+transition entre presets, s'exécutent à l'échantillon près.
+"""
+
+import heapq
+import itertools
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src.audio import decoder, output
+from src.audio.cache import PcmCache, resampler
+from src.audio.effects import EffectChain
+from src.audio.generators import GeneratorSource, NoiseGenerator
+from src.audio.idle import IDLE_TIMEOUT, MEMORY_BUDGET
+from src.audio.latency import MAX_LATENCY_MS, MIN_LATENCY_MS
+from src.audio.metrics import LAYER_SMOOTHING, SUMMARY_SECONDS, BlockMetrics
+from src.audio.mixer import AudioMixer, STREAM_THRESHOLD
+from src.audio.sources import BufferSource, StreamSource
+from src.audio.streaming import StreamReader
+from src.audio.transitions import LayerSpec
+from src.audio.volume import db_ramp
+
+# Seuil au-delà duquel l'écrêtage doux entre en action
+SOFT_CLIP_THRESHOLD = 0.8
+
+# Durée des rampes appliquées aux changements de volume (évite le crépitement)
+VOLUME_RAMP_MS = 25
+
+
+def soft_clip(buffer: np.ndarray, threshold: float = SOFT_CLIP_THRESHOLD):
+    """
+    Écrête en douceur un tampon float32, sur place.
+
+    Les échantillons sous le seuil ne sont pas modifiés ; au-delà, une
+    tangente hyperbolique ramène l'amplitude dans [-1.0, 1.0].
+    """
+    if buffer.max(initial=0.0) <= threshold and buffer.min(initial=0.0) >= -threshold:
+        return
+    over = np.abs(buffer) > threshold
+    excess = np.abs(buffer[over]) - threshold
+    knee = 1.0 - threshold
+    buffer[over] = np.sign(buffer[over]) * (threshold + knee * np.tanh(excess / knee))
+
+
+class Ramp(NamedTuple):
+    """Rampe de gain demandée à un étage."""
+
+    # Gain à atteindre (None : le gain atteint au moment où la rampe part)
+    target: Optional[float]
+    # Durée en trames (0 : gain appliqué dès le bloc suivant)
+    frames: int
+    # Marquer l'étage comme terminé à la fin de la rampe
+    stop: bool = False
+    # Linéaire en décibels plutôt qu'en gain
+    db: bool = False
+
+
+class GainStage:
+    """
+    Gain linéaire avec rampe éventuelle, évalué bloc par bloc.
+
+    Les rampes sont demandées depuis n'importe quel thread : chaque demande
+    est un Ramp publié par une seule affectation. Le thread audio est seul à
+    faire avancer la rampe et à écrire le gain ; il reconnaît une nouvelle
+    demande à son identité et la fait partir du gain qu'il a atteint.
+    """
+
+    def __init__(self, gain: float = 1.0):
+        """
+        Args:
+            gain: Gain linéaire initial
+        """
+        self.gain = gain
+        self.finished = False
+        # Dernière rampe demandée (écrite par les autres threads)
+        self._ramp: Optional[Ramp] = None
+        # Rampe en cours, son départ, sa cible et sa progression (thread audio)
+        self._active: Optional[Ramp] = None
+        self._start = gain
+        self._target = gain
+        self._done = 0
+
+    @property
+    def ramping(self) -> bool:
+        """True tant qu'une rampe est demandée ou en cours."""
+        ramp = self._ramp
+        return ramp is not self._active or (ramp is not None and self._done < ramp.frames)
+
+    @property
+    def stopping(self) -> bool:
+        """True pendant un fondu de sortie qui terminera l'étage."""
+        ramp = self._ramp
+        return ramp is not None and ramp.stop
+
+    def ramp_to(self, target: float, frames: int, stop: bool = False, curve: str = 'linear'):
+        """
+        Fait évoluer le gain vers une cible, depuis le gain atteint au bloc suivant.
+
+        Args:
+            target: Gain à atteindre
+            frames: Durée de la rampe en trames
+            stop: Marquer l'étage comme terminé à la fin de la rampe
+            curve: 'linear' (linéaire en gain) ou 'db' (linéaire en décibels,
+                pour les longs fondus)
+        """
+        self._ramp = Ramp(target, max(1, frames), stop, curve == 'db')
+
+    def set_gain(self, gain: float):
+        """Définit le gain au bloc suivant, en annulant toute rampe."""
+        self._ramp = Ramp(gain, 0)
+
+    def hold(self):
+        """Fige le gain là où il en est, en annulant toute rampe (fondu de sortie compris)."""
+        self._ramp = Ramp(None, 0)
+
+    def next_gains(self, frames: int, scale: float = 1.0):
+        """
+        Retourne le gain à appliquer au prochain bloc (thread audio).
+
+        Args:
+            frames: Taille du bloc
+            scale: Facteur constant multiplié au gain
+
+        Returns:
+            Un scalaire float32, ou un tableau (frames, 1) pendant une rampe
+        """
+        ramp = self._ramp
+        if ramp is not self._active:
+            # Nouvelle demande ; la rampe en cours est marquée en dernier, une
+            # fois son état complet (lu par ramping depuis d'autres threads)
+            self._start = self.gain
+            self._target = self.gain if ramp.target is None else ramp.target
+            self._done = 0
+            if ramp.frames == 0:
+                self.gain = self._target
+            self._active = ramp
+        if ramp is None or self._done >= ramp.frames:
+            return np.float32(self.gain * scale)
+
+        count = min(frames, ramp.frames - self._done)
+        positions = np.arange(self._done + 1, self._done + count + 1) / ramp.frames
+        if ramp.db:
+            ramp_gains = db_ramp(self._start, self._target, positions)
+        else:
+            ramp_gains = self._start + (self._target - self._start) * positions
+        gains = np.full((frames, 1), self._target * scale, dtype=np.float32)
+        gains[:count, 0] = ramp_gains * scale
+        self._done += count
+        if self._done < ramp.frames:
+            self.gain = float(ramp_gains[-1])
+        else:
+            self.gain = self._target
+            if ramp.stop:
+                self.finished = True
+        return gains
+
+    @property
+    def unity(self) -> bool:
+        """True si l'étage laisse le signal inchangé (gain 1, sans rampe)."""
+        return not self.ramping and self.gain == 1.0
+
+
+class Layer(GainStage):
+    """Couche du mixage : une source, ses effets, son gain et son bus."""
+
+    def __init__(self, source, gain: float, bus: Optional[str] = None,
+                 effects: Optional[EffectChain] = None):
+        """
+        Args:
+            source: Source audio (BufferSource, StreamSource...)
+            gain: Gain linéaire de la couche
+            bus: Bus de la couche (None : directement sur la sortie)
+            effects: Chaîne d'effets (None : le bloc est mixé tel quel)
+        """
+        super().__init__(gain)
+        self.source = source
+        self.bus = bus
+        # Remplacée d'un bloc depuis n'importe quel thread
+        self.effects = effects
+        # Temps de rendu par bloc, lissé (secondes ; écrit par le thread audio)
+        self.cost = 0.0
+
+    def next_gains(self, frames: int, scale: float = 1.0):
+        """Gain du prochain bloc, avec la conversion et la normalisation de la source."""
+        return super().next_gains(frames, scale * self.source.scale * self.source.normalization)
+
+
+class Transition:
+    """Passage planifié du mix à de nouveaux gains, annulable jusqu'à son départ."""
+
+    def __init__(self, targets: Dict[str, Tuple[float, Optional[object], Optional[str]]],
+                 frames: int, effects: Optional[Dict[str, Optional[EffectChain]]] = None):
+        """
+        Args:
+            targets: Pour chaque couche à garder ou à ajouter : (gain cible,
+                source à ajouter ou None pour une couche existante, bus)
+            frames: Durée des rampes en trames
+            effects: Chaîne d'effets à poser au départ sur certaines couches
+                (None retire les effets d'une couche)
+        """
+        self.targets = targets
+        self.frames = frames
+        self.effects = effects or {}
+        # Pris une seule fois : soit au départ, soit à l'annulation
+        self._claim = threading.Lock()
+
+    def claim(self) -> bool:
+        """Réserve la transition pour son départ ; False si elle a été annulée."""
+        return self._claim.acquire(blocking=False)
+
+    def cancel(self) -> bool:
+        """
+        Annule la transition si elle n'a pas encore commencé.
+
+        Returns:
+            False si la transition a déjà commencé
+        """
+        if not self._claim.acquire(blocking=False):
+            return False
+        for _gain, source, _bus in self.targets.values():
+            if source is not None:
+                # Le thread de flux fermera le fichier d'une source en flux
+                source.finished = True
+        return True
+
+
+class MixEngine:
+    """Somme les couches actives dans un tampon float32 unique."""
+
+    def __init__(self, samplerate: int = 44100, channels: int = 2):
+        """
+        Args:
+            samplerate: Fréquence d'échantillonnage (Hz)
+            channels: Nombre de canaux de sortie
+        """
+        self.samplerate = samplerate
+        self.channels = channels
+        self.master = GainStage(1.0)
+        # Fondu de sortie du minuteur, indépendant du volume principal
+        self.fader = GainStage(1.0)
+        self.paused = False
+
+        # Bus de groupe, créés à la demande ; chacun a son tampon d'accumulation
+        self._buses: Dict[str, GainStage] = {}
+        self._bus_buffers: Dict[str, np.ndarray] = {}
+
+        # Les couches sont remplacées d'un bloc (copie sur écriture) : le
+        # thread audio itère sur un instantané sans prendre de verrou.
+        self._layers: Dict[str, Layer] = {}
+        self._write_lock = threading.Lock()
+        self._scratch = np.zeros((0, channels), dtype=np.float32)
+
+        # Horloge audio : trames mixées hors pause
+        self.clock = 0
+        # Actions planifiées : reçues de n'importe quel thread, puis rangées par
+        # le thread audio dans un tas (trame, ordre d'arrivée, action)
+        self._incoming = queue.SimpleQueue()
+        self._events: List[Tuple[int, int, Callable[[], bool]]] = []
+        self._event_order = itertools.count()
+
+        # Statistiques de coût du mixage
+        self.blocks_rendered = 0
+        self.frames_rendered = 0
+        self.last_render_time = 0.0
+        self.total_render_time = 0.0
+        # Mesures par bloc (voir metrics.py)
+        self.metrics = BlockMetrics(samplerate)
+
+    @property
+    def layers(self) -> Dict[str, Layer]:
+        """Instantané des couches actives."""
+        return self._layers
+
+    @property
+    def buses(self) -> Dict[str, GainStage]:
+        """Instantané des bus."""
+        return self._buses
+
+    def bus(self, name: str) -> GainStage:
+        """Retourne un bus, en le créant (gain 1) s'il n'existe pas."""
+        bus = self._buses.get(name)
+        if bus is None:
+            with self._write_lock:
+                bus = self._buses.get(name)
+                if bus is None:
+                    bus = GainStage(1.0)
+                    buses = dict(self._buses)
+                    buses[name] = bus
+                    self._buses = buses
+        return bus
+
+    def add_layer(self, layer_id: str, source, gain: float, bus: Optional[str] = None,
+                  effects: Optional[EffectChain] = None) -> Layer:
+        """Ajoute (ou remplace) une couche, éventuellement rattachée à un bus."""
+        if bus is not None:
+            self.bus(bus)
+        layer = Layer(source, gain, bus, effects)
+        with self._write_lock:
+            layers = dict(self._layers)
+            layers[layer_id] = layer
+            self._layers = layers
+        return layer
+
+    def remove_layer(self, layer_id: str) -> Optional[Layer]:
+        """Retire une couche et la retourne."""
+        with self._write_lock:
+            layers = dict(self._layers)
+            layer = layers.pop(layer_id, None)
+            self._layers = layers
+        return layer
+
+    def clear(self) -> Dict[str, Layer]:
+        """Retire toutes les couches et les retourne."""
+        with self._write_lock:
+            layers = self._layers
+            self._layers = {}
+        return layers
+
+    def schedule(self, frame: Optional[int], action: Callable[[], bool]):
+        """
+        Exécute une action dans le thread audio, à une trame de l'horloge.
+
+        Le bloc en cours est découpé à cette trame : ce qui la précède est
+        mixé avant l'action, la suite après. L'action ne doit pas bloquer ;
+        si elle retourne False, elle est retentée au bloc suivant.
+
+        Args:
+            frame: Trame de l'horloge (None ou déjà passée : au prochain bloc)
+            action: Fonction sans argument
+        """
+        self._incoming.put((self.clock if frame is None else frame, action))
+
+    def transition(self, targets: Dict[str, Tuple[float, Optional[object], Optional[str]]],
+                   frames: int, at: Optional[int] = None,
+                   effects: Optional[Dict[str, Optional[EffectChain]]] = None) -> Transition:
+        """
+        Planifie le passage du mix à de nouveaux gains.
+
+        Au départ, chaque couche citée est menée à son gain cible (une
+        nouvelle couche part du silence), les autres couches vers le silence,
+        où elles s'arrêtent.
+
+        Args:
+            targets: Voir Transition
+            frames: Durée des rampes en trames
+            at: Trame de départ (None : au prochain bloc)
+            effects: Voir Transition
+
+        Returns:
+            La transition, annulable tant qu'elle n'a pas commencé
+        """
+        transition = Transition(targets, frames, effects)
+        for _gain, _source, bus in targets.values():
+            if bus is not None:
+                self.bus(bus)
+        self.schedule(at, lambda: self._start_transition(transition))
+        return transition
+
+    def _start_transition(self, transition: Transition) -> bool:
+        """Applique une transition (thread audio, sans jamais bloquer)."""
+        if not self._write_lock.acquire(blocking=False):
+            return False
+        try:
+            if not transition.claim():
+                return True
+            frames = transition.frames
+            layers = dict(self._layers)
+            for layer_id, layer in layers.items():
+                if layer_id not in transition.targets and not layer.stopping:
+                    layer.ramp_to(0.0, frames, stop=True)
+            for layer_id, (gain, source, bus) in transition.targets.items():
+                layer = layers.get(layer_id)
+                if source is None:
+                    if layer is not None:
+                        layer.ramp_to(gain, frames)
+                        if layer_id in transition.effects:
+                            layer.effects = transition.effects[layer_id]
+                    continue
+                if layer is not None:
+                    layer.source.finished = True
+                layer = Layer(source, 0.0, bus, transition.effects.get(layer_id))
+                layer.ramp_to(gain, frames)
+                layers[layer_id] = layer
+            self._layers = layers
+        finally:
+            self._write_lock.release()
+        return True
+
+    def render(self, frames: int) -> np.ndarray:
+        """Rend un bloc de trames dans un nouveau tampon."""
+        out = np.empty((frames, self.channels), dtype=np.float32)
+        self.render_into(out)
+        return out
+
+    def render_into(self, out: np.ndarray, underrun: bool = False,
+                    buffered: Optional[float] = None):
+        """
+        Rend un bloc directement dans le tampon de sortie.
+
+        Args:
+            out: Tampon float32 de forme (trames, canaux)
+            underrun: Le périphérique a manqué de données avant ce bloc
+            buffered: Délai avant que le bloc soit entendu (secondes), si connu
+        """
+        start = time.perf_counter()
+        frames = len(out)
+
+        if self.paused:
+            out.fill(0.0)
+        else:
+            self._take_events()
+            deferred = []
+            offset = 0
+            while offset < frames:
+                end = frames
+                if self._events:
+                    self._run_due_events(deferred)
+                    if self._events:
+                        end = min(frames, offset + self._events[0][0] - self.clock)
+                self._mix(out[offset:end])
+                self.clock += end - offset
+                offset = end
+            for event in deferred:
+                heapq.heappush(self._events, event)
+
+        elapsed = time.perf_counter() - start
+        self.blocks_rendered += 1
+        self.frames_rendered += frames
+        self.last_render_time = elapsed
+        self.total_render_time += elapsed
+        self.metrics.record(elapsed, frames, underrun, buffered)
+
+    def _take_events(self):
+        """Range les actions nouvellement planifiées (thread audio uniquement)."""
+        while True:
+            try:
+                frame, action = self._incoming.get_nowait()
+            except queue.Empty:
+                return
+            heapq.heappush(self._events, (frame, next(self._event_order), action))
+
+    def _run_due_events(self, deferred: list):
+        """Exécute les actions arrivées à échéance ; celles à retenter vont dans deferred."""
+        while self._events and self._events[0][0] <= self.clock:
+            event = heapq.heappop(self._events)
+            try:
+                done = event[2]()
+            except Exception as e:
+                print(f"Erreur lors d'une action planifiée du moteur: {e}")
+                done = True
+            if done is False:
+                deferred.append(event)
+
+    def _mix(self, out: np.ndarray):
+        """Mixe les couches actives dans un tampon (thread audio uniquement)."""
+        frames = len(out)
+        out.fill(0.0)
+        if len(self._scratch) < frames:
+            self._scratch = np.zeros((frames, self.channels), dtype=np.float32)
+        scratch = self._scratch[:frames]
+
+        layers = self._layers
+        buses = self._buses
+        # Les couches d'un bus à gain non unitaire sont d'abord accumulées à part
+        gained = {name for name, bus in buses.items() if not bus.unity}
+        mixed: Dict[str, np.ndarray] = {}
+        for layer in layers.values():
+            if layer.finished:
+                continue
+            layer_start = time.perf_counter()
+            try:
+                block = layer.source.read(frames)
+                if layer.effects is not None:
+                    if block.shape[1] != self.channels:
+                        # Source mono : les effets travaillent sur chaque canal
+                        block = np.repeat(block, self.channels, axis=1)
+                    block = layer.effects.process(block)
+            except Exception as e:
+                # Source fermée ou illisible : la couche se tait, le flux de
+                # sortie continue avec les autres
+                print(f"Erreur lors du rendu de la couche: {e}")
+                layer.finished = True
+                continue
+            # Un bloc mono est étendu à tous les canaux par la multiplication
+            np.multiply(block, layer.next_gains(frames), out=scratch)
+            if layer.bus not in gained:
+                out += scratch
+            elif layer.bus in mixed:
+                mixed[layer.bus] += scratch
+            else:
+                mixed[layer.bus] = self._bus_buffer(layer.bus, frames)
+                np.copyto(mixed[layer.bus], scratch)
+            layer.cost += (time.perf_counter() - layer_start - layer.cost) * LAYER_SMOOTHING
+
+        for name in gained:
+            gains = buses[name].next_gains(frames)
+            if name in mixed:
+                mixed[name] *= gains
+                out += mixed[name]
+
+        # Gain principal et fondu du minuteur : une seule multiplication, sur le bloc final
+        if not self.fader.unity:
+            out *= self.master.next_gains(frames) * self.fader.next_gains(frames)
+        elif not self.master.unity:
+            out *= self.master.next_gains(frames)
+        soft_clip(out)
+        self._prune(layers)
+
+    def _bus_buffer(self, name: str, frames: int) -> np.ndarray:
+        """Tampon d'accumulation d'un bus (thread audio uniquement)."""
+        buffer = self._bus_buffers.get(name)
+        if buffer is None or len(buffer) < frames:
+            buffer = np.zeros((frames, self.channels), dtype=np.float32)
+            self._bus_buffers[name] = buffer
+        return buffer[:frames]
+
+    def average_render_time(self) -> float:
+        """Temps moyen de rendu d'un bloc (secondes)."""
+        return self.total_render_time / self.blocks_rendered if self.blocks_rendered else 0.0
+
+    def _prune(self, layers: Dict[str, Layer]):
+        """Retire les couches terminées sans jamais bloquer le thread audio."""
+        finished = [layer_id for layer_id, layer in layers.items() if layer.finished]
+        if finished and self._write_lock.acquire(blocking=False):
+            try:
+                remaining = dict(self._layers)
+                for layer_id in finished:
+                    if remaining.get(layer_id) is layers[layer_id]:
+                        del remaining[layer_id]
+                        # Le thread de flux fermera le fichier d'une source en flux
+                        layers[layer_id].source.finished = True
+                self._layers = remaining
+            finally:
+                self._write_lock.release()
+
+
+class EngineMixer(AudioMixer):
+    """Mixeur audio utilisant le moteur NumPy et un flux de sortie unique."""
+
+    applies_effects = True
+
+    def __init__(self, frequency=44100, size=-16, channels=2, buffer=512,
+                 stream_threshold=STREAM_THRESHOLD, cache: Optional[PcmCache] = None,
+                 idle_timeout: float = IDLE_TIMEOUT, memory_budget: int = MEMORY_BUDGET,
+                 normalize_loudness: bool = True, adaptive_buffer: bool = False,
+                 latency_bounds: Tuple[float, float] = (MIN_LATENCY_MS, MAX_LATENCY_MS),
+                 native_rate: bool = False):
+        """
+        Initialise le moteur ; le flux de sortie est ouvert au premier son.
+
+        Args:
+            frequency: Fréquence d'échantillonnage (Hz)
+            size: Ignoré, le mixage se fait en float32
+            channels: Nombre de canaux (1=mono, 2=stereo)
+            buffer: Taille du bloc demandé par le périphérique
+            stream_threshold: Taille de fichier (octets) à partir de laquelle
+                un son est lu en flux plutôt que préchargé
+            cache: Cache du PCM décodé (cache utilisateur par défaut)
+            idle_timeout: Délai (secondes) après lequel le flux de sortie est
+                fermé quand rien n'est audible, 0 pour le garder ouvert
+            memory_budget: PCM décodé (octets) gardé pour les sons arrêtés
+            normalize_loudness: Ramener les sons à une sonie commune
+            adaptive_buffer: Agrandir les blocs en cas de coupures, les
+                réduire quand la sortie est stable (voir latency.py)
+            latency_bounds: Durées minimale et maximale d'un bloc (ms)
+            native_rate: Mixer à la fréquence native du périphérique de
+                sortie ; frequency ne sert que si elle ne peut être lue
+        """
+        if native_rate:
+            frequency = output.native_samplerate() or frequency
+        super().__init__(frequency, size, channels, buffer, stream_threshold, cache,
+                         idle_timeout, memory_budget, normalize_loudness, adaptive_buffer,
+                         latency_bounds, native_rate)
+        # Ici, sounds garde le PCM (np.ndarray) et streams des StreamSource
+        self.engine = MixEngine(frequency, channels)
+        self.output = output.OutputStream(self.engine, frequency, channels, self.buffer)
+        self._transition: Optional[Transition] = None
+
+    def play_sound(self, sound_id: str, file_path: str, volume: float = 0.5,
+                   mode: str = 'auto', category: Optional[str] = None) -> bool:
+        """
+        Joue un son en boucle en l'ajoutant comme couche du moteur.
+
+        Args:
+            sound_id: Identifiant unique du son
+            file_path: Chemin vers le fichier audio
+            volume: Volume initial (0.0 - 1.0)
+            mode: 'stream', 'preload' ou 'auto'
+            category: Catégorie du son ; la couche est rattachée à son bus
+
+        Returns:
+            True si le son a été lancé avec succès
+        """
+        self.idle.activity()
+        self._assign(sound_id, volume, category)
+        try:
+            if not Path(file_path).exists():
+                print(f"Erreur: Fichier audio introuvable: {file_path}")
+                return False
+
+            self._ensure_device()
+            self.stop_sound(sound_id)
+            source = self._open_source(sound_id, file_path, mode)
+            if source is None:
+                return False
+
+            self.engine.add_layer(sound_id, source, volume, bus=category,
+                                  effects=self._effect_chain(sound_id))
+            return True
+
+        except Exception as e:
+            print(f"Erreur lors de la lecture du son {sound_id}: {e}")
+            return False
+
+    def play_generator(self, sound_id: str, kind: str, volume: float = 0.5,
+                       category: Optional[str] = None) -> bool:
+        """
+        Joue un bruit synthétisé par le thread audio, bloc par bloc.
+
+        Args:
+            sound_id: Identifiant unique du son
+            kind: Type de bruit (voir generators.NOISE_TYPES)
+            volume: Volume initial (0.0 - 1.0)
+            category: Catégorie du son ; la couche est rattachée à son bus
+
+        Returns:
+            True si le son a été lancé avec succès
+        """
+        self.idle.activity()
+        self._assign(sound_id, volume, category)
+        try:
+            self._ensure_device()
+            self.stop_sound(sound_id)
+            self.normalization.pop(sound_id, None)
+            generator = NoiseGenerator(kind, self.frequency, self.num_channels)
+            self.engine.add_layer(sound_id, GeneratorSource(generator), volume, bus=category,
+                                  effects=self._effect_chain(sound_id))
+            return True
+        except Exception as e:
+            print(f"Erreur lors de la lecture du son {sound_id}: {e}")
+            return False
+
+    def _open_source(self, sound_id: str, file_path: str, mode: str):
+        """
+        Prépare la source d'un fichier : tampon de flux rempli, ou PCM préchargé.
+
+        Returns:
+            La source, ou None si le son n'a pas pu être chargé
+        """
+        self._update_normalization(sound_id, file_path)
+        if self.should_stream(file_path, mode):
+            reader = StreamReader(file_path, channels=self.num_channels,
+                                  loop=self.loops.get(file_path))
+            source = StreamSource(reader)
+            with self._streams_lock:
+                self.streams[sound_id] = source
+            self._ensure_stream_thread()
+        elif self._preload(sound_id, file_path):
+            source = BufferSource(self.sounds[sound_id])
+        else:
+            return None
+        source.normalization = self.normalization_gain(sound_id)
+        return source
+
+    def clock(self) -> int:
+        """Retourne la position de l'horloge audio du moteur, en trames."""
+        return self.engine.clock
+
+    def crossfade(self, layers: Dict[str, LayerSpec], duration_ms: int = 1000,
+                  at: Optional[int] = None) -> bool:
+        """
+        Mène chaque son à son volume cible, et les autres sons vers le silence.
+
+        Les sources des sons à ajouter sont préparées ici, hors du thread
+        audio ; le moteur démarre toutes les rampes à la même trame. Une
+        transition pas encore commencée est remplacée.
+
+        Args:
+            layers: Sons à atteindre
+            duration_ms: Durée du fondu en millisecondes
+            at: Trame de l'horloge (voir clock) à laquelle commencer ;
+                None pour commencer au prochain bloc
+
+        Returns:
+            True si tous les sons ont pu être préparés
+        """
+        self.idle.activity()
+        try:
+            self._ensure_device()
+        except Exception as e:
+            print(f"Erreur lors de l'ouverture du périphérique audio: {e}")
+            return False
+        if self._transition is not None:
+            self._transition.cancel()
+
+        targets = {}
+        chains = {}
+        for sound_id, spec in layers.items():
+            self._assign(sound_id, spec.volume, spec.category)
+            self.volume_updates.discard(sound_id)
+            if spec.effects is not None:
+                try:
+                    self._store_effects(sound_id, spec.effects)
+                except ValueError as e:
+                    print(f"Erreur: Effets invalides pour {sound_id}: {e}")
+            layer = self.engine.layers.get(sound_id)
+            if layer is not None and not layer.finished:
+                if layer.stopping:
+                    # Interrompt son fondu de sortie en attendant la transition
+                    layer.hold()
+                targets[sound_id] = (spec.volume, None, None)
+                if spec.effects is not None:
+                    chains[sound_id] = self._effect_chain(sound_id, layer.effects)
+                continue
+
+            self.stop_sound(sound_id)
+            try:
+                if spec.generator:
+                    generator = NoiseGenerator(spec.generator, self.frequency, self.num_channels)
+                    source = GeneratorSource(generator)
+                elif Path(spec.file).exists():
+                    source = self._open_source(sound_id, spec.file, spec.mode)
+                else:
+                    print(f"Erreur: Fichier audio introuvable: {spec.file}")
+                    source = None
+            except Exception as e:
+                print(f"Erreur lors de la lecture du son {sound_id}: {e}")
+                source = None
+            if source is not None:
+                targets[sound_id] = (spec.volume, source, spec.category)
+                chains[sound_id] = self._effect_chain(sound_id)
+
+        self._transition = self.engine.transition(targets, self._ms_to_frames(duration_ms), at,
+                                                  chains)
+        # Une transition vers un preset vide rend le mixeur inactif
+        delay = 0.0 if at is None else max(0, at - self.clock()) / self.frequency
+        self.idle.check(delay + duration_ms / 1000.0)
+        return len(targets) == len(layers)
+
+    def _open_device(self):
+        """Ouvre le flux de sortie."""
+        self.output.start()
+        self.buffer_tuner.start()
+
+    def _close_device(self):
+        """Ferme le flux de sortie."""
+        self.output.close()
+
+    def _suspend_device(self):
+        """
+        Ferme le flux de sortie inactif.
+
+        Les couches en pause restent dans le moteur : la reprise les poursuit
+        là où elles se sont arrêtées.
+        """
+        self._close_device()
+
+    def _resume_device(self):
+        """Rien à relancer : les couches sont restées dans le moteur."""
+
+    def set_buffer(self, frames: int):
+        """
+        Change la taille des blocs de sortie.
+
+        Un flux ouvert est rouvert avec la nouvelle taille ; les couches
+        restent dans le moteur et reprennent là où elles en étaient.
+
+        Args:
+            frames: Taille des blocs (trames)
+        """
+        with self._device_lock:
+            self.buffer = frames
+            self.output.blocksize = frames
+            if not self.device_open:
+                return
+            self.output.close()
+            try:
+                self.output.start()
+            except Exception as e:
+                # Rouvert au prochain son
+                print(f"Erreur lors de la réouverture du flux de sortie: {e}")
+                self.device_open = False
+
+    def should_stream(self, file_path: str, mode: str = 'auto') -> bool:
+        """Détermine si un fichier doit être lu en flux (voir AudioMixer)."""
+        if mode == 'preload' or not decoder.is_available():
+            return False
+        if mode == 'auto' and Path(file_path).stat().st_size < self.stream_threshold:
+            return False
+        info = decoder.probe(file_path)
+        return info is not None and info.samplerate == self.frequency
+
+    def _load_sound(self, sound_path: Path) -> np.ndarray:
+        """
+        Charge un fichier au format du moteur, projeté depuis le cache de PCM décodé.
+
+        Un fichier mono (ou à canaux identiques) reste sur un seul canal :
+        le moteur l'étend aux autres au mixage.
+        """
+        return self.cache.load(str(sound_path), self.frequency, self.num_channels,
+                               loop=self.loops.get(str(sound_path)), pool=resampler(),
+                               mono=True)
+
+    def stop_sound(self, sound_id: str):
+        """Arrête un son spécifique."""
+        self.volume_updates.discard(sound_id)
+        layer = self.engine.remove_layer(sound_id)
+        if layer is not None:
+            layer.source.stop()
+        with self._streams_lock:
+            self.streams.pop(sound_id, None)
+        self.idle.trim()
+        self.idle.check()
+
+    def set_volume(self, sound_id: str, volume: float):
+        """
+        Définit le volume d'un son spécifique, par une courte rampe.
+
+        Args:
+            sound_id: Identifiant du son
+            volume: Nouveau volume (0.0 - 1.0)
+        """
+        self.volumes[sound_id] = volume
+        layer = self.engine.layers.get(sound_id)
+        if layer is not None and not layer.stopping:
+            layer.ramp_to(volume, self._ms_to_frames(VOLUME_RAMP_MS))
+
+    def _apply_normalization(self, sound_id: str):
+        """Applique le gain de normalisation d'un son à sa couche, au bloc suivant."""
+        layer = self.engine.layers.get(sound_id)
+        if layer is not None:
+            layer.source.normalization = self.normalization_gain(sound_id)
+
+    def _apply_effects(self, sound_id: str):
+        """Remplace la chaîne d'effets de la couche d'un son, au bloc suivant."""
+        layer = self.engine.layers.get(sound_id)
+        if layer is not None:
+            layer.effects = self._effect_chain(sound_id, layer.effects)
+
+    def _effect_chain(self, sound_id: str,
+                      previous: Optional[EffectChain] = None) -> Optional[EffectChain]:
+        """Construit la chaîne d'effets d'un son ; None s'il n'en a pas."""
+        params = self.effects.get(sound_id)
+        if not params:
+            return None
+        chain = EffectChain(params, self.frequency, self.num_channels, previous)
+        return chain if chain.active else None
+
+    def set_category_volume(self, category: str, volume: float):
+        """
+        Définit le volume de groupe d'une catégorie, appliqué une fois à son bus.
+
+        Args:
+            category: Catégorie (clé 'category' de SOUNDS_DATA)
+            volume: Nouveau volume du groupe (0.0 - 1.0)
+        """
+        self.category_volumes[category] = max(0.0, min(1.0, volume))
+        self.engine.bus(category).ramp_to(self.category_volumes[category],
+                                          self._ms_to_frames(VOLUME_RAMP_MS))
+
+    def set_master_volume(self, volume: float):
+        """
+        Définit le volume principal, appliqué une seule fois en sortie du moteur.
+
+        Args:
+            volume: Nouveau volume principal (0.0 - 1.0)
+        """
+        self.master_volume = max(0.0, min(1.0, volume))
+        self.engine.master.ramp_to(self.master_volume, self._ms_to_frames(VOLUME_RAMP_MS))
+
+    def pause_all(self):
+        """Met en pause tous les sons."""
+        self.engine.paused = True
+        self.paused = True
+        self.idle.check()
+
+    def resume_all(self):
+        """Reprend tous les sons en pause."""
+        self.idle.activity()
+        self.engine.paused = False
+        self.paused = False
+        if self.engine.layers:
+            # Rouvre le flux fermé pendant la pause
+            self._ensure_device()
+
+    def stop_all(self):
+        """Arrête tous les sons."""
+        for layer in self.engine.clear().values():
+            layer.source.stop()
+        with self._streams_lock:
+            self.streams.clear()
+        self.idle.trim()
+        self.idle.check()
+
+    def is_playing(self, sound_id: str) -> bool:
+        """
+        Vérifie si un son est en cours de lecture.
+
+        Args:
+            sound_id: Identifiant du son
+
+        Returns:
+            True si le son est une couche active du moteur
+        """
+        layer = self.engine.layers.get(sound_id)
+        return layer is not None and not layer.finished
+
+    def get_resident_bytes(self, sound_id: str) -> int:
+        """
+        Retourne la taille du PCM décodé gardé en mémoire pour un son.
+
+        Args:
+            sound_id: Identifiant du son
+
+        Returns:
+            Nombre d'octets (un PCM partagé est réparti entre ses sons)
+        """
+        if sound_id in self.streams:
+            return self.streams[sound_id].resident_bytes
+        if sound_id in self.sounds:
+            return self.sounds[sound_id].nbytes // self._sharers(sound_id)
+        return 0
+
+    def fade_out(self, sound_id: str, duration_ms: int = 1000):
+        """
+        Effectue un fondu de sortie sur un son.
+
+        Args:
+            sound_id: Identifiant du son
+            duration_ms: Durée du fondu en millisecondes
+        """
+        layer = self.engine.layers.get(sound_id)
+        if layer is not None:
+            layer.ramp_to(0.0, self._ms_to_frames(duration_ms), stop=True)
+        self.idle.check(duration_ms / 1000.0)
+
+    def fade_out_all(self, duration_ms: int = 1000):
+        """Effectue un fondu de sortie sur tous les sons."""
+        for layer in self.engine.layers.values():
+            layer.ramp_to(0.0, self._ms_to_frames(duration_ms), stop=True)
+        self.idle.check(duration_ms / 1000.0)
+
+    def get_engine_stats(self) -> Dict[str, float]:
+        """Retourne le coût du mixage mesuré par le moteur."""
+        return {
+            'layers': len(self.engine.layers),
+            'blocks': self.engine.blocks_rendered,
+            'last_block_ms': self.engine.last_render_time * 1000.0,
+            'average_block_ms': self.engine.average_render_time() * 1000.0,
+            'underruns': self.output.underruns,
+        }
+
+    def get_audio_metrics(self, seconds: float = SUMMARY_SECONDS) -> Optional[dict]:
+        """
+        Retourne les mesures du thread audio sur les dernières secondes.
+
+        Args:
+            seconds: Durée d'audio couverte
+
+        Returns:
+            Le résumé de BlockMetrics.summary, complété par 'layers' : pour
+            chaque couche, son temps de rendu par bloc ('ms', lissé) et sa
+            part du rendu moyen ('share') ; et par 'buffer', l'état du réglage
+            de la taille des blocs (voir BufferTuner.get_stats)
+        """
+        metrics = self.engine.metrics.summary(seconds)
+        render = metrics['render_ms']['mean'] / 1000.0 if metrics['blocks'] else 0.0
+        metrics['layers'] = {
+            layer_id: {
+                'ms': layer.cost * 1000.0,
+                'share': min(1.0, layer.cost / render) if render else 0.0,
+            }
+            for layer_id, layer in self.engine.layers.items()
+        }
+        metrics['buffer'] = self.buffer_tuner.get_stats()
+        return metrics
+
+    def fade_output(self, duration_ms: int, at: Optional[int] = None):
+        """
+        Fond toute la sortie vers le silence (voir AudioMixer.fade_output).
+
+        Le fondu est appliqué par le moteur, à l'échantillon près, sur un
+        étage placé après le gain principal.
+        """
+        self._output_fade_generation += 1
+        generation = self._output_fade_generation
+        frames = self._ms_to_frames(duration_ms)
+
+        def start():
+            if generation == self._output_fade_generation:
+                self.engine.fader.ramp_to(0.0, frames, curve='db')
+        self.engine.schedule(at, start)
+
+    def restore_output(self):
+        """Annule le fondu de sortie et rétablit le gain de sortie."""
+        self._output_fade_generation += 1
+        if not self.engine.fader.unity:
+            self.engine.fader.ramp_to(1.0, self._ms_to_frames(VOLUME_RAMP_MS))
+
+    def _cancel_fades(self):
+        """Annule la transition et le fondu de sortie planifiés ou en cours."""
+        if self._transition is not None:
+            self._transition.cancel()
+        self._output_fade_generation += 1
+        self.engine.fader.set_gain(1.0)
+
+    def _ms_to_frames(self, duration_ms: int) -> int:
+        return int(self.frequency * duration_ms / 1000)
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+Générateurs de bruit procéduraux.
+
+Le bruit est synthétisé bloc par bloc avec NumPy : aucun fichier à lire, une
+mémoire constante et aucune période de répétition audible, contrairement à
+un enregistrement bouclé. Chaque canal reçoit un bruit indépendant.
+
+- blanc : échantillons gaussiens indépendants ;
+- rose : algorithme de Voss-McCartney (-3 dB par octave) ;
+- brun : intégration du bruit blanc avec fuite (-6 dB par octave).
+"""
+
+from typing import Optional
+
+import numpy as np
+
+# Générateurs disponibles
+NOISE_TYPES = {
+    'white': "Bruit blanc",
+    'pink': "Bruit rose",
+    'brown': "Bruit brun",
+}
+
+# Niveau efficace visé, proche de celui des sons enregistrés
+TARGET_RMS = 0.12
+
+# Nombre de rangées de l'algorithme de Voss-McCartney
+PINK_ROWS = 16
+
+# Fréquence de coupure de la fuite du bruit brun (Hz)
+BROWN_CUTOFF = 20.0
+
+# Taille maximale d'un sous-bloc du bruit brun (borne les facteurs a**-n)
+BROWN_SUBBLOCK = 2048
+
+# Taille des blocs remis à pygame
+CHUNK_FRAMES = 8192
+
+
+class NoiseGenerator:
+    """Synthétise un bruit coloré, bloc par bloc, à mémoire constante."""
+
+    def __init__(self, kind: str, samplerate: int = 44100, channels: int = 2,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            kind: 'white', 'pink' ou 'brown' (voir NOISE_TYPES)
+            samplerate: Fréquence d'échantillonnage (Hz)
+            channels: Nombre de canaux
+            seed: Graine du générateur aléatoire (None : imprévisible)
+        """
+        if kind not in NOISE_TYPES:
+            raise ValueError(f"Générateur de bruit inconnu: {kind}")
+        self.kind = kind
+        self.samplerate = samplerate
+        self.channels = channels
+        self._rng = np.random.default_rng(seed)
+
+        # État du bruit rose : valeur courante de chaque rangée, compteur de trames
+        self._rows = self._rng.standard_normal((PINK_ROWS, channels), dtype=np.float32)
+        self._counter = 0
+        # État du bruit brun : sortie de l'intégrateur
+        self._leak = np.exp(-2.0 * np.pi * BROWN_CUTOFF / samplerate)
+        self._level = np.zeros(channels)
+
+        self._gain = TARGET_RMS * {
+            'white': 1.0,
+            'pink': 1.0 / np.sqrt(PINK_ROWS + 1),
+            'brown': np.sqrt(1.0 - self._leak ** 2),
+        }[kind]
+
+    @property
+    def resident_bytes(self) -> int:
+        """Taille de l'état du générateur."""
+        return self._rows.nbytes + self._level.nbytes
+
+    def generate(self, frames: int) -> np.ndarray:
+        """
+        Synthétise les trames suivantes.
+
+        Returns:
+            Un tableau float32 de forme (frames, channels)
+        """
+        if self.kind == 'white':
+            noise = self._rng.standard_normal((frames, self.channels), dtype=np.float32)
+        elif self.kind == 'pink':
+            noise = self._pink(frames)
+        else:
+            noise = self._brown(frames)
+        return (noise * self._gain).astype(np.float32)
+
+    def _pink(self, frames: int) -> np.ndarray:
+        """
+        Voss-McCartney vectorisé.
+
+        À la trame n, seule la rangée k = nombre de zéros terminaux de n est
+        tirée à nouveau (une trame sur 2**(k+1)). La somme des rangées évolue
+        donc d'un écart par trame : une somme cumulée de ces écarts remplace
+        la boucle sur les trames.
+        """
+        index = np.arange(frames)
+        counter = self._counter + index
+        lowest = counter & -counter
+        updated = (lowest > 0) & (lowest < (1 << PINK_ROWS))
+        positions = index[updated]
+        rows = np.log2(lowest[updated]).astype(np.intp)
+
+        drawn = np.zeros((frames, self.channels), dtype=np.float32)
+        drawn[positions] = self._rng.standard_normal((len(positions), self.channels),
+                                                     dtype=np.float32)
+        # Valeur remplacée : tirage précédent de la même rangée, dans le bloc ou avant
+        previous = positions - (2 << rows)
+        replaced = np.where((previous >= 0)[:, None], drawn[np.maximum(previous, 0)],
+                            self._rows[rows])
+
+        steps = np.zeros((frames, self.channels))
+        steps[positions] = drawn[positions] - replaced
+        noise = self._rows.sum(axis=0, dtype=np.float64) + np.cumsum(steps, axis=0)
+
+        # Dernier tirage de chaque rangée mise à jour
+        last = len(rows) - 1 - np.unique(rows[::-1], return_index=True)[1]
+        self._rows[rows[last]] = drawn[positions[last]]
+        self._counter += frames
+        return noise + self._rng.standard_normal((frames, self.channels), dtype=np.float32)
+
+    def _brown(self, frames: int) -> np.ndarray:
+        """
+        Intégrateur à fuite y[n] = a * y[n-1] + x[n], vectorisé par sous-blocs.
+
+        Sur un sous-bloc, y[n] = a**n * (y[-1] * a + somme des a**-j * x[j]) :
+        une somme cumulée remplace la récurrence.
+        """
+        noise = np.empty((frames, self.channels))
+        for start in range(0, frames, BROWN_SUBBLOCK):
+            count = min(BROWN_SUBBLOCK, frames - start)
+            white = self._rng.standard_normal((count, self.channels))
+            powers = self._leak ** np.arange(count)[:, None]
+            block = powers * (self._level * self._leak + np.cumsum(white / powers, axis=0))
+            noise[start:start + count] = block
+            self._level = block[-1]
+        return noise
+
+
+class GeneratorSource:
+    """Source du moteur NumPy synthétisant un bruit à la volée."""
+
+    def __init__(self, generator: NoiseGenerator):
+        """
+        Args:
+            generator: Générateur de bruit
+        """
+        self.generator = generator
+        self.scale = 1.0
+        self.normalization = 1.0
+        self.finished = False
+
+    @property
+    def resident_bytes(self) -> int:
+        """Taille de l'état du générateur."""
+        return self.generator.resident_bytes
+
+    def read(self, frames: int) -> np.ndarray:
+        """Synthétise les trames suivantes."""
+        return self.generator.generate(frames)
+
+    def pump(self):
+        """Rien à préparer : la synthèse se fait à la demande."""
+
+    def stop(self):
+        """Rien à libérer."""
+        self.finished = True
+
+
+class GeneratorReader:
+    """Adapte un générateur à StreamingPlayback (blocs int16 pour pygame)."""
+
+    def __init__(self, generator: NoiseGenerator, chunk_frames: int = CHUNK_FRAMES):
+        """
+        Args:
+            generator: Générateur de bruit
+            chunk_frames: Taille des blocs remis à pygame
+        """
+        self.generator = generator
+        self.channels = generator.channels
+        self.samplerate = generator.samplerate
+        self.chunk_frames = chunk_frames
+
+    @property
+    def resident_bytes(self) -> int:
+        """Taille de l'état du générateur."""
+        return self.generator.resident_bytes
+
+    def read(self, frames: int) -> np.ndarray:
+        """Synthétise les trames suivantes au format int16."""
+        block = np.clip(self.generator.generate(frames), -1.0, 1.0)
+        return (block * 32767.0).astype(np.int16)
+
+    def fill(self):
+        """Rien à pré-décoder."""
+
+    def close(self):
+        """Rien à fermer."""
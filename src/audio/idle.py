@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Libération des ressources audio pendant l'inactivité.
+
+L'application passe ses journées dans la barre des tâches : garder le
+périphérique ouvert et tout le PCM décodé en mémoire pendant une pause de
+plusieurs heures n'a pas de sens. Le gestionnaire d'inactivité ferme le
+périphérique quand rien n'est audible depuis un délai donné (la reprise, ou
+le prochain son, le rouvre de façon transparente) et garde le PCM décodé des
+sons arrêtés sous un budget mémoire, en évinçant les moins récemment joués.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Délai d'inactivité avant la fermeture du périphérique (secondes, 0 : jamais)
+IDLE_TIMEOUT = 60
+
+# PCM décodé gardé en mémoire pour les sons arrêtés (octets)
+MEMORY_BUDGET = 256 * 1024 * 1024
+
+
+class IdleManager:
+    """Ferme le périphérique inactif et évince le PCM décodé au-delà d'un budget."""
+
+    def __init__(self, mixer, timeout: float = IDLE_TIMEOUT, budget: int = MEMORY_BUDGET):
+        """
+        Args:
+            mixer: Mixeur (sounds, device_open, suspend, get_resident_bytes...)
+            timeout: Délai d'inactivité avant la fermeture du périphérique
+                (secondes, 0 pour ne jamais le fermer)
+            budget: Taille maximale du PCM décodé des sons arrêtés (octets)
+        """
+        self.mixer = mixer
+        self.timeout = timeout
+        self.budget = budget
+        # Périphérique fermé pour inactivité, pas encore rouvert
+        self.suspended = False
+
+        # Sons chargés, du moins au plus récemment joué
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        # Réentrant : la fermeture arrête les sons, ce qui rappelle check()
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        # Incrémenté à chaque activité : un délai armé avant est périmé
+        self._generation = 0
+
+        # Compteurs
+        self.suspensions = 0
+        self.resumes = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.last_resume_time = 0.0
+        self.total_resume_time = 0.0
+
+    def configure(self, timeout: Optional[float] = None, budget: Optional[int] = None):
+        """Change le délai d'inactivité et/ou le budget mémoire."""
+        if timeout is not None:
+            self.timeout = timeout
+        if budget is not None:
+            self.budget = budget
+            self.trim()
+        self.check()
+
+    def activity(self):
+        """Signale une lecture : le délai d'inactivité en cours est annulé."""
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def check(self, delay: float = 0.0):
+        """
+        Signale que la lecture s'est peut-être arrêtée (arrêt, pause, fondu).
+
+        Le périphérique sera fermé après le délai d'inactivité si rien n'est
+        redevenu audible entre-temps.
+
+        Args:
+            delay: Temps avant que l'arrêt ne soit effectif (durée d'un fondu)
+        """
+        with self._lock:
+            self._generation += 1
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self.timeout <= 0 or not self.mixer.device_open:
+                return
+            self._timer = threading.Timer(self.timeout + delay, self._expire,
+                                          args=(self._generation,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def stop(self):
+        """Annule le délai en cours (nettoyage du mixeur)."""
+        self.activity()
+
+    def used(self, sound_id: str):
+        """Marque un son chargé comme le plus récemment joué."""
+        with self._lock:
+            self._recent.pop(sound_id, None)
+            self._recent[sound_id] = None
+
+    def forget(self, sound_id: str):
+        """Oublie un son dont le PCM a été libéré."""
+        with self._lock:
+            self._recent.pop(sound_id, None)
+
+    def trim(self, budget: Optional[int] = None) -> int:
+        """
+        Évince le PCM des sons arrêtés, du moins récemment joué, jusqu'au budget.
+
+        Args:
+            budget: Budget à respecter (par défaut celui du gestionnaire)
+
+        Returns:
+            Nombre d'octets libérés
+        """
+        budget = self.budget if budget is None else budget
+        mixer = self.mixer
+        # Le PCM des sons en lecture n'est pas compté : il ne peut être évincé
+        sizes = {sound_id: mixer.get_resident_bytes(sound_id) for sound_id in list(mixer.sounds)
+                 if not mixer.is_playing(sound_id)}
+        total = sum(sizes.values())
+        if total <= budget:
+            return 0
+
+        with self._lock:
+            candidates = [sound_id for sound_id in self._recent if sound_id in sizes]
+        # Un son chargé sans être passé par used() est le premier évincé
+        candidates = [sound_id for sound_id in sizes if sound_id not in self._recent] + candidates
+        freed = 0
+        for sound_id in candidates:
+            if total <= budget:
+                break
+            if mixer.is_playing(sound_id) or mixer.sounds.pop(sound_id, None) is None:
+                continue
+            self.forget(sound_id)
+            total -= sizes[sound_id]
+            freed += sizes[sound_id]
+            self.evictions += 1
+        self.evicted_bytes += freed
+        return freed
+
+    def resumed(self, duration: float):
+        """Enregistre la réouverture du périphérique après une fermeture pour inactivité."""
+        self.suspended = False
+        self.resumes += 1
+        self.last_resume_time = duration
+        self.total_resume_time += duration
+
+    def get_stats(self) -> Dict[str, float]:
+        """Retourne l'état du gestionnaire et ses compteurs."""
+        return {
+            'idle_timeout': self.timeout,
+            'memory_budget': self.budget,
+            'device_open': self.mixer.device_open,
+            'suspended': self.suspended,
+            'resident_bytes': sum(self.mixer.get_memory_report().values()),
+            'suspensions': self.suspensions,
+            'resumes': self.resumes,
+            'evictions': self.evictions,
+            'evicted_bytes': self.evicted_bytes,
+            'last_resume_ms': self.last_resume_time * 1000.0,
+            'average_resume_ms': (self.total_resume_time / self.resumes * 1000.0
+                                  if self.resumes else 0.0),
+        }
+
+    def _expire(self, generation: int):
+        """Fin du délai d'inactivité (thread du délai)."""
+        with self._lock:
+            if generation != self._generation or self.suspended:
+                return
+            self._timer = None
+            if not self.mixer.suspend():
+                return
+            self.suspended = True
+            self.suspensions += 1
+        # Le PCM des sons arrêtés est rechargé (depuis le cache) à leur prochaine lecture
+        self.trim(0)
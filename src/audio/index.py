@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Index JSON de résultats d'analyse par fichier audio.
+
+Chaque entrée garde l'empreinte du fichier analysé (date de modification et
+taille) : une entrée n'est rendue que si le fichier n'a pas changé, ce qui
+permet de ne ré-analyser que les fichiers modifiés ou nouveaux.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class FileIndex:
+    """Index persistant d'entrées associées à des fichiers."""
+
+    def __init__(self, path: Path, base_dir: Optional[Path] = None):
+        """
+        Args:
+            path: Fichier JSON de l'index
+            base_dir: Répertoire par rapport auquel les chemins sont
+                enregistrés (l'index reste valide si le dossier est déplacé)
+        """
+        self.path = Path(path)
+        self.base_dir = Path(base_dir).resolve() if base_dir else None
+        self._entries: Optional[Dict[str, dict]] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(file_path: str) -> Dict[str, int]:
+        """Empreinte d'un fichier : date de modification et taille."""
+        stat = Path(file_path).stat()
+        return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    def get(self, file_path: str) -> Optional[dict]:
+        """
+        Retourne l'entrée d'un fichier si elle est à jour.
+
+        Returns:
+            Les données enregistrées, ou None si le fichier est absent de
+            l'index ou a changé depuis son analyse
+        """
+        try:
+            fingerprint = self.fingerprint(file_path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._load().get(self._key(file_path))
+        if entry is None or entry.get('fingerprint') != fingerprint:
+            return None
+        return entry['data']
+
+    def put(self, file_path: str, data: dict):
+        """Enregistre (en mémoire) l'entrée d'un fichier ; voir save()."""
+        entry = {'fingerprint': self.fingerprint(file_path), 'data': data}
+        with self._lock:
+            self._load()[self._key(file_path)] = entry
+            self._dirty = True
+
+    def remove(self, file_path: str):
+        """Retire l'entrée d'un fichier."""
+        with self._lock:
+            if self._load().pop(self._key(file_path), None) is not None:
+                self._dirty = True
+
+    def keys(self):
+        """Retourne les chemins (tels qu'enregistrés) présents dans l'index."""
+        with self._lock:
+            return list(self._load())
+
+    def items(self):
+        """Retourne les couples (chemin enregistré, données), à jour ou non."""
+        with self._lock:
+            return [(key, entry['data']) for key, entry in self._load().items()]
+
+    def save(self):
+        """Écrit l'index sur disque s'il a changé (écriture atomique)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(temp, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, indent=1, sort_keys=True)
+            os.replace(temp, self.path)
+            self._dirty = False
+
+    def _load(self) -> Dict[str, dict]:
+        """Charge l'index au premier accès (appelé sous verrou)."""
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _key(self, file_path: str) -> str:
+        path = Path(file_path).resolve()
+        if self.base_dir is not None:
+            try:
+                return path.relative_to(self.base_dir).as_posix()
+            except ValueError:
+                pass
+        return str(path)
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+Taille adaptative des blocs de sortie.
+
+Des blocs courts donnent une faible latence (un changement de volume
+s'entend aussitôt) mais laissent peu de marge au thread audio : sur une
+machine chargée, le périphérique manque de données et le son coupe. Le
+réglage part de la plus petite taille permise, surveille les mesures du
+moteur (voir metrics.py) et double la taille des blocs à chaque coupure ou
+dépassement ; après une longue période sans incident et avec un rendu
+léger, il retente une taille deux fois plus petite. Chaque échec allonge la
+période exigée avant la tentative suivante.
+
+Seul le moteur NumPy est réglé : le flux de sortie y est rouvert avec la
+nouvelle taille sans toucher aux couches, qui reprennent là où elles en
+étaient. pygame ne signale pas ses coupures ; sa taille de bloc reste celle
+de départ, ramenée dans les bornes.
+"""
+
+import math
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Bornes par défaut de la durée d'un bloc (ms)
+MIN_LATENCY_MS = 5
+MAX_LATENCY_MS = 100
+
+# Intervalle entre deux examens des mesures (secondes)
+CHECK_INTERVAL = 2.0
+
+# Période sans incident avant de retenter des blocs plus petits (secondes) ;
+# doublée à chaque coupure, dans la limite de STABLE_SECONDS_MAX
+STABLE_SECONDS = 300.0
+STABLE_SECONDS_MAX = 24 * 3600.0
+
+# Charge maximale (p99 du rendu / durée du bloc) pour retenter des blocs plus petits
+SHRINK_LOAD = 0.25
+
+
+def latency_to_frames(latency_ms: float, samplerate: int) -> int:
+    """Taille de bloc (puissance de deux) la plus proche d'une durée donnée."""
+    frames = max(1.0, latency_ms * samplerate / 1000.0)
+    return 2 ** int(round(math.log2(frames)))
+
+
+class BufferTuner:
+    """Règle la taille des blocs de sortie d'après les coupures mesurées."""
+
+    def __init__(self, mixer, enabled: bool = True, min_latency: float = MIN_LATENCY_MS,
+                 max_latency: float = MAX_LATENCY_MS):
+        """
+        Args:
+            mixer: Mixeur (frequency, buffer, device_open, set_buffer, engine.metrics)
+            enabled: Régler la taille des blocs (sinon elle reste fixe)
+            min_latency: Durée minimale d'un bloc (ms)
+            max_latency: Durée maximale d'un bloc (ms)
+        """
+        self.mixer = mixer
+        self.enabled = enabled
+        self.min_latency = min_latency
+        self.max_latency = max_latency
+        # Appelé (depuis le thread du réglage) avec chaque nouvelle taille
+        self.on_change: Optional[Callable[[int], None]] = None
+
+        self._stable_seconds = STABLE_SECONDS
+        self._stable_since = time.monotonic()
+        # Compteurs du moteur au dernier examen
+        self._underruns = 0
+        self._misses = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+        # Compteurs
+        self.grows = 0
+        self.shrinks = 0
+
+    @property
+    def min_frames(self) -> int:
+        """Plus petite taille de bloc permise (trames)."""
+        return latency_to_frames(self.min_latency, self.mixer.frequency)
+
+    @property
+    def max_frames(self) -> int:
+        """Plus grande taille de bloc permise (trames)."""
+        return max(self.min_frames, latency_to_frames(self.max_latency, self.mixer.frequency))
+
+    def clamp(self, frames: int) -> int:
+        """Ramène une taille de bloc dans les bornes."""
+        return max(self.min_frames, min(self.max_frames, frames))
+
+    def configure(self, enabled: Optional[bool] = None, min_latency: Optional[float] = None,
+                  max_latency: Optional[float] = None):
+        """Change l'activation et/ou les bornes ; la taille courante y est ramenée."""
+        with self._condition:
+            if enabled is not None:
+                self.enabled = enabled
+            if min_latency is not None:
+                self.min_latency = min_latency
+            if max_latency is not None:
+                self.max_latency = max_latency
+            self._stable_since = time.monotonic()
+        frames = self.clamp(self.mixer.buffer)
+        if frames != self.mixer.buffer:
+            self._resize(frames)
+
+    def start(self):
+        """Lance les examens périodiques (sans effet s'ils tournent déjà)."""
+        with self._condition:
+            if self._thread is not None or self._stopped:
+                return
+            metrics = self.mixer.engine.metrics
+            self._underruns, self._misses = metrics.underruns, metrics.deadline_misses
+            self._stable_since = time.monotonic()
+            self._thread = threading.Thread(target=self._run, name="blanket-buffer-tuner",
+                                            daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Arrête les examens (nettoyage du mixeur)."""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def check(self) -> Optional[int]:
+        """
+        Examine les mesures depuis le dernier examen et ajuste la taille des blocs.
+
+        Returns:
+            La nouvelle taille de bloc, None si elle n'a pas changé
+        """
+        metrics = self.mixer.engine.metrics
+        underruns = metrics.underruns - self._underruns
+        misses = metrics.deadline_misses - self._misses
+        self._underruns, self._misses = metrics.underruns, metrics.deadline_misses
+        now = time.monotonic()
+        if not self.enabled or not self.mixer.device_open:
+            self._stable_since = now
+            return None
+
+        frames = self.mixer.buffer
+        if underruns or misses:
+            self._stable_since = now
+            # La taille courante ne suffit pas : la prochaine réduction attendra plus
+            self._stable_seconds = min(self._stable_seconds * 2, STABLE_SECONDS_MAX)
+            if frames < self.max_frames:
+                self.grows += 1
+                return self._resize(self.clamp(frames * 2))
+            return None
+
+        if now - self._stable_since < self._stable_seconds or frames <= self.min_frames:
+            return None
+        summary = metrics.summary(CHECK_INTERVAL)
+        if not summary['blocks']:
+            return None
+        if summary['render_ms']['p99'] / summary['block_ms'] >= SHRINK_LOAD:
+            return None
+        self._stable_since = now
+        self.shrinks += 1
+        return self._resize(self.clamp(frames // 2))
+
+    def get_stats(self) -> Dict[str, float]:
+        """Retourne l'état du réglage et ses compteurs."""
+        return {
+            'enabled': self.enabled,
+            'buffer': self.mixer.buffer,
+            'latency_ms': self.mixer.buffer * 1000.0 / self.mixer.frequency,
+            'min_frames': self.min_frames,
+            'max_frames': self.max_frames,
+            'grows': self.grows,
+            'shrinks': self.shrinks,
+            'stable_seconds': self._stable_seconds,
+        }
+
+    def _resize(self, frames: int) -> int:
+        self.mixer.set_buffer(frames)
+        if self.on_change is not None:
+            try:
+                self.on_change(frames)
+            except Exception as e:
+                print(f"Erreur lors de l'enregistrement de la taille des blocs: {e}")
+        return frames
+
+    def _run(self):
+        """Boucle du réglage : examine les mesures toutes les CHECK_INTERVAL secondes."""
+        while True:
+            with self._condition:
+                self._condition.wait(CHECK_INTERVAL)
+                if self._stopped:
+                    self._thread = None
+                    return
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Erreur lors du réglage de la taille des blocs: {e}")
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""
+Points de boucle sans coupure.
+
+Une analyse hors ligne cherche, pour chaque fichier, le couple début/fin de
+boucle le plus transparent : passages par zéro montants proches du début et
+de la fin, puis comparaison vectorisée des spectres qui précèdent chaque
+candidat. Les résultats sont gardés dans un index à côté de SOUNDS_DIR et
+ne sont recalculés que pour les fichiers modifiés.
+
+À la lecture, la fin de la boucle est fondue avec l'audio qui précède son
+début : le retour au début ne produit plus de clic.
+
+Utilisation en ligne de commande :
+    python -m src.audio.loops           # analyse les sons nouveaux ou modifiés
+    python -m src.audio.loops --force   # ré-analyse tout le catalogue
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from src.audio import decoder
+from src.audio.index import FileIndex
+from src.core.sounds import SOUNDS_DIR
+
+# Index des points de boucle, à côté du dossier des sons
+LOOP_INDEX_PATH = SOUNDS_DIR.parent / 'loops.json'
+
+# Durée du fondu enchaîné appliqué au point de boucle
+CROSSFADE_SECONDS = 0.25
+
+# Durée explorée au début et à la fin du fichier
+SEARCH_SECONDS = 2.0
+
+# Fenêtre d'analyse spectrale (trames)
+WINDOW = 2048
+
+# Nombre maximal de candidats retenus de chaque côté
+MAX_CANDIDATES = 96
+
+# Poids de la continuité de pente face à la similarité spectrale
+CONTINUITY_WEIGHT = 4.0
+
+
+class LoopPoints(NamedTuple):
+    """Boucle [start, end) en trames, avec fondu de `crossfade` trames."""
+
+    start: int
+    end: int
+    crossfade: int
+    samplerate: int
+
+    def scaled(self, samplerate: int) -> 'LoopPoints':
+        """Convertit les positions vers une autre fréquence d'échantillonnage."""
+        if samplerate == self.samplerate:
+            return self
+        ratio = samplerate / self.samplerate
+        return LoopPoints(int(self.start * ratio), int(self.end * ratio),
+                          int(self.crossfade * ratio), samplerate)
+
+
+def fade_curves(frames: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Courbes de fondu à puissance constante (sortie, entrée), de forme (frames, 1)."""
+    t = (np.arange(frames, dtype=np.float32) + 0.5) / frames
+    return np.cos(0.5 * np.pi * t)[:, None], np.sin(0.5 * np.pi * t)[:, None]
+
+
+def crossfade(tail: np.ndarray, preroll: np.ndarray, offset: int = 0) -> np.ndarray:
+    """
+    Fond une portion de la fin de boucle avec l'audio qui précède son début.
+
+    Args:
+        tail: Trames de la fin de boucle
+        preroll: Les `crossfade` trames qui précèdent le début de la boucle
+        offset: Position de `tail` dans la zone de fondu
+
+    Returns:
+        Les trames fondues, dans le format de `tail`
+    """
+    fade_out, fade_in = fade_curves(len(preroll))
+    count = len(tail)
+    mixed = (tail * fade_out[offset:offset + count]
+             + preroll[offset:offset + count] * fade_in[offset:offset + count])
+    if np.issubdtype(tail.dtype, np.integer):
+        info = np.iinfo(tail.dtype)
+        mixed = np.clip(np.round(mixed), info.min, info.max)
+    return mixed.astype(tail.dtype)
+
+
+def apply_loop(pcm: np.ndarray, loop: LoopPoints) -> np.ndarray:
+    """
+    Découpe un PCM sur sa boucle et fond la fin avec l'audio précédant le début.
+
+    Le résultat peut être rejoué en boucle depuis sa première trame sans
+    discontinuité.
+    """
+    start, end, fade = loop.start, loop.end, loop.crossfade
+    if start < fade or end > len(pcm) or end - start <= fade:
+        return pcm
+    looped = np.array(pcm[start:end])
+    if fade:
+        looped[-fade:] = crossfade(looped[-fade:], pcm[start - fade:start])
+    return looped
+
+
+def _rising_zero_crossings(signal: np.ndarray, low: int, high: int) -> np.ndarray:
+    """Positions des passages par zéro montants dans [low, high)."""
+    segment = signal[low - 1:high]
+    return np.flatnonzero((segment[:-1] < 0) & (segment[1:] >= 0)) + low
+
+
+def _thin(candidates: np.ndarray, count: int) -> np.ndarray:
+    """Garde au plus `count` candidats régulièrement répartis."""
+    if len(candidates) <= count:
+        return candidates
+    return candidates[np.linspace(0, len(candidates) - 1, count).astype(int)]
+
+
+def _spectra(signal: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """Spectres log normalisés des fenêtres qui précèdent chaque position."""
+    frames = signal[positions[:, None] + np.arange(-WINDOW, 0)]
+    spectra = np.log1p(np.abs(np.fft.rfft(frames * np.hanning(WINDOW), axis=1)))
+    norms = np.linalg.norm(spectra, axis=1, keepdims=True)
+    return spectra / np.maximum(norms, 1e-12)
+
+
+def find_loop_points(pcm: np.ndarray, samplerate: int) -> LoopPoints:
+    """
+    Cherche les meilleurs points de boucle d'un PCM.
+
+    Args:
+        pcm: PCM de forme (trames, canaux)
+        samplerate: Fréquence d'échantillonnage (Hz)
+
+    Returns:
+        Les points de boucle ; le fichier entier sans fondu s'il est trop
+        court pour l'analyse
+    """
+    signal = pcm.astype(np.float32).mean(axis=1)
+    length = len(signal)
+    fade = int(CROSSFADE_SECONDS * samplerate)
+    search = int(SEARCH_SECONDS * samplerate)
+    lead = max(fade, WINDOW) + 1
+    whole = LoopPoints(0, length, 0, samplerate)
+    if length < 2 * (lead + search):
+        return whole
+
+    starts = _thin(_rising_zero_crossings(signal, lead, lead + search), MAX_CANDIDATES)
+    ends = _thin(_rising_zero_crossings(signal, length - search, length), MAX_CANDIDATES)
+    if len(starts) == 0 or len(ends) == 0:
+        return whole
+
+    # Similarité cosinus entre tous les couples (fin, début) en un produit matriciel
+    spectral = 1.0 - _spectra(signal, ends) @ _spectra(signal, starts).T
+
+    # Continuité de la pente au raccord
+    peak = max(float(np.abs(signal).max()), 1e-12)
+    start_slopes = (signal[starts] - signal[starts - 1]) / peak
+    end_slopes = (signal[ends] - signal[ends - 1]) / peak
+    continuity = np.abs(end_slopes[:, None] - start_slopes[None, :])
+
+    cost = spectral + CONTINUITY_WEIGHT * continuity
+    end_index, start_index = np.unravel_index(np.argmin(cost), cost.shape)
+    return LoopPoints(int(starts[start_index]), int(ends[end_index]), fade, samplerate)
+
+
+class LoopIndex:
+    """Index des points de boucle, recalculés seulement pour les fichiers modifiés."""
+
+    def __init__(self, path: Path = LOOP_INDEX_PATH):
+        """
+        Args:
+            path: Fichier JSON de l'index
+        """
+        self.index = FileIndex(path, base_dir=Path(path).parent)
+
+    def get(self, file_path: str) -> Optional[LoopPoints]:
+        """Retourne les points de boucle d'un fichier s'ils sont à jour."""
+        data = self.index.get(file_path)
+        if data is None:
+            return None
+        return LoopPoints(data['start'], data['end'], data['crossfade'], data['samplerate'])
+
+    def analyze(self, file_paths: Iterable[str], force: bool = False) -> Dict[str, LoopPoints]:
+        """
+        Analyse les fichiers nouveaux ou modifiés et enregistre l'index.
+
+        Args:
+            file_paths: Fichiers à indexer
+            force: Ré-analyser aussi les fichiers déjà à jour
+
+        Returns:
+            Les points de boucle des fichiers effectivement analysés
+        """
+        analyzed = {}
+        for file_path in file_paths:
+            if not force and self.get(file_path) is not None:
+                continue
+            pcm, samplerate = decoder.decode(file_path)
+            loop = find_loop_points(pcm, samplerate)
+            self.index.put(file_path, loop._asdict())
+            analyzed[file_path] = loop
+        try:
+            self.index.save()
+        except OSError as e:
+            print(f"Avertissement: impossible d'enregistrer l'index des boucles: {e}")
+        return analyzed
+
+
+def main(argv=None):
+    """Point d'entrée de la ligne de commande d'analyse des boucles."""
+    from src.core.sounds import SOUNDS_DATA
+
+    parser = argparse.ArgumentParser(
+        prog="python -m src.audio.loops",
+        description="Calcule les points de boucle des sons de Blanket"
+    )
+    parser.add_argument('--force', action='store_true', help="Ré-analyser tous les fichiers")
+    parser.add_argument('--index', type=Path, default=LOOP_INDEX_PATH, help="Fichier d'index")
+    args = parser.parse_args(argv)
+
+    files = [data['file'] for data in SOUNDS_DATA.values()
+             if data.get('file') and Path(data['file']).exists()]
+    start = time.perf_counter()
+    analyzed = LoopIndex(args.index).analyze(files, force=args.force)
+    elapsed = time.perf_counter() - start
+
+    for file_path, loop in analyzed.items():
+        print(f"{Path(file_path).name}: {loop.start / loop.samplerate:.3f} s -> "
+              f"{loop.end / loop.samplerate:.3f} s (fondu {loop.crossfade / loop.samplerate:.2f} s)")
+    print(f"{len(analyzed)} fichier(s) analysé(s) sur {len(files)} en {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+Analyse de sonie et normalisation du volume des sons.
+
+Les fichiers du catalogue n'ont pas tous le même niveau : sans correction,
+un curseur à 50 % est bien plus fort sur un son que sur un autre. Chaque
+fichier est analysé une fois : sonie intégrée (à la manière de l'UIT-R
+BS.1770 : pondération K, blocs de 400 ms, portes absolue et relative) et
+crête. Le mixeur en déduit un gain ramenant le son à une sonie commune,
+limité pour qu'une amplification ne fasse pas saturer la crête.
+
+Les résultats sont gardés dans un index à côté de SOUNDS_DIR ; chaque
+entrée porte l'empreinte SHA-1 du contenu du fichier, si bien qu'un fichier
+copié ou renommé n'est pas ré-analysé. Seuls les fichiers nouveaux ou
+modifiés sont analysés, en parallèle.
+
+Utilisation en ligne de commande :
+    python -m src.audio.loudness           # analyse les sons nouveaux ou modifiés
+    python -m src.audio.loudness --force   # ré-analyse tout le catalogue
+"""
+
+import argparse
+import hashlib
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from src.audio import decoder
+from src.audio.index import FileIndex
+from src.core.sounds import SOUNDS_DIR
+
+# Index de sonie, à côté du dossier des sons
+LOUDNESS_INDEX_PATH = SOUNDS_DIR.parent / 'loudness.json'
+
+# Sonie visée par la normalisation (LUFS) : proche de la médiane du
+# catalogue, la plupart des sons changent peu et les plus forts sont atténués
+TARGET_LOUDNESS = -27.0
+
+# Crête maximale après amplification (dBFS)
+PEAK_CEILING = -1.0
+
+# Amplification maximale d'un son faible (dB)
+MAX_BOOST = 12.0
+
+# Blocs de mesure (secondes) : 400 ms, avec un pas de 100 ms
+BLOCK_SECONDS = 0.4
+STEP_SECONDS = 0.1
+
+# Portes de la sonie intégrée : absolue (LUFS) et relative (LU)
+ABSOLUTE_GATE = -70.0
+RELATIVE_GATE = -10.0
+
+# Nombre de pas de 100 ms décodés à la fois (borne la mémoire)
+CHUNK_STEPS = 600
+
+# Version des mesures : une entrée d'une autre version est ré-analysée
+# (2 : un fichier mono compte pour deux canaux)
+MEASURE_VERSION = 2
+
+
+def file_hash(file_path: str) -> str:
+    """Empreinte SHA-1 du contenu d'un fichier."""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def k_weighting_sections(samplerate: int) -> np.ndarray:
+    """
+    Coefficients de la pondération K à une fréquence d'échantillonnage.
+
+    Les deux étages de la norme (plateau aigu d'environ +4 dB, passe-haut
+    vers 38 Hz) sont recalculés par transformation bilinéaire, comme dans
+    libebur128 : à 48 kHz, on retrouve les coefficients publiés.
+
+    Returns:
+        Un tableau (2, 6) au format de sosfilt
+    """
+    k = math.tan(math.pi * 1681.974450955533 / samplerate)
+    q = 0.7071752369554196
+    vh = 10.0 ** (3.999843853973347 / 20.0)
+    vb = vh ** 0.4996667741545416
+    a0 = 1.0 + k / q + k * k
+    shelf = [(vh + vb * k / q + k * k) / a0, 2.0 * (k * k - vh) / a0,
+             (vh - vb * k / q + k * k) / a0, 1.0, 2.0 * (k * k - 1.0) / a0,
+             (1.0 - k / q + k * k) / a0]
+
+    k = math.tan(math.pi * 38.13547087602444 / samplerate)
+    q = 0.5003270373238773
+    a0 = 1.0 + k / q + k * k
+    highpass = [1.0, -2.0, 1.0, 1.0, 2.0 * (k * k - 1.0) / a0, (1.0 - k / q + k * k) / a0]
+    return np.array([shelf, highpass])
+
+
+def k_weighting(frames: int, samplerate: int) -> np.ndarray:
+    """
+    Poids en énergie de la pondération K pour les raies d'une FFT réelle.
+
+    La réponse des deux étages est évaluée sur la grille de np.fft.rfft ;
+    le facteur 2 des raies présentes deux fois dans le spectre complet est
+    inclus (Parseval).
+
+    Args:
+        frames: Longueur des blocs transformés
+        samplerate: Fréquence d'échantillonnage (Hz)
+
+    Returns:
+        Un tableau de frames // 2 + 1 poids
+    """
+    # z^-1 sur le cercle unité
+    z = np.exp(-1j * 2.0 * np.pi * np.fft.rfftfreq(frames))
+    response = np.ones(len(z))
+    for b0, b1, b2, a0, a1, a2 in k_weighting_sections(samplerate):
+        response = response * np.abs((b0 + b1 * z + b2 * z * z) / (a0 + a1 * z + a2 * z * z)) ** 2
+    response[1:(frames + 1) // 2] *= 2.0
+    return response
+
+
+def measure(file_path: str) -> Dict[str, Optional[float]]:
+    """
+    Mesure la sonie intégrée et la crête d'un fichier.
+
+    Le fichier est décodé par morceaux ; l'énergie pondérée de chaque pas de
+    100 ms est calculée dans le domaine fréquentiel, puis les blocs de 400 ms
+    sont formés de quatre pas consécutifs. Tous les canaux ont un poids de 1 ;
+    un fichier mono, joué à l'identique sur les deux canaux, compte double.
+
+    Args:
+        file_path: Chemin vers le fichier audio
+
+    Returns:
+        'loudness' (LUFS, None pour un fichier silencieux), 'peak' (dBFS,
+        None pour un fichier silencieux) et 'duration' (secondes)
+    """
+    powers = []
+    peak = 0.0
+    frames = 0
+    with decoder.open_file(file_path) as f:
+        samplerate = f.samplerate
+        step = max(1, int(round(samplerate * STEP_SECONDS)))
+        weights = k_weighting(step, samplerate)
+        if f.channels == 1:
+            weights = weights * 2.0
+        while True:
+            chunk = f.read(step * CHUNK_STEPS, dtype='float32', always_2d=True)
+            if not len(chunk):
+                break
+            frames += len(chunk)
+            peak = max(peak, float(np.abs(chunk).max()))
+            usable = len(chunk) // step * step
+            if not usable:
+                continue
+            blocks = chunk[:usable].reshape(-1, step, chunk.shape[1])
+            spectrum = np.abs(np.fft.rfft(blocks, axis=1)) ** 2
+            powers.append(np.einsum('bfc,f->b', spectrum, weights) / (step * step))
+
+    result = {
+        'loudness': None,
+        'peak': 20.0 * math.log10(peak) if peak > 0 else None,
+        'duration': frames / samplerate,
+    }
+    if not powers:
+        return result
+    powers = np.concatenate(powers)
+    steps = int(round(BLOCK_SECONDS / STEP_SECONDS))
+    if len(powers) >= steps:
+        blocks = np.convolve(powers, np.full(steps, 1.0 / steps), mode='valid')
+    else:
+        blocks = powers.mean(keepdims=True)
+
+    with np.errstate(divide='ignore'):
+        levels = -0.691 + 10.0 * np.log10(blocks)
+    gated = blocks[levels > ABSOLUTE_GATE]
+    if not len(gated):
+        return result
+    threshold = -0.691 + 10.0 * math.log10(gated.mean()) + RELATIVE_GATE
+    gated = blocks[(levels > ABSOLUTE_GATE) & (levels > threshold)]
+    result['loudness'] = -0.691 + 10.0 * math.log10(gated.mean())
+    return result
+
+
+def normalization_gain(data: Optional[dict], target: float = TARGET_LOUDNESS) -> float:
+    """
+    Gain linéaire ramenant un son mesuré à la sonie visée.
+
+    Une atténuation n'est pas limitée ; une amplification l'est par
+    MAX_BOOST et par la marge sous PEAK_CEILING.
+
+    Args:
+        data: Mesure du fichier (voir measure), ou None
+        target: Sonie visée (LUFS)
+
+    Returns:
+        Le gain linéaire (1.0 sans mesure ou pour un fichier silencieux)
+    """
+    if not data or data.get('loudness') is None:
+        return 1.0
+    gain = target - data['loudness']
+    if data.get('peak') is not None:
+        gain = min(gain, max(0.0, PEAK_CEILING - data['peak']))
+    return 10.0 ** (min(gain, MAX_BOOST) / 20.0)
+
+
+def _analyze(file_path: str) -> dict:
+    """Tâche d'analyse d'un fichier (processus de travail)."""
+    data = measure(file_path)
+    data['sha1'] = file_hash(file_path)
+    data['version'] = MEASURE_VERSION
+    return data
+
+
+class LoudnessIndex:
+    """Index des mesures de sonie, calculées seulement pour les fichiers nouveaux."""
+
+    def __init__(self, path: Path = LOUDNESS_INDEX_PATH, target: float = TARGET_LOUDNESS):
+        """
+        Args:
+            path: Fichier JSON de l'index
+            target: Sonie visée par la normalisation (LUFS)
+        """
+        self.index = FileIndex(path, base_dir=Path(path).parent)
+        self.target = target
+
+    def get(self, file_path: str) -> Optional[dict]:
+        """Retourne la mesure d'un fichier si elle est à jour."""
+        data = self.index.get(file_path)
+        if data is None or data.get('version') != MEASURE_VERSION:
+            return None
+        return data
+
+    def gain(self, file_path: str) -> Optional[float]:
+        """Retourne le gain de normalisation d'un fichier, None s'il n'est pas analysé."""
+        data = self.get(file_path)
+        return None if data is None else normalization_gain(data, self.target)
+
+    def analyze(self, file_paths: Iterable[str], force: bool = False,
+                workers: Optional[int] = None) -> Dict[str, dict]:
+        """
+        Analyse les fichiers nouveaux ou modifiés et enregistre l'index.
+
+        Un fichier dont le contenu est déjà dans l'index (copie, fichier
+        renommé) reprend la mesure existante. Les autres sont analysés dans
+        des processus séparés quand il y en a plusieurs.
+
+        Args:
+            file_paths: Fichiers à indexer
+            force: Ré-analyser aussi les fichiers déjà à jour
+            workers: Nombre de processus (par défaut, un par cœur)
+
+        Returns:
+            Les mesures des fichiers effectivement analysés
+        """
+        todo = [file_path for file_path in dict.fromkeys(file_paths)
+                if force or self.get(file_path) is None]
+        if not todo:
+            return {}
+
+        analyzed = {}
+        if not force:
+            known = {data.get('sha1'): data for _key, data in self.index.items()
+                     if data.get('version') == MEASURE_VERSION}
+            for file_path in list(todo):
+                data = known.get(file_hash(file_path))
+                if data is not None:
+                    analyzed[file_path] = dict(data)
+                    todo.remove(file_path)
+
+        if len(todo) > 1 and workers != 1:
+            with ProcessPoolExecutor(workers) as pool:
+                analyzed.update(zip(todo, pool.map(_analyze, todo)))
+        else:
+            analyzed.update((file_path, _analyze(file_path)) for file_path in todo)
+
+        for file_path, data in analyzed.items():
+            self.index.put(file_path, data)
+        try:
+            self.index.save()
+        except OSError as e:
+            print(f"Avertissement: impossible d'enregistrer l'index de sonie: {e}")
+        return analyzed
+
+    def ensure(self, file_path: str) -> dict:
+        """Retourne la mesure d'un fichier, en l'analysant s'il est nouveau."""
+        data = self.get(file_path)
+        if data is None:
+            data = self.analyze([file_path])[file_path]
+        return data
+
+
+def main(argv=None):
+    """Point d'entrée de la ligne de commande d'analyse de sonie."""
+    from src.core.sounds import SOUNDS_DATA
+
+    parser = argparse.ArgumentParser(
+        prog="python -m src.audio.loudness",
+        description="Mesure la sonie des sons de Blanket"
+    )
+    parser.add_argument('--force', action='store_true', help="Ré-analyser tous les fichiers")
+    parser.add_argument('--index', type=Path, default=LOUDNESS_INDEX_PATH, help="Fichier d'index")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Nombre de processus (par défaut, un par cœur)")
+    args = parser.parse_args(argv)
+
+    files = [data['file'] for data in SOUNDS_DATA.values()
+             if data.get('file') and Path(data['file']).exists()]
+    index = LoudnessIndex(args.index)
+    start = time.perf_counter()
+    analyzed = index.analyze(files, force=args.force, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    for file_path, data in analyzed.items():
+        if data['loudness'] is None:
+            print(f"{Path(file_path).name}: silencieux")
+            continue
+        gain = 20.0 * math.log10(normalization_gain(data, index.target))
+        print(f"{Path(file_path).name}: {data['loudness']:.1f} LUFS, "
+              f"crête {data['peak']:.1f} dBFS, gain {gain:+.1f} dB")
+    print(f"{len(analyzed)} fichier(s) analysé(s) sur {len(files)} en {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
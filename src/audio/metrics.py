@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Mesures du thread audio du moteur NumPy.
+
+Pour chaque bloc rendu : durée du rendu, comparée au budget du bloc (sa
+durée de lecture), manque de données signalé par le périphérique et avance
+du tampon de sortie (délai avant que le bloc soit entendu). Le thread audio
+écrit ces valeurs dans un anneau de tableaux préalloués, sans verrou ni
+allocation ; les lecteurs (interface, service) en copient un instantané et
+écartent les entrées réécrites pendant la copie.
+
+Ces mesures servent à choisir la taille des blocs (`buffer` du mixeur) à
+partir de données : un rendu proche du budget, ou des manques de données,
+demandent des blocs plus grands.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+# Blocs gardés dans l'anneau (environ 24 s à 44,1 kHz par blocs de 512 trames)
+RING_CAPACITY = 2048
+
+# Fenêtre par défaut des résumés (secondes d'audio)
+SUMMARY_SECONDS = 5.0
+
+# Bornes de l'histogramme des durées de rendu, en fraction du budget d'un bloc
+# (la dernière classe regroupe les dépassements)
+HISTOGRAM_EDGES = (0.1, 0.25, 0.5, 0.75, 1.0)
+
+# Lissage du coût de chaque couche : poids du dernier bloc
+LAYER_SMOOTHING = 0.05
+
+
+class BlockMetrics:
+    """Anneau des mesures par bloc, écrit par le seul thread audio."""
+
+    def __init__(self, samplerate: int, capacity: int = RING_CAPACITY):
+        """
+        Args:
+            samplerate: Fréquence d'échantillonnage (Hz), pour le budget des blocs
+            capacity: Nombre de blocs gardés
+        """
+        self.samplerate = samplerate
+        self.capacity = capacity
+        self._render_time = np.zeros(capacity)
+        self._frames = np.zeros(capacity, dtype=np.int64)
+        self._underrun = np.zeros(capacity, dtype=bool)
+        # Avance du tampon de sortie (secondes), NaN si le périphérique ne la donne pas
+        self._buffered = np.full(capacity, np.nan)
+        # Blocs écrits depuis la création ; incrémenté après l'écriture de l'entrée
+        self.written = 0
+        # Compteurs depuis la création
+        self.underruns = 0
+        self.deadline_misses = 0
+
+    def record(self, render_time: float, frames: int, underrun: bool = False,
+               buffered: Optional[float] = None):
+        """
+        Enregistre un bloc (thread audio uniquement).
+
+        Args:
+            render_time: Durée du rendu (secondes)
+            frames: Trames du bloc
+            underrun: Le périphérique a manqué de données avant ce bloc
+            buffered: Délai avant que le bloc soit entendu (secondes), si connu
+        """
+        i = self.written % self.capacity
+        self._render_time[i] = render_time
+        self._frames[i] = frames
+        self._underrun[i] = underrun
+        self._buffered[i] = np.nan if buffered is None else buffered
+        if underrun:
+            self.underruns += 1
+        if render_time * self.samplerate > frames:
+            self.deadline_misses += 1
+        self.written += 1
+
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """
+        Copie les blocs gardés, du plus ancien au plus récent.
+
+        Returns:
+            'render_time', 'frames', 'underrun' et 'buffered', un élément par bloc
+        """
+        end = self.written
+        count = min(end, self.capacity)
+        positions = np.arange(end - count, end) % self.capacity
+        blocks = {
+            'render_time': self._render_time[positions],
+            'frames': self._frames[positions],
+            'underrun': self._underrun[positions],
+            'buffered': self._buffered[positions],
+        }
+        # Le thread audio a pu réécrire les plus anciens blocs pendant la copie
+        overwritten = self.written - self.capacity - (end - count)
+        if overwritten > 0:
+            blocks = {key: values[overwritten:] for key, values in blocks.items()}
+        return blocks
+
+    def summary(self, seconds: float = SUMMARY_SECONDS) -> dict:
+        """
+        Résume les derniers blocs rendus.
+
+        Args:
+            seconds: Durée d'audio couverte (les blocs les plus récents)
+
+        Returns:
+            Les compteurs depuis la création ('total_blocks', 'total_underruns',
+            'total_deadline_misses') et, sur la fenêtre : 'blocks', 'block_ms'
+            (budget moyen d'un bloc), 'render_ms' (moyenne, médiane, p95, p99,
+            maximum), 'load' et 'peak_load' (rendu / budget), 'deadline_misses',
+            'underruns', 'buffered_ms' et 'min_buffered_ms' (None si inconnus)
+            et 'histogram' (blocs par classe de HISTOGRAM_EDGES)
+        """
+        result = {
+            'total_blocks': self.written,
+            'total_underruns': self.underruns,
+            'total_deadline_misses': self.deadline_misses,
+            'blocks': 0,
+        }
+        blocks = self.snapshot()
+        frames = blocks['frames']
+        if not len(frames):
+            return result
+        # Blocs les plus récents couvrant au plus `seconds` d'audio (au moins un)
+        covered = np.cumsum(frames[::-1])
+        count = max(1, int(np.searchsorted(covered, seconds * self.samplerate, side='right')))
+        blocks = {key: values[-count:] for key, values in blocks.items()}
+
+        render_time = blocks['render_time']
+        budget = blocks['frames'] / self.samplerate
+        load = render_time / budget
+        buffered = blocks['buffered'][~np.isnan(blocks['buffered'])]
+        edges = (0.0,) + HISTOGRAM_EDGES + (np.inf,)
+        p50, p95, p99 = np.percentile(render_time, (50, 95, 99)) * 1000.0
+        result.update({
+            'blocks': count,
+            'block_ms': float(budget.mean() * 1000.0),
+            'render_ms': {
+                'mean': float(render_time.mean() * 1000.0),
+                'p50': float(p50),
+                'p95': float(p95),
+                'p99': float(p99),
+                'max': float(render_time.max() * 1000.0),
+            },
+            'load': float(render_time.sum() / budget.sum()),
+            'peak_load': float(load.max()),
+            'deadline_misses': int((load > 1.0).sum()),
+            'underruns': int(blocks['underrun'].sum()),
+            'buffered_ms': float(buffered[-1] * 1000.0) if len(buffered) else None,
+            'min_buffered_ms': float(buffered.min() * 1000.0) if len(buffered) else None,
+            'histogram': np.histogram(load, bins=edges)[0].tolist(),
+        })
+        return result
@@ -3,33 +3,322 @@
 Mixeur audio pour la gestion simultanée de plusieurs sons.
 """
 
-import pygame
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple
+
+from src.audio import decoder, effects
+from src.audio.cache import PcmCache, resampler
+from src.audio.generators import GeneratorReader, NoiseGenerator
+from src.audio.idle import IDLE_TIMEOUT, MEMORY_BUDGET, IdleManager
+from src.audio.latency import MAX_LATENCY_MS, MIN_LATENCY_MS, BufferTuner
+from src.audio.loops import LoopIndex
+from src.audio.loudness import LoudnessIndex
+from src.audio.metrics import SUMMARY_SECONDS
+from src.audio.sleep_timer import SleepTimer
+from src.audio.streaming import StreamReader, StreamingPlayback
+from src.audio.transitions import LayerSpec, PlaylistEntry, TransitionScheduler
+from src.audio.volume import VOLUME_UPDATE_RATE, VolumeScheduler, db_ramp
+
+if TYPE_CHECKING:
+    # pygame n'est importé qu'à l'ouverture du périphérique (démarrage rapide)
+    import pygame
+
+# Taille (fichier compressé) à partir de laquelle un son est lu en flux
+STREAM_THRESHOLD = 1024 * 1024
+
+# Intervalle de ré-alimentation des sons lus en flux (secondes)
+STREAM_PUMP_INTERVAL = 0.04
+
+# Nombre de sons décodés en parallèle par le chargement en arrière-plan
+LOAD_WORKERS = min(8, os.cpu_count() or 2)
+
+# Moteurs de mixage disponibles
+ENGINES = {
+    'pygame': "pygame (un canal SDL par son)",
+    'numpy': "NumPy (flux de sortie unique)",
+}
 
 
 class AudioMixer:
     """Gère le mixage audio de plusieurs sons simultanément."""
     
-    def __init__(self, frequency=44100, size=-16, channels=2, buffer=512):
+    # SDL mixe les canaux lui-même : les effets des sons ne sont pas appliqués
+    applies_effects = False
+    
+    def __init__(self, frequency=44100, size=-16, channels=2, buffer=512,
+                 stream_threshold=STREAM_THRESHOLD, cache: Optional[PcmCache] = None,
+                 idle_timeout: float = IDLE_TIMEOUT, memory_budget: int = MEMORY_BUDGET,
+                 normalize_loudness: bool = True, adaptive_buffer: bool = False,
+                 latency_bounds: Tuple[float, float] = (MIN_LATENCY_MS, MAX_LATENCY_MS),
+                 native_rate: bool = False):
         """
         Initialise le mixeur audio.
         
+        Le périphérique audio (et pygame) n'est initialisé qu'au chargement
+        du premier son, pour ne pas ralentir le démarrage de l'application.
+        
         Args:
             frequency: Fréquence d'échantillonnage (Hz)
             size: Taille des échantillons
             channels: Nombre de canaux (1=mono, 2=stereo)
             buffer: Taille du buffer
+            stream_threshold: Taille de fichier (octets) à partir de laquelle
+                un son est lu en flux plutôt que préchargé
+            cache: Cache du PCM décodé (cache utilisateur par défaut)
+            idle_timeout: Délai (secondes) après lequel le périphérique est
+                fermé quand rien n'est audible, 0 pour le garder ouvert
+            memory_budget: PCM décodé (octets) gardé pour les sons arrêtés
+            normalize_loudness: Ramener les sons à une sonie commune
+            adaptive_buffer: Sans effet avec pygame, qui ne signale pas ses
+                coupures (voir latency.py)
+            latency_bounds: Durées minimale et maximale d'un bloc (ms)
+            native_rate: Ouvrir le périphérique à sa fréquence native (lue
+                par sounddevice) ; frequency ne sert que si elle ne peut être lue
         """
-        pygame.mixer.init(frequency, size, channels, buffer)
-        pygame.mixer.set_num_channels(32)  # Permet jusqu'à 32 sons simultanés
+        self.frequency = frequency
+        self.native_rate = native_rate
+        self.sample_size = size
+        self.num_channels = channels
+        self.buffer_tuner = BufferTuner(self, adaptive_buffer, *latency_bounds)
+        self.buffer = self.buffer_tuner.clamp(buffer)
+        self.device_open = False
+        self._device_lock = threading.Lock()
         
-        self.sounds: Dict[str, pygame.mixer.Sound] = {}
-        self.channels: Dict[str, pygame.mixer.Channel] = {}
+        self.sounds: Dict[str, "pygame.mixer.Sound"] = {}
+        # Sound chargé de chaque fichier, partagé par les sons qui le désignent
+        self._buffers: "weakref.WeakValueDictionary[tuple, pygame.mixer.Sound]" = \
+            weakref.WeakValueDictionary()
+        self.channels: Dict[str, "pygame.mixer.Channel"] = {}
+        self.streams: Dict[str, StreamingPlayback] = {}
+        # De quoi relancer chaque son, et les sons en pause à la fermeture du
+        # périphérique inactif (les canaux SDL ne survivent pas à sa fermeture)
+        self._sources: Dict[str, LayerSpec] = {}
+        self._suspended: Dict[str, LayerSpec] = {}
+        # Graphe de gain : volume propre à chaque son, bus par catégorie, principal
+        self.volumes: Dict[str, float] = {}
+        self.sound_categories: Dict[str, str] = {}
+        self.category_volumes: Dict[str, float] = {}
         self.master_volume = 1.0
+        # Gain du fondu du minuteur, appliqué en plus du volume principal
+        self.output_gain = 1.0
+        # Effets de chaque son (paramètres validés, voir effects.py)
+        self.effects: Dict[str, dict] = {}
+        self._effects_warned = False
+        # Gain de normalisation de chaque son lu depuis un fichier (voir loudness.py)
+        self.normalize_loudness = normalize_loudness
+        self.normalization: Dict[str, float] = {}
         self.paused = False
+        self.stream_threshold = stream_threshold
+        self.cache = cache or PcmCache()
+        self.loops = LoopIndex()
+        self.loudness = LoudnessIndex()
+        self.volume_updates = VolumeScheduler(self)
+        self.transitions = TransitionScheduler(self)
+        self.sleep_timer = SleepTimer(self)
+        self.idle = IdleManager(self, idle_timeout, memory_budget)
+        
+        self._streams_lock = threading.Lock()
+        self._stream_thread: Optional[threading.Thread] = None
+        
+        # Horloge de lecture : trames comptées jusqu'à la dernière fermeture du
+        # périphérique, puis instant de sa réouverture, décalé des pauses
+        self._clock_base = 0
+        self._clock_origin: Optional[float] = None
+        self._paused_at: Optional[float] = None
+        # Incrémentés à chaque fondu : un fondu plus récent remplace le précédent
+        self._crossfade_generation = 0
+        self._output_fade_generation = 0
+        
+        self._loader = ThreadPoolExecutor(LOAD_WORKERS, thread_name_prefix="blanket-load")
+        self._pending: Dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
         
-    def play_sound(self, sound_id: str, file_path: str, volume: float = 0.5) -> bool:
+    def _ensure_device(self):
+        """Ouvre le périphérique audio s'il ne l'est pas encore."""
+        started = time.perf_counter()
+        with self._device_lock:
+            if self.device_open:
+                return
+            self._open_device()
+            self.device_open = True
+            resuming = self.idle.suspended
+        if resuming:
+            # Réouverture après une fermeture pour inactivité
+            self._resume_device()
+            self.idle.resumed(time.perf_counter() - started)
+    
+    def _resume_device(self):
+        """Relance les sons interrompus par la fermeture du périphérique inactif."""
+        if self.paused:
+            # Relancés à la reprise (resume_all)
+            return
+        suspended, self._suspended = self._suspended, {}
+        for sound_id, spec in suspended.items():
+            self._play_spec(sound_id, spec, self.volumes.get(sound_id, spec.volume))
+    
+    def _suspend_device(self):
+        """Ferme le périphérique en notant les sons en pause pour les relancer."""
+        suspended = {sound_id: self._sources[sound_id]
+                     for sound_id in set(self.channels) | set(self.streams)
+                     if sound_id in self._sources and self.is_playing(sound_id)}
+        self.stop_all()
+        self._suspended = suspended
+        # Les Sound pygame ne survivent pas non plus à la fermeture
+        self.sounds.clear()
+        self._close_device()
+    
+    def suspend(self) -> bool:
+        """
+        Ferme le périphérique si rien n'est audible.
+        
+        Le prochain son, ou la reprise des sons en pause, le rouvre de façon
+        transparente.
+        
+        Returns:
+            True si le périphérique a été fermé
+        """
+        with self._device_lock:
+            if not self.device_open or not self.is_idle():
+                return False
+            self._suspend_device()
+            self.device_open = False
+        return True
+    
+    def is_idle(self) -> bool:
+        """True si rien n'est audible : sons en pause, ou aucun son en lecture."""
+        return self.paused or not any(self.is_playing(sound_id) for sound_id in list(self.volumes))
+    
+    def get_idle_stats(self) -> Dict[str, float]:
+        """Retourne l'état du gestionnaire d'inactivité et ses compteurs."""
+        return self.idle.get_stats()
+    
+    def get_audio_metrics(self, seconds: float = SUMMARY_SECONDS) -> Optional[dict]:
+        """
+        Retourne les mesures du thread audio (voir EngineMixer.get_audio_metrics).
+        
+        pygame mixe dans le thread de SDL, qui ne donne ni la durée de ses
+        blocs ni ses manques de données.
+        
+        Returns:
+            None : aucune mesure avec le moteur pygame
+        """
+        return None
+    
+    def set_buffer(self, frames: int):
+        """
+        Change la taille du buffer de pygame.
+        
+        SDL ne change pas la taille d'un périphérique ouvert, et le rouvrir
+        relancerait les sons préchargés depuis leur début : la nouvelle taille
+        est appliquée à la prochaine ouverture du périphérique.
+        
+        Args:
+            frames: Taille du buffer (trames)
+        """
+        self.buffer = frames
+    
+    def _open_device(self):
+        """Initialise pygame.mixer avec le format demandé."""
+        import pygame
+        
+        frequency = self.frequency
+        if self.native_rate:
+            # À sa fréquence native, le périphérique n'a pas à convertir le mix
+            from src.audio import output
+            frequency = output.native_samplerate() or frequency
+        pygame.mixer.init(frequency, self.sample_size, self.num_channels, self.buffer)
+        pygame.mixer.set_num_channels(32)  # Permet jusqu'à 32 sons simultanés
+        # Format réellement obtenu auprès de SDL
+        self.frequency, self.sample_size, self.num_channels = pygame.mixer.get_init()
+        if self._clock_origin is None:
+            self._clock_origin = time.monotonic()
+            if self._paused_at is not None:
+                # Rouvert pendant une pause : l'horloge repart à la reprise
+                self._paused_at = self._clock_origin
+    
+    def _close_device(self):
+        """Ferme pygame.mixer."""
+        import pygame
+        
+        pygame.mixer.quit()
+        # L'horloge reprendra où elle s'est arrêtée à la réouverture
+        self._clock_base = self.clock()
+        self._clock_origin = None
+    
+    def load_async(self, sound_id: str, file_path: str, mode: str = 'auto') -> Future:
+        """
+        Décode un son en arrière-plan pour que play_sound soit immédiat.
+        
+        Les demandes en cours pour un même son sont fusionnées : le même
+        Future est retourné tant que le chargement n'est pas terminé.
+        
+        Args:
+            sound_id: Identifiant unique du son
+            file_path: Chemin vers le fichier audio
+            mode: 'stream', 'preload' ou 'auto' (voir play_sound)
+            
+        Returns:
+            Un Future résolu avec True si le son est prêt à être joué
+        """
+        with self._pending_lock:
+            future = self._pending.get(sound_id)
+            if future is not None:
+                return future
+            
+            if sound_id in self.sounds:
+                future = Future()
+                future.set_result(True)
+                return future
+            
+            future = self._loader.submit(self._load, sound_id, file_path, mode)
+            self._pending[sound_id] = future
+        future.add_done_callback(lambda done: self._forget_pending(sound_id, done))
+        return future
+    
+    def _forget_pending(self, sound_id: str, future: Future):
+        with self._pending_lock:
+            if self._pending.get(sound_id) is future:
+                del self._pending[sound_id]
+    
+    def _load(self, sound_id: str, file_path: str, mode: str) -> bool:
+        """Tâche du chargement en arrière-plan."""
+        try:
+            self._ensure_device()
+            # Un son lu en flux ne décode que quelques blocs au lancement
+            return self.should_stream(file_path, mode) or self._preload(sound_id, file_path)
+        except Exception as e:
+            print(f"Erreur lors du chargement du son {sound_id}: {e}")
+            return False
+    
+    def _preload(self, sound_id: str, file_path: str) -> bool:
+        """Charge un son entier s'il ne l'est pas déjà."""
+        if sound_id in self.sounds:
+            self.idle.used(sound_id)
+            return True
+        
+        sound_path = Path(file_path)
+        if not sound_path.exists():
+            print(f"Erreur: Fichier audio introuvable: {file_path}")
+            return False
+        
+        # Plusieurs sons désignant le même fichier partagent un seul tampon
+        stat = sound_path.stat()
+        key = (str(sound_path.resolve()), stat.st_mtime_ns, stat.st_size)
+        sound = self._buffers.get(key)
+        if sound is None:
+            sound = self._load_sound(sound_path)
+            self._buffers[key] = sound
+        self.sounds[sound_id] = sound
+        self.idle.used(sound_id)
+        return True
+        
+    def play_sound(self, sound_id: str, file_path: str, volume: float = 0.5,
+                   mode: str = 'auto', category: Optional[str] = None) -> bool:
         """
         Joue un son en boucle.
         
@@ -37,19 +326,27 @@ class AudioMixer:
             sound_id: Identifiant unique du son
             file_path: Chemin vers le fichier audio
             volume: Volume initial (0.0 - 1.0)
+            mode: 'stream' pour décoder par blocs, 'preload' pour décoder
+                tout le fichier, 'auto' pour choisir selon stream_threshold
+            category: Catégorie du son, dont le volume de groupe s'applique
             
         Returns:
             True si le son a été lancé avec succès
         """
+        import pygame
+        
+        self.idle.activity()
+        self._assign(sound_id, volume, category)
+        self._sources[sound_id] = LayerSpec(volume, file_path, None, mode, category)
+        self._update_normalization(sound_id, file_path)
         try:
+            self._ensure_device()
+            if self.should_stream(file_path, mode):
+                return self._play_stream(sound_id, file_path)
+            
             # Charger le son s'il n'est pas déjà chargé
-            if sound_id not in self.sounds:
-                sound_path = Path(file_path)
-                if not sound_path.exists():
-                    print(f"Erreur: Fichier audio introuvable: {file_path}")
-                    return False
-                    
-                self.sounds[sound_id] = pygame.mixer.Sound(str(sound_path))
+            if not self._preload(sound_id, file_path):
+                return False
             
             # Obtenir un canal disponible
             channel = pygame.mixer.find_channel()
@@ -57,8 +354,8 @@ class AudioMixer:
                 print("Erreur: Aucun canal audio disponible")
                 return False
             
-            # Définir le volume
-            self.sounds[sound_id].set_volume(volume * self.master_volume)
+            # Définir le volume, sur le canal : le Sound peut être partagé
+            channel.set_volume(self.effective_volume(sound_id))
             
             # Jouer le son en boucle
             channel.play(self.sounds[sound_id], loops=-1)
@@ -70,11 +367,134 @@ class AudioMixer:
             print(f"Erreur lors de la lecture du son {sound_id}: {e}")
             return False
     
+    def _load_sound(self, sound_path: Path) -> "pygame.mixer.Sound":
+        """Charge un son entier, depuis le cache de PCM décodé si possible."""
+        import pygame
+        
+        if decoder.is_available() and self.sample_size == -16:
+            # Rééchantillonné une fois, dans un processus séparé, puis gardé en cache
+            pcm = self.cache.load(str(sound_path), self.frequency, self.num_channels,
+                                  loop=self.loops.get(str(sound_path)), pool=resampler())
+            return pygame.mixer.Sound(buffer=pcm)
+        return pygame.mixer.Sound(str(sound_path))
+    
+    def should_stream(self, file_path: str, mode: str = 'auto') -> bool:
+        """
+        Détermine si un fichier doit être lu en flux.
+        
+        Args:
+            file_path: Chemin vers le fichier audio
+            mode: 'stream', 'preload' ou 'auto'
+            
+        Returns:
+            True si le son doit être décodé par blocs
+        """
+        if mode == 'preload' or not decoder.is_available():
+            return False
+        
+        sound_path = Path(file_path)
+        if not sound_path.exists():
+            return False
+        if mode == 'auto' and sound_path.stat().st_size < self.stream_threshold:
+            return False
+        
+        # Les blocs sont remis tels quels à SDL : la fréquence doit correspondre
+        info = decoder.probe(file_path)
+        return info is not None and info.samplerate == self.frequency
+    
+    def _play_stream(self, sound_id: str, file_path: str) -> bool:
+        """Lance la lecture en flux d'un son."""
+        self.stop_sound(sound_id)
+        reader = StreamReader(file_path, channels=self.num_channels,
+                              loop=self.loops.get(file_path))
+        return self._start_stream(sound_id, reader)
+    
+    def _start_stream(self, sound_id: str, reader) -> bool:
+        """Alimente un canal libre avec les blocs d'un lecteur."""
+        import pygame
+        
+        channel = pygame.mixer.find_channel()
+        if channel is None:
+            print("Erreur: Aucun canal audio disponible")
+            reader.close()
+            return False
+        
+        stream = StreamingPlayback(reader, channel, self.effective_volume(sound_id))
+        stream.start()
+        
+        with self._streams_lock:
+            self.streams[sound_id] = stream
+        self._ensure_stream_thread()
+        return True
+    
+    def play_generator(self, sound_id: str, kind: str, volume: float = 0.5,
+                       category: Optional[str] = None) -> bool:
+        """
+        Joue un bruit synthétisé à la volée, sans fichier.
+        
+        Args:
+            sound_id: Identifiant unique du son
+            kind: Type de bruit (voir generators.NOISE_TYPES)
+            volume: Volume initial (0.0 - 1.0)
+            category: Catégorie du son, dont le volume de groupe s'applique
+            
+        Returns:
+            True si le son a été lancé avec succès
+        """
+        self.idle.activity()
+        self._assign(sound_id, volume, category)
+        self._sources[sound_id] = LayerSpec(volume, None, kind, 'auto', category)
+        self.normalization.pop(sound_id, None)
+        try:
+            self._ensure_device()
+            self.stop_sound(sound_id)
+            generator = NoiseGenerator(kind, self.frequency, self.num_channels)
+            return self._start_stream(sound_id, GeneratorReader(generator))
+        except Exception as e:
+            print(f"Erreur lors de la lecture du son {sound_id}: {e}")
+            return False
+    
+    def _ensure_stream_thread(self):
+        """Démarre le thread qui ré-alimente les sons lus en flux."""
+        if self._stream_thread is None or not self._stream_thread.is_alive():
+            self._stream_thread = threading.Thread(
+                target=self._pump_streams, name="blanket-streams", daemon=True
+            )
+            self._stream_thread.start()
+    
+    def _pump_streams(self):
+        """Boucle du thread de flux ; s'arrête quand plus aucun son n'est lu en flux."""
+        while True:
+            with self._streams_lock:
+                for sound_id, stream in list(self.streams.items()):
+                    if stream.finished:
+                        stream.stop()
+                        del self.streams[sound_id]
+                    elif not self.paused:
+                        try:
+                            stream.pump()
+                        except Exception as e:
+                            print(f"Erreur lors de la lecture en flux de {sound_id}: {e}")
+                            stream.stop()
+                            del self.streams[sound_id]
+                if not self.streams:
+                    self._stream_thread = None
+                    return
+            time.sleep(STREAM_PUMP_INTERVAL)
+    
     def stop_sound(self, sound_id: str):
         """Arrête un son spécifique."""
+        self.volume_updates.discard(sound_id)
+        self._suspended.pop(sound_id, None)
+        with self._streams_lock:
+            stream = self.streams.pop(sound_id, None)
+        if stream is not None:
+            stream.stop()
         if sound_id in self.channels:
             self.channels[sound_id].stop()
             del self.channels[sound_id]
+        self.idle.trim()
+        self.idle.check()
     
     def set_volume(self, sound_id: str, volume: float):
         """
@@ -84,38 +504,215 @@ class AudioMixer:
             sound_id: Identifiant du son
             volume: Nouveau volume (0.0 - 1.0)
         """
-        if sound_id in self.sounds:
-            self.sounds[sound_id].set_volume(volume * self.master_volume)
+        self.volumes[sound_id] = volume
+        self._apply_volume(sound_id)
+    
+    def set_category_volume(self, category: str, volume: float):
+        """
+        Définit le volume de groupe d'une catégorie de sons.
+        
+        Args:
+            category: Catégorie (clé 'category' de SOUNDS_DATA)
+            volume: Nouveau volume du groupe (0.0 - 1.0)
+        """
+        self.category_volumes[category] = max(0.0, min(1.0, volume))
+        for sound_id, sound_category in self.sound_categories.items():
+            if sound_category == category:
+                self._apply_volume(sound_id)
+    
+    def get_category_volume(self, category: str) -> float:
+        """Retourne le volume de groupe d'une catégorie (1.0 par défaut)."""
+        return self.category_volumes.get(category, 1.0)
+    
+    def effective_volume(self, sound_id: str) -> float:
+        """
+        Retourne le gain final d'un son : son volume, sa normalisation,
+        celui de sa catégorie, le volume principal et le fondu du minuteur.
+        """
+        category = self.sound_categories.get(sound_id)
+        return (self.volumes.get(sound_id, 0.5)
+                * self.normalization_gain(sound_id)
+                * self.get_category_volume(category)
+                * self.master_volume
+                * self.output_gain)
+    
+    def normalization_gain(self, sound_id: str) -> float:
+        """Retourne le gain de normalisation d'un son (1.0 si désactivée ou pas mesuré)."""
+        if not self.normalize_loudness:
+            return 1.0
+        return self.normalization.get(sound_id, 1.0)
+    
+    def set_normalization(self, enabled: bool):
+        """Active ou désactive la normalisation du volume des sons en cours."""
+        self.normalize_loudness = enabled
+        for sound_id in list(self.normalization):
+            self._apply_normalization(sound_id)
+    
+    def _update_normalization(self, sound_id: str, file_path: str):
+        """
+        Enregistre le gain de normalisation d'un son avant sa lecture.
+        
+        Un fichier encore jamais mesuré est joué sans normalisation puis
+        corrigé dès la fin de son analyse, faite en arrière-plan.
+        """
+        gain = self.loudness.gain(file_path)
+        if gain is not None:
+            self.normalization[sound_id] = gain
+            return
+        self.normalization.pop(sound_id, None)
+        if not Path(file_path).exists():
+            return
+        
+        def measured(future: Future):
+            if not future.cancelled() and future.result():
+                self.normalization[sound_id] = self.loudness.gain(file_path)
+                self._apply_normalization(sound_id)
+        try:
+            self._loader.submit(self._analyze_loudness, file_path).add_done_callback(measured)
+        except RuntimeError:
+            # Mixeur en cours de fermeture
+            pass
+    
+    def _analyze_loudness(self, file_path: str) -> bool:
+        """Mesure un fichier absent de l'index de sonie (thread de chargement)."""
+        try:
+            self.loudness.ensure(file_path)
+            return True
+        except Exception as e:
+            print(f"Avertissement: impossible de mesurer la sonie de {file_path}: {e}")
+            return False
+    
+    def _apply_normalization(self, sound_id: str):
+        """Applique le gain de normalisation d'un son à sa lecture en cours."""
+        self._apply_volume(sound_id)
+    
+    def _assign(self, sound_id: str, volume: float, category: Optional[str]):
+        """Enregistre le volume et la catégorie d'un son avant sa lecture."""
+        self.volumes[sound_id] = volume
+        if category is None:
+            self.sound_categories.pop(sound_id, None)
+        else:
+            self.sound_categories[sound_id] = category
+    
+    def _apply_volume(self, sound_id: str):
+        """Applique le gain final d'un son à sa lecture en cours."""
+        volume = self.effective_volume(sound_id)
+        if sound_id in self.streams:
+            self.streams[sound_id].set_volume(volume)
+        channel = self.channels.get(sound_id)
+        if channel is not None and channel.get_sound() is self.sounds.get(sound_id):
+            channel.set_volume(volume)
+    
+    def request_volume(self, sound_id: str, volume: float):
+        """
+        Demande un changement de volume, appliqué avec le prochain lot.
+        
+        À utiliser pour les évènements rapprochés (glissement d'un curseur) :
+        seule la dernière valeur de chaque intervalle atteint le mixeur.
+        
+        Args:
+            sound_id: Identifiant du son
+            volume: Nouveau volume (0.0 - 1.0)
+        """
+        self.volume_updates.set_volume(sound_id, volume)
+    
+    def request_master_volume(self, volume: float):
+        """Demande un changement du volume principal, appliqué avec le prochain lot."""
+        self.volume_updates.set_master_volume(volume)
+    
+    def set_effects(self, sound_id: str, params: Optional[dict]):
+        """
+        Définit les effets d'un son (voir effects.py).
+        
+        Args:
+            sound_id: Identifiant du son
+            params: Paramètres d'effets ; None ou {} pour les retirer
+            
+        Raises:
+            ValueError: Paramètres invalides
+        """
+        self._store_effects(sound_id, params)
+        self._apply_effects(sound_id)
+    
+    def get_effects(self, sound_id: str) -> dict:
+        """Retourne les effets d'un son ({} sans effet)."""
+        return dict(self.effects.get(sound_id, {}))
+    
+    def _store_effects(self, sound_id: str, params: Optional[dict]):
+        """Valide et retient les effets d'un son."""
+        params = effects.normalize(params)
+        if params:
+            self.effects[sound_id] = params
+        else:
+            self.effects.pop(sound_id, None)
+    
+    def _apply_effects(self, sound_id: str):
+        """
+        pygame mixe les sons lui-même : les effets sont retenus, et enregistrés
+        avec les presets, mais seul le moteur NumPy les applique.
+        """
+        if sound_id in self.effects and not self._effects_warned:
+            print("Avertissement: Effets ignorés par le moteur pygame (moteur NumPy requis)")
+            self._effects_warned = True
+    
+    def get_volume_stats(self) -> Dict[str, int]:
+        """Retourne les compteurs du regroupement des changements de volume."""
+        return self.volume_updates.get_stats()
     
     def set_master_volume(self, volume: float):
         """
         Définit le volume principal.
         
+        pygame n'a pas d'étage de sortie commun : le gain final de chaque son
+        lu est recalculé.
+        
         Args:
             volume: Nouveau volume principal (0.0 - 1.0)
         """
         self.master_volume = max(0.0, min(1.0, volume))
-        
-        # Mettre à jour le volume de tous les sons actifs
-        for sound_id, sound in self.sounds.items():
-            if sound_id in self.channels:
-                current_volume = sound.get_volume()
-                sound.set_volume(current_volume / self.master_volume * self.master_volume)
+        for sound_id in list(self.streams) + list(self.channels):
+            self._apply_volume(sound_id)
     
     def pause_all(self):
         """Met en pause tous les sons."""
-        pygame.mixer.pause()
+        if self.device_open:
+            import pygame
+            pygame.mixer.pause()
+        if self._paused_at is None:
+            self._paused_at = time.monotonic()
         self.paused = True
+        self.idle.check()
     
     def resume_all(self):
         """Reprend tous les sons en pause."""
-        pygame.mixer.unpause()
+        self.idle.activity()
+        if self.device_open:
+            import pygame
+            pygame.mixer.unpause()
+        if self._paused_at is not None:
+            if self._clock_origin is not None:
+                self._clock_origin += time.monotonic() - self._paused_at
+            self._paused_at = None
         self.paused = False
+        if self._suspended:
+            # Rouvre le périphérique fermé pendant la pause et relance ses sons
+            self._ensure_device()
+            self._resume_device()
     
     def stop_all(self):
         """Arrête tous les sons."""
-        pygame.mixer.stop()
+        with self._streams_lock:
+            streams = list(self.streams.values())
+            self.streams.clear()
+        for stream in streams:
+            stream.stop()
+        if self.device_open:
+            import pygame
+            pygame.mixer.stop()
         self.channels.clear()
+        self._suspended.clear()
+        self.idle.trim()
+        self.idle.check()
     
     def is_playing(self, sound_id: str) -> bool:
         """
@@ -127,8 +724,44 @@ class AudioMixer:
         Returns:
             True si le son est en lecture
         """
+        if sound_id in self._suspended:
+            return True
+        if sound_id in self.streams:
+            return not self.streams[sound_id].finished
         return sound_id in self.channels and self.channels[sound_id].get_busy()
     
+    def get_resident_bytes(self, sound_id: str) -> int:
+        """
+        Retourne la taille du PCM décodé gardé en mémoire pour un son.
+        
+        Args:
+            sound_id: Identifiant du son
+            
+        Returns:
+            Nombre d'octets (tampon circulaire pour un son lu en flux,
+            fichier entier décodé pour un son préchargé, réparti entre les
+            sons qui le partagent)
+        """
+        stream = self.streams.get(sound_id)
+        if stream is not None:
+            return stream.resident_bytes
+        
+        sound = self.sounds.get(sound_id)
+        if sound is None:
+            return 0
+        frame_bytes = self.num_channels * abs(self.sample_size) // 8
+        return int(sound.get_length() * self.frequency) * frame_bytes // self._sharers(sound_id)
+    
+    def _sharers(self, sound_id: str) -> int:
+        """Nombre de sons chargés partageant le tampon d'un son (au moins 1)."""
+        sound = self.sounds.get(sound_id)
+        return max(1, sum(1 for other in list(self.sounds.values()) if other is sound))
+    
+    def get_memory_report(self) -> Dict[str, int]:
+        """Retourne le PCM résident (octets) de chaque son chargé ou lu en flux."""
+        sound_ids = set(self.sounds) | set(self.streams)
+        return {sound_id: self.get_resident_bytes(sound_id) for sound_id in sorted(sound_ids)}
+    
     def fade_out(self, sound_id: str, duration_ms: int = 1000):
         """
         Effectue un fondu de sortie sur un son.
@@ -137,16 +770,244 @@ class AudioMixer:
             sound_id: Identifiant du son
             duration_ms: Durée du fondu en millisecondes
         """
+        if sound_id in self.streams:
+            self.streams[sound_id].fade_out(duration_ms)
         if sound_id in self.channels:
             self.channels[sound_id].fadeout(duration_ms)
+        self.idle.check(duration_ms / 1000.0)
     
     def fade_out_all(self, duration_ms: int = 1000):
         """Effectue un fondu de sortie sur tous les sons."""
+        for stream in list(self.streams.values()):
+            stream.fade_out(duration_ms)
         for channel in self.channels.values():
             channel.fadeout(duration_ms)
+        self.idle.check(duration_ms / 1000.0)
     
-    def cleanup(self):
-        """Nettoie les ressources audio."""
+    def clock(self) -> int:
+        """
+        Retourne la position de l'horloge de lecture, en trames.
+        
+        pygame ne donne pas la position de sa sortie : le temps écoulé depuis
+        l'ouverture du périphérique, pauses exclues, en tient lieu.
+        """
+        if self._clock_origin is None:
+            return self._clock_base
+        now = time.monotonic() if self._paused_at is None else max(self._paused_at,
+                                                                   self._clock_origin)
+        return self._clock_base + int((now - self._clock_origin) * self.frequency)
+    
+    def transition_to(self, sounds: Dict[str, float], fade_ms: int = 1000,
+                      name: Optional[str] = None,
+                      effects: Optional[Dict[str, dict]] = None) -> Future:
+        """
+        Fond le mix courant dans un preset (voir TransitionScheduler.transition_to).
+        
+        Args:
+            sounds: Volume de chaque son ({sound_id: volume})
+            fade_ms: Durée du fondu en millisecondes
+            name: Nom du preset
+            effects: Effets des sons du preset ({sound_id: paramètres})
+            
+        Returns:
+            Un Future résolu avec True une fois la transition lancée
+        """
+        return self.transitions.transition_to(sounds, fade_ms, name, effects)
+    
+    def queue_playlist(self, entries: Iterable[PlaylistEntry], loop: bool = False):
+        """Enchaîne des presets, chacun pendant sa durée (voir TransitionScheduler.queue)."""
+        self.transitions.queue(entries, loop)
+    
+    def clear_playlist(self):
+        """Abandonne la liste de lecture en cours."""
+        self.transitions.clear()
+    
+    def crossfade(self, layers: Dict[str, LayerSpec], duration_ms: int = 1000,
+                  at: Optional[int] = None) -> bool:
+        """
+        Mène chaque son à son volume cible, et les autres sons vers le silence.
+        
+        pygame n'a pas de gain par échantillon : les volumes suivent la rampe
+        par paliers, VOLUME_UPDATE_RATE fois par seconde, depuis un thread.
+        Les sons à lancer doivent déjà être chargés (voir load_async).
+        
+        Args:
+            layers: Sons à atteindre
+            duration_ms: Durée du fondu en millisecondes
+            at: Trame de l'horloge (voir clock) à laquelle commencer ;
+                None pour commencer tout de suite
+                
+        Returns:
+            True si le fondu a été lancé
+        """
+        self.idle.activity()
+        for sound_id, spec in layers.items():
+            if spec.effects is not None:
+                try:
+                    self.set_effects(sound_id, spec.effects)
+                except ValueError as e:
+                    print(f"Erreur: Effets invalides pour {sound_id}: {e}")
+        self._crossfade_generation += 1
+        thread = threading.Thread(
+            target=self._run_crossfade,
+            args=(self._crossfade_generation, dict(layers), duration_ms, at),
+            name="blanket-crossfade", daemon=True
+        )
+        thread.start()
+        return True
+    
+    def _run_crossfade(self, generation: int, layers: Dict[str, LayerSpec],
+                       duration_ms: int, at: Optional[int]):
+        """Thread d'un fondu enchaîné ; s'interrompt si un autre fondu commence."""
+        if at is not None:
+            while self._crossfade_generation == generation and self.clock() < at:
+                time.sleep(min(1.0 / VOLUME_UPDATE_RATE, (at - self.clock()) / self.frequency))
+        if self._crossfade_generation != generation:
+            return
+        
+        playing = [sound_id for sound_id in set(self.channels) | set(self.streams)
+                   if self.is_playing(sound_id)]
+        ramps = {sound_id: (self.volumes.get(sound_id, 0.5), 0.0)
+                 for sound_id in playing if sound_id not in layers}
+        for sound_id, spec in layers.items():
+            if sound_id in playing:
+                ramps[sound_id] = (self.volumes.get(sound_id, 0.5), spec.volume)
+            elif self._play_spec(sound_id, spec, 0.0):
+                ramps[sound_id] = (0.0, spec.volume)
+        
+        steps = max(1, int(duration_ms * VOLUME_UPDATE_RATE / 1000))
+        for step in range(1, steps + 1):
+            if step > 1:
+                time.sleep(1.0 / VOLUME_UPDATE_RATE)
+            if self._crossfade_generation != generation:
+                return
+            progress = step / steps
+            for sound_id, (start, target) in ramps.items():
+                self.set_volume(sound_id, start + (target - start) * progress)
+        
+        for sound_id in ramps:
+            if sound_id not in layers:
+                self.stop_sound(sound_id)
+        self.idle.check()
+    
+    def start_sleep_timer(self, duration: float, fade: float = 0.0):
+        """
+        Arrête la lecture après une durée de lecture (voir SleepTimer.start).
+        
+        Args:
+            duration: Temps de lecture avant l'arrêt (secondes)
+            fade: Durée du fondu final (secondes)
+        """
+        self.sleep_timer.start(duration, fade)
+    
+    def cancel_sleep_timer(self):
+        """Arrête le minuteur d'arrêt."""
+        self.sleep_timer.cancel()
+    
+    def sleep_timer_remaining(self) -> Optional[float]:
+        """Temps de lecture restant avant l'arrêt (secondes), None sans minuteur."""
+        return self.sleep_timer.remaining()
+    
+    def fade_output(self, duration_ms: int, at: Optional[int] = None):
+        """
+        Fond toute la sortie vers le silence, indépendamment des volumes.
+        
+        La courbe est linéaire en décibels. Les sons ne sont pas arrêtés :
+        restore_output rétablit le gain, release libère les ressources.
+        
+        Args:
+            duration_ms: Durée du fondu en millisecondes
+            at: Trame de l'horloge (voir clock) à laquelle commencer ;
+                None pour commencer tout de suite
+        """
+        self._output_fade_generation += 1
+        thread = threading.Thread(
+            target=self._run_output_fade,
+            args=(self._output_fade_generation, duration_ms, at),
+            name="blanket-output-fade", daemon=True
+        )
+        thread.start()
+    
+    def _run_output_fade(self, generation: int, duration_ms: int, at: Optional[int]):
+        """Thread du fondu de sortie, par paliers (pygame n'a pas d'étage de sortie)."""
+        if at is not None:
+            while self._output_fade_generation == generation and self.clock() < at:
+                time.sleep(min(1.0 / VOLUME_UPDATE_RATE, (at - self.clock()) / self.frequency))
+        start = self.output_gain
+        steps = max(1, int(duration_ms * VOLUME_UPDATE_RATE / 1000))
+        step = 0
+        while step < steps and self._output_fade_generation == generation:
+            # Comme l'horloge, le fondu est suspendu pendant une pause
+            if not self.paused:
+                step += 1
+                self._set_output_gain(float(db_ramp(start, 0.0, step / steps)))
+            time.sleep(1.0 / VOLUME_UPDATE_RATE)
+    
+    def restore_output(self):
+        """Annule le fondu de sortie et rétablit le gain de sortie."""
+        self._output_fade_generation += 1
+        if self.output_gain != 1.0:
+            self._set_output_gain(1.0)
+    
+    def _set_output_gain(self, gain: float):
+        """Applique un gain de sortie à tous les sons lus."""
+        self.output_gain = gain
+        for sound_id in list(self.streams) + list(self.channels):
+            self._apply_volume(sound_id)
+    
+    def release(self):
+        """
+        Arrête tous les sons et libère le périphérique et le PCM décodé.
+        
+        Le mixeur reste utilisable : le prochain son rouvre le périphérique.
+        """
+        self.transitions.clear()
+        self._cancel_fades()
         self.stop_all()
         self.sounds.clear()
-        pygame.mixer.quit()
+        with self._device_lock:
+            if self.device_open:
+                self._close_device()
+                self.device_open = False
+    
+    def _cancel_fades(self):
+        """Interrompt les fondus en cours et rétablit le gain de sortie."""
+        self._crossfade_generation += 1
+        self._output_fade_generation += 1
+        self.output_gain = 1.0
+    
+    def _play_spec(self, sound_id: str, spec: LayerSpec, volume: float) -> bool:
+        """Lance un son décrit par une transition."""
+        if spec.generator:
+            return self.play_generator(sound_id, spec.generator, volume, spec.category)
+        return self.play_sound(sound_id, spec.file, volume, spec.mode, spec.category)
+    
+    def cleanup(self):
+        """Nettoie les ressources audio."""
+        self._loader.shutdown(wait=False, cancel_futures=True)
+        self.sleep_timer.cancel()
+        self.idle.stop()
+        self.buffer_tuner.stop()
+        self.volume_updates.flush()
+        self.release()
+
+
+def create_mixer(engine: str = 'pygame', **kwargs) -> AudioMixer:
+    """
+    Crée le mixeur correspondant au moteur demandé.
+    
+    Args:
+        engine: 'pygame' ou 'numpy' (voir ENGINES)
+        **kwargs: Paramètres transmis au constructeur du mixeur
+        
+    Returns:
+        Le mixeur ; le moteur pygame est utilisé si le moteur NumPy
+        ne peut pas ouvrir de flux de sortie
+    """
+    if engine == 'numpy':
+        from src.audio import output
+        if output.is_available():
+            from src.audio.engine import EngineMixer
+            return EngineMixer(**kwargs)
+        print("Avertissement: sounddevice indisponible, utilisation du moteur pygame")
+    return AudioMixer(**kwargs)
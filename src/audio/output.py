@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+Flux de sortie unique alimenté par le moteur de mixage NumPy.
+"""
+
+from typing import Optional
+
+try:
+    import sounddevice
+except (ImportError, OSError):
+    # sounddevice absent ou bibliothèque PortAudio introuvable
+    sounddevice = None
+
+
+def is_available() -> bool:
+    """Indique si un flux de sortie peut être ouvert."""
+    return sounddevice is not None
+
+
+def native_samplerate() -> Optional[int]:
+    """
+    Retourne la fréquence native du périphérique de sortie par défaut.
+
+    Returns:
+        La fréquence (Hz), ou None si elle ne peut être lue
+    """
+    if sounddevice is None:
+        return None
+    try:
+        return int(sounddevice.query_devices(kind='output')['default_samplerate'])
+    except Exception as e:
+        print(f"Avertissement: fréquence du périphérique inconnue: {e}")
+        return None
+
+
+class OutputStream:
+    """Ouvre le périphérique audio et lui fournit les blocs rendus par le moteur."""
+
+    def __init__(self, engine, samplerate: int = 44100, channels: int = 2, blocksize: int = 512):
+        """
+        Args:
+            engine: Moteur de mixage (MixEngine) appelé à chaque bloc
+            samplerate: Fréquence d'échantillonnage (Hz)
+            channels: Nombre de canaux de sortie
+            blocksize: Nombre de trames demandées à chaque rappel
+        """
+        self.engine = engine
+        self.samplerate = samplerate
+        self.channels = channels
+        self.blocksize = blocksize
+        self.underruns = 0
+        self._stream = None
+
+    @property
+    def active(self) -> bool:
+        """Indique si le périphérique est ouvert."""
+        return self._stream is not None
+
+    def start(self):
+        """Ouvre le périphérique et démarre le rappel audio."""
+        if self._stream is not None:
+            return
+        if sounddevice is None:
+            raise RuntimeError("Le module sounddevice n'est pas installé")
+        self._stream = sounddevice.OutputStream(
+            samplerate=self.samplerate,
+            channels=self.channels,
+            dtype='float32',
+            blocksize=self.blocksize,
+            callback=self._callback,
+        )
+        self._stream.start()
+
+    def close(self):
+        """Arrête le rappel audio et ferme le périphérique."""
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+
+    def _callback(self, outdata, frames, time_info, status):
+        """Rappel du thread audio : rend un bloc directement dans le tampon de sortie."""
+        underrun = bool(status.output_underflow)
+        if underrun:
+            self.underruns += 1
+        # Avance du tampon : certains pilotes ne donnent pas l'heure courante
+        buffered = time_info.outputBufferDacTime - time_info.currentTime
+        try:
+            self.engine.render_into(outdata, underrun,
+                                    buffered if time_info.currentTime and buffered >= 0 else None)
+        except Exception as e:
+            # Une exception arrêterait le flux sounddevice : le bloc est rendu muet
+            print(f"Erreur dans le rappel audio: {e}")
+            outdata.fill(0.0)
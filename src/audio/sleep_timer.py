@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Minuteur d'arrêt compté sur l'horloge audio du mixeur.
+
+Le décompte avance avec l'audio réellement joué (voir AudioMixer.clock) et
+non avec les minuteurs Qt : il reste exact quand la fenêtre est réduite dans
+la barre des tâches ou que la boucle d'évènements est occupée, et une pause
+le suspend. Pendant les dernières minutes, la sortie est fondue vers le
+silence en suivant une courbe linéaire en décibels ; à l'échéance, les sons
+sont arrêtés et le mixeur libère le périphérique et le PCM décodé.
+"""
+
+import threading
+from typing import Callable, Optional
+
+# Avance avec laquelle le fondu final est planifié dans le mixeur (secondes)
+SCHEDULE_AHEAD = 1.0
+
+
+class SleepTimer:
+    """Arrête la lecture après une durée de lecture donnée, par un long fondu."""
+
+    def __init__(self, mixer):
+        """
+        Args:
+            mixer: Mixeur (clock, frequency, fade_output, restore_output, release)
+        """
+        self.mixer = mixer
+        # Appelé (depuis le thread du minuteur) une fois la lecture arrêtée
+        self.on_expired: Optional[Callable[[], None]] = None
+
+        # Échéance et durée du fondu, en trames de l'horloge audio
+        self._deadline: Optional[int] = None
+        self._fade_frames = 0
+        # Incrémenté à chaque relance ou annulation
+        self._generation = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def active(self) -> bool:
+        """True tant que le minuteur court."""
+        return self._deadline is not None
+
+    def remaining(self) -> Optional[float]:
+        """Temps de lecture restant (secondes), None si le minuteur est arrêté."""
+        deadline = self._deadline
+        if deadline is None:
+            return None
+        return max(0, deadline - self.mixer.clock()) / self.mixer.frequency
+
+    def start(self, duration: float, fade: float = 0.0):
+        """
+        Lance (ou relance) le minuteur.
+
+        Args:
+            duration: Temps de lecture avant l'arrêt (secondes)
+            fade: Durée du fondu final, comprise dans duration (secondes)
+        """
+        frequency = self.mixer.frequency
+        with self._condition:
+            self._deadline = self.mixer.clock() + int(duration * frequency)
+            self._fade_frames = int(min(fade, duration) * frequency)
+            self._generation += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="blanket-sleep-timer", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify_all()
+        # Un fondu d'un précédent décompte ne doit pas se poursuivre
+        self.mixer.restore_output()
+
+    def cancel(self):
+        """Arrête le minuteur ; un fondu déjà commencé est annulé."""
+        with self._condition:
+            if self._deadline is None:
+                return
+            self._deadline = None
+            self._generation += 1
+            self._condition.notify_all()
+        self.mixer.restore_output()
+
+    def _run(self):
+        """Boucle du minuteur : planifie le fondu, puis arrête la lecture à l'échéance."""
+        faded = None
+        while True:
+            with self._condition:
+                if self._deadline is None:
+                    self._thread = None
+                    return
+                generation = self._generation
+                deadline = self._deadline
+                fade_frames = self._fade_frames
+                fade_start = deadline - fade_frames
+                now = self.mixer.clock()
+                ahead = int(SCHEDULE_AHEAD * self.mixer.frequency)
+                if now >= deadline:
+                    self._deadline = None
+                elif faded == generation or fade_frames == 0 or now < fade_start - ahead:
+                    # L'horloge audio n'avance jamais plus vite que le temps réel
+                    target = deadline if faded == generation or fade_frames == 0 \
+                        else fade_start - ahead
+                    self._condition.wait((target - now) / self.mixer.frequency)
+                    continue
+
+            if faded != generation and fade_frames and now < deadline:
+                self.mixer.fade_output(fade_frames * 1000 // self.mixer.frequency, at=fade_start)
+                faded = generation
+                continue
+
+            try:
+                self.mixer.release()
+            except Exception as e:
+                print(f"Erreur lors de l'arrêt du minuteur: {e}")
+            if self.on_expired is not None:
+                self.on_expired()
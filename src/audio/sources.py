@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Sources audio lues bloc par bloc par le moteur de mixage NumPy.
+"""
+
+import numpy as np
+
+from src.audio.streaming import StreamReader
+
+
+class BufferSource:
+    """Source bouclant sur un PCM entièrement décodé en mémoire."""
+
+    def __init__(self, pcm: np.ndarray):
+        """
+        Args:
+            pcm: PCM de forme (trames, canaux), int16 ou float32 ; un PCM
+                mono (trames, 1) est étendu aux canaux du moteur au mixage
+        """
+        self.pcm = pcm
+        self.position = 0
+        # Facteur ramenant les échantillons dans [-1.0, 1.0]
+        self.scale = 1.0 / 32768.0 if pcm.dtype == np.int16 else 1.0
+        # Gain de normalisation du fichier (voir loudness.py)
+        self.normalization = 1.0
+        self.finished = False
+
+    @property
+    def resident_bytes(self) -> int:
+        """Taille du PCM gardé en mémoire."""
+        return self.pcm.nbytes
+
+    def read(self, frames: int) -> np.ndarray:
+        """
+        Retourne les trames suivantes en bouclant.
+
+        Le résultat est une vue sur le PCM quand le bloc ne chevauche pas la
+        fin du fichier : aucune copie n'est faite dans le cas courant.
+        """
+        start = self.position
+        end = start + frames
+        length = len(self.pcm)
+        if end <= length:
+            self.position = end % length
+            return self.pcm[start:end]
+
+        indices = np.arange(start, end) % length
+        self.position = end % length
+        return self.pcm[indices]
+
+    def pump(self):
+        """Rien à pré-décoder pour un PCM en mémoire."""
+
+    def stop(self):
+        """Rien à libérer : le PCM reste dans le cache du mixeur."""
+        self.finished = True
+
+
+class StreamSource:
+    """Source décodant un fichier en flux à travers un StreamReader."""
+
+    def __init__(self, reader: StreamReader):
+        """
+        Args:
+            reader: Lecteur par blocs du fichier
+        """
+        self.reader = reader
+        self.scale = 1.0 / 32768.0
+        self.normalization = 1.0
+        self.finished = False
+
+    @property
+    def resident_bytes(self) -> int:
+        """Taille du tampon circulaire."""
+        return self.reader.resident_bytes
+
+    def read(self, frames: int) -> np.ndarray:
+        """Retourne les trames suivantes du tampon circulaire."""
+        return self.reader.read(frames)
+
+    def pump(self):
+        """Décode en avance pour que le thread audio n'ait pas à le faire."""
+        self.reader.fill()
+
+    def stop(self):
+        """Ferme le fichier source (sans effet si déjà fermé)."""
+        self.finished = True
+        self.reader.close()
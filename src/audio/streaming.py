@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Lecture en flux des sons longs.
+
+Au lieu de décoder tout le fichier en PCM, le son est décodé par blocs de
+taille fixe dans un tampon circulaire propre à chaque son actif : la mémoire
+occupée reste bornée quelle que soit la durée du fichier.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+import numpy as np
+
+from src.audio import decoder
+from src.audio.loops import LoopPoints, crossfade
+
+# Taille d'un bloc décodé (~186 ms à 44,1 kHz)
+CHUNK_FRAMES = 8192
+
+# Nombre de blocs conservés dans le tampon circulaire
+RING_CHUNKS = 4
+
+# Nombre de blocs remis à pygame (un en lecture, un en file d'attente)
+QUEUED_CHUNKS = 2
+
+
+class StreamReader:
+    """Décode un fichier en boucle dans un tampon circulaire de taille fixe."""
+
+    def __init__(self, file_path: str, channels: int = 2,
+                 chunk_frames: int = CHUNK_FRAMES, ring_chunks: int = RING_CHUNKS,
+                 loop: Optional[LoopPoints] = None):
+        """
+        Ouvre le fichier et pré-remplit le tampon.
+
+        Args:
+            file_path: Chemin vers le fichier audio
+            channels: Nombre de canaux de sortie (1=mono, 2=stereo)
+            chunk_frames: Nombre de trames décodées à chaque bloc
+            ring_chunks: Nombre de blocs que peut contenir le tampon
+            loop: Points de boucle ; sans eux, le fichier entier est bouclé
+        """
+        self.file_path = file_path
+        self.channels = channels
+        self.chunk_frames = chunk_frames
+        self._file = decoder.open_file(file_path)
+        self.samplerate = self._file.samplerate
+
+        # Bornes de la boucle dans le fichier et position de décodage
+        self._loop_start = 0
+        self._loop_end = self._file.frames
+        self._preroll: Optional[np.ndarray] = None
+        if loop is not None:
+            loop = loop.scaled(self.samplerate)
+            if loop.crossfade <= loop.start < loop.end - loop.crossfade <= self._file.frames:
+                self._loop_start, self._loop_end = loop.start, loop.end
+                if loop.crossfade:
+                    # Audio précédant le début de la boucle, fondu dans sa fin
+                    self._file.seek(loop.start - loop.crossfade)
+                    self._preroll = self._file.read(loop.crossfade, dtype='int16', always_2d=True)
+                self._file.seek(loop.start)
+        self._file_pos = self._loop_start
+
+        self._ring = np.zeros((chunk_frames * ring_chunks, channels), dtype=np.int16)
+        self._scratch = np.zeros((chunk_frames, self._file.channels), dtype=np.int16)
+        # Positions absolues de lecture et d'écriture dans le tampon
+        self._read_pos = 0
+        self._write_pos = 0
+        self._lock = threading.Lock()
+
+        self.fill()
+
+    @property
+    def available(self) -> int:
+        """Nombre de trames décodées et pas encore lues."""
+        return self._write_pos - self._read_pos
+
+    @property
+    def resident_bytes(self) -> int:
+        """Taille du PCM résident dans le tampon circulaire."""
+        return self._ring.nbytes + self._scratch.nbytes
+
+    def fill(self):
+        """Décode des blocs jusqu'à remplir le tampon."""
+        with self._lock:
+            while len(self._ring) - self.available >= self.chunk_frames:
+                self._decode_chunk()
+
+    def read(self, frames: int) -> np.ndarray:
+        """
+        Retourne les trames suivantes en bouclant sur le fichier.
+
+        Args:
+            frames: Nombre de trames demandées (au plus la taille du tampon)
+
+        Returns:
+            Un tableau int16 de forme (frames, channels)
+        """
+        frames = min(frames, len(self._ring))
+        with self._lock:
+            while self.available < frames:
+                self._decode_chunk()
+
+            start = self._read_pos % len(self._ring)
+            end = start + frames
+            if end <= len(self._ring):
+                block = self._ring[start:end].copy()
+            else:
+                block = np.concatenate((self._ring[start:], self._ring[:end - len(self._ring)]))
+            self._read_pos += frames
+        return block
+
+    def close(self):
+        """Ferme le fichier source (sans effet si déjà fermé)."""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def _decode_chunk(self):
+        """Décode un bloc à la position d'écriture, en revenant au début de la boucle à sa fin."""
+        count = min(self.chunk_frames, self._loop_end - self._file_pos)
+        decoded = self._file.read(count, dtype='int16', always_2d=True,
+                                  out=self._scratch[:count])
+        if len(decoded) == 0 and self._file_pos == self._loop_start:
+            raise RuntimeError(f"Fichier audio vide: {self.file_path}")
+
+        if self._preroll is not None:
+            # Fondu de la fin de boucle avec l'audio qui précède son début
+            fade_start = self._loop_end - len(self._preroll)
+            first = max(self._file_pos, fade_start)
+            last = self._file_pos + len(decoded)
+            if first < last:
+                head = first - self._file_pos
+                decoded[head:] = crossfade(decoded[head:], self._preroll, first - fade_start)
+
+        self._file_pos += len(decoded)
+        if len(decoded) < count or self._file_pos >= self._loop_end:
+            # Fin de la boucle : on reprend à son début
+            self._file.seek(self._loop_start)
+            self._file_pos = self._loop_start
+            if len(decoded) == 0:
+                return
+
+        if decoded.shape[1] > self.channels:
+            decoded = decoded[:, :self.channels]
+
+        # Écriture en deux parties si le bloc chevauche la fin du tampon
+        count = len(decoded)
+        start = self._write_pos % len(self._ring)
+        head = min(count, len(self._ring) - start)
+        self._ring[start:start + head] = decoded[:head]  # un son mono est dupliqué sur les canaux
+        self._ring[:count - head] = decoded[head:]
+        self._write_pos += count
+
+
+class StreamingPlayback:
+    """Alimente un canal pygame avec les blocs d'un StreamReader."""
+
+    def __init__(self, reader: StreamReader, channel, volume: float):
+        """
+        Args:
+            reader: Source des blocs décodés
+            channel: Canal pygame dédié à ce son
+            volume: Volume de lecture (0.0 - 1.0)
+        """
+        self.reader = reader
+        self.channel = channel
+        self.volume = volume
+        self._sounds = deque(maxlen=QUEUED_CHUNKS)
+        self._fade_start: Optional[float] = None
+        self._fade_duration = 0.0
+        self.finished = False
+
+    @property
+    def resident_bytes(self) -> int:
+        """PCM résident : tampon circulaire et blocs remis à pygame."""
+        held = sum(sound.get_length() for sound in self._sounds)
+        frame_bytes = self.reader.channels * 2
+        return self.reader.resident_bytes + int(held * self.reader.samplerate) * frame_bytes
+
+    def start(self):
+        """Démarre la lecture et met le bloc suivant en file d'attente."""
+        # Le volume est porté par les blocs : celui qu'un son préchargé a
+        # laissé sur le canal ne doit pas s'y ajouter
+        self.channel.set_volume(1.0)
+        self.channel.play(self._next_sound())
+        self.channel.queue(self._next_sound())
+
+    def pump(self):
+        """Ré-alimente le canal ; à appeler régulièrement depuis le thread de flux."""
+        if self.finished:
+            return
+        if self._fade_start is not None:
+            elapsed = time.monotonic() - self._fade_start
+            if elapsed >= self._fade_duration:
+                self.stop()
+                return
+            self._apply_volume(self.volume * (1.0 - elapsed / self._fade_duration))
+
+        if not self.channel.get_busy():
+            # Le canal s'est vidé (retard du thread) : on relance la lecture
+            self.start()
+        elif self.channel.get_queue() is None:
+            self.channel.queue(self._next_sound())
+        self.reader.fill()
+
+    def set_volume(self, volume: float):
+        """Définit le volume des blocs en cours et à venir."""
+        self.volume = volume
+        if self._fade_start is None:
+            self._apply_volume(volume)
+
+    def fade_out(self, duration_ms: int):
+        """
+        Démarre un fondu de sortie, appliqué bloc par bloc par ``pump``.
+
+        ``Channel.fadeout`` ne convient pas ici : pygame enchaînerait sur le
+        bloc en file d'attente une fois le fondu terminé.
+        """
+        self._fade_start = time.monotonic()
+        self._fade_duration = max(duration_ms, 1) / 1000.0
+
+    def stop(self):
+        """Arrête la lecture et libère les blocs (sans effet si déjà arrêté)."""
+        if self.finished:
+            return
+        self.finished = True
+        self.channel.stop()
+        self._sounds.clear()
+        self.reader.close()
+
+    def _next_sound(self):
+        import pygame
+
+        sound = pygame.mixer.Sound(buffer=self.reader.read(self.reader.chunk_frames))
+        sound.set_volume(self._current_volume())
+        self._sounds.append(sound)
+        return sound
+
+    def _current_volume(self) -> float:
+        if self._sounds and self._fade_start is not None:
+            return self._sounds[-1].get_volume()
+        return self.volume
+
+    def _apply_volume(self, volume: float):
+        for sound in self._sounds:
+            sound.set_volume(volume)
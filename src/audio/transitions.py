@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Transitions entre presets, calées sur l'horloge audio du mixeur.
+
+Une transition fait passer le mix courant à celui d'un preset : chaque son
+est mené à son volume cible, et les sons absents du preset vers le silence,
+par une rampe de gain. Les sons à ajouter sont chargés (et leur tampon de
+flux rempli) avant le début de la transition : aucun décodage n'intervient
+pendant le fondu.
+
+Une liste de lecture enchaîne des presets, chacun joué pendant une durée
+donnée. Les instants de départ sont comptés en trames sur l'horloge du
+mixeur, c'est-à-dire en audio réellement mixé : une pause décale toute la
+suite de la liste, et les transitions ne dérivent pas avec les minuteurs.
+"""
+
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.core.sounds import SOUNDS_DATA
+
+# Avance avec laquelle les sons d'une transition planifiée sont préparés (secondes)
+PREPARE_AHEAD = 2.0
+
+
+class LayerSpec(NamedTuple):
+    """Son à atteindre par une transition, et de quoi le lancer s'il ne joue pas."""
+
+    volume: float
+    file: Optional[str] = None
+    generator: Optional[str] = None
+    mode: str = 'auto'
+    category: Optional[str] = None
+    # Effets du son (voir effects.py) ; None : ceux du son restent inchangés
+    effects: Optional[Dict[str, Any]] = None
+
+
+class PlaylistEntry(NamedTuple):
+    """Preset d'une liste de lecture."""
+
+    sounds: Dict[str, float]
+    # Temps passé sur ce preset, fondu d'entrée compris (secondes)
+    duration: float
+    fade_ms: int = 1000
+    name: Optional[str] = None
+    # Effets de chaque son ({sound_id: paramètres}) ; None : inchangés
+    effects: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+def preset_layers(sounds: Dict[str, float], sounds_data: Optional[dict] = None,
+                  effects: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, LayerSpec]:
+    """
+    Décrit les sons d'un preset pour le mixeur.
+
+    Args:
+        sounds: Volume de chaque son ({sound_id: volume}, format des presets)
+        sounds_data: Catalogue des sons (SOUNDS_DATA par défaut)
+        effects: Effets des sons du preset ; un son absent n'en a pas.
+            None laisse les effets des sons inchangés
+
+    Returns:
+        Les sons connus du catalogue ; les autres sont ignorés
+    """
+    sounds_data = SOUNDS_DATA if sounds_data is None else sounds_data
+    layers = {}
+    for sound_id, volume in sounds.items():
+        sound_data = sounds_data.get(sound_id)
+        if sound_data is None:
+            print(f"Avertissement: Son inconnu ignoré: {sound_id}")
+            continue
+        layers[sound_id] = LayerSpec(volume, sound_data.get('file'), sound_data.get('generator'),
+                                     sound_data.get('playback', 'auto'), sound_data.get('category'),
+                                     None if effects is None else effects.get(sound_id, {}))
+    return layers
+
+
+class TransitionScheduler:
+    """Applique les transitions demandées, immédiates ou planifiées, au mixeur."""
+
+    def __init__(self, mixer, sounds_data: Optional[dict] = None):
+        """
+        Args:
+            mixer: Mixeur (clock, frequency, load_async, is_playing, crossfade)
+            sounds_data: Catalogue des sons (SOUNDS_DATA par défaut)
+        """
+        self.mixer = mixer
+        self.sounds_data = sounds_data
+        # Appelé (depuis le thread du planificateur) au départ de chaque transition
+        self.on_transition: Optional[Callable[[PlaylistEntry], None]] = None
+        self.current: Optional[PlaylistEntry] = None
+
+        self._queue: Deque[Tuple[PlaylistEntry, Optional[Future]]] = deque()
+        self._loop = False
+        # Trame de départ de la prochaine transition (None : dès que prête)
+        self._next_start: Optional[int] = None
+        # Incrémenté à chaque remplacement de la liste
+        self._generation = 0
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def pending(self) -> List[PlaylistEntry]:
+        """Presets en attente, dans l'ordre."""
+        with self._condition:
+            return [entry for entry, _future in self._queue]
+
+    def transition_to(self, sounds: Dict[str, float], fade_ms: int = 1000,
+                      name: Optional[str] = None,
+                      effects: Optional[Dict[str, Dict[str, Any]]] = None) -> Future:
+        """
+        Fond le mix courant dans un preset, dès que ses sons sont prêts.
+
+        La liste de lecture en cours est abandonnée.
+
+        Args:
+            sounds: Volume de chaque son ({sound_id: volume})
+            fade_ms: Durée du fondu en millisecondes
+            name: Nom du preset
+            effects: Effets des sons du preset (voir preset_layers)
+
+        Returns:
+            Un Future résolu avec True une fois la transition lancée (False si
+            un son n'a pas pu l'être)
+        """
+        future = Future()
+        entry = PlaylistEntry(dict(sounds), 0.0, fade_ms, name, effects)
+        self._replace([(entry, future)], loop=False)
+        return future
+
+    def queue(self, entries: Iterable[PlaylistEntry], loop: bool = False):
+        """
+        Remplace la liste de lecture ; son premier preset commence tout de suite.
+
+        Args:
+            entries: Presets à enchaîner
+            loop: Reprendre au début après le dernier preset
+        """
+        self._replace([(entry, None) for entry in entries], loop)
+
+    def clear(self):
+        """Abandonne la liste de lecture (le mix courant continue)."""
+        self._replace([], loop=False)
+
+    def _replace(self, items: List[Tuple[PlaylistEntry, Optional[Future]]], loop: bool):
+        with self._condition:
+            for _entry, future in self._queue:
+                if future is not None:
+                    future.cancel()
+            self._queue = deque(items)
+            self._loop = loop and bool(items)
+            self._next_start = None
+            self._generation += 1
+            if items and self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="blanket-transitions", daemon=True
+                )
+                self._thread.start()
+            self._condition.notify_all()
+
+    def _run(self):
+        """Boucle du planificateur ; s'arrête quand la liste est vide."""
+        while True:
+            with self._condition:
+                item = self._next_due()
+                if item is None:
+                    self._thread = None
+                    return
+                entry, future, start = item
+                generation = self._generation
+
+            try:
+                applied = self._apply(entry, start)
+            except Exception as e:
+                print(f"Erreur lors de la transition vers le preset {entry.name or ''}: {e}")
+                applied = False
+            if future is not None and future.set_running_or_notify_cancel():
+                future.set_result(applied)
+
+            with self._condition:
+                if self._generation != generation:
+                    continue
+                # Une transition partie en retard décale la suite de la liste
+                base = self.mixer.clock() if start is None else max(start, self.mixer.clock())
+                self._next_start = base + int(entry.duration * self.mixer.frequency)
+                # Le preset suivant n'est préparé qu'une fois celui-ci parti : une
+                # transition en attente serait sinon remplacée avant son départ
+                while self._generation == generation and self.mixer.clock() < base:
+                    self._condition.wait((base - self.mixer.clock()) / self.mixer.frequency)
+                if self._generation != generation:
+                    continue
+                self.current = entry
+            if self.on_transition is not None:
+                self.on_transition(entry)
+
+    def _next_due(self) -> Optional[Tuple[PlaylistEntry, Optional[Future], Optional[int]]]:
+        """Attend que la prochaine transition soit à préparer (appelé sous verrou)."""
+        while self._queue:
+            start = self._next_start
+            if start is not None:
+                # L'horloge audio n'avance jamais plus vite que le temps réel :
+                # attendre le délai restant ne fait pas manquer le départ.
+                remaining = (start - self.mixer.clock()) / self.mixer.frequency - PREPARE_AHEAD
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+            entry, future = self._queue.popleft()
+            if self._loop:
+                self._queue.append((entry, None))
+            return entry, future, start
+        return None
+
+    def _apply(self, entry: PlaylistEntry, start: Optional[int]) -> bool:
+        """Prépare les sons d'un preset puis lance la transition à la trame prévue."""
+        layers = preset_layers(entry.sounds, self.sounds_data, entry.effects)
+        loads = {
+            sound_id: self.mixer.load_async(sound_id, spec.file, spec.mode)
+            for sound_id, spec in layers.items()
+            if spec.file and not self.mixer.is_playing(sound_id)
+        }
+        for sound_id, future in loads.items():
+            if not future.result():
+                del layers[sound_id]
+        applied = self.mixer.crossfade(layers, entry.fade_ms, at=start)
+        return applied and len(layers) == len(entry.sounds)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Regroupement des changements de volume.
+
+Un curseur émet un évènement à chaque pas : appliquer chacun au mixeur
+multiplie les appels pendant un glissement. Le planificateur ne garde que la
+dernière valeur demandée pour chaque son (et pour le volume principal) et
+applique l'ensemble en un seul lot, au plus VOLUME_UPDATE_RATE fois par
+seconde.
+
+Les longs fondus suivent une courbe linéaire en décibels : l'oreille perçoit
+alors une baisse régulière, là où une rampe linéaire du gain semble ne rien
+faire pendant la première moitié puis s'effondrer à la fin.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+# Fréquence maximale d'application des volumes (Hz)
+VOLUME_UPDATE_RATE = 60
+
+# Niveau auquel une rampe en décibels vers le silence aboutit avant de couper (dB)
+FADE_FLOOR_DB = -60.0
+
+
+def gain_to_db(gain: float) -> float:
+    """Convertit un gain linéaire en décibels, borné à FADE_FLOOR_DB."""
+    return max(FADE_FLOOR_DB, 20.0 * math.log10(gain)) if gain > 0 else FADE_FLOOR_DB
+
+
+def db_ramp(start: float, target: float, progress):
+    """
+    Gain le long d'une rampe linéaire en décibels.
+
+    Args:
+        start: Gain linéaire de départ
+        target: Gain linéaire d'arrivée
+        progress: Avancement dans [0, 1] (scalaire ou tableau)
+
+    Returns:
+        Le gain linéaire, égal à target en fin de rampe
+    """
+    start_db = gain_to_db(start)
+    gains = np.power(10.0, (start_db + (gain_to_db(target) - start_db) * progress) / 20.0)
+    return np.where(np.asarray(progress) >= 1.0, target, gains)
+
+
+class VolumeScheduler:
+    """Fusionne les changements de volume et les applique par lots au mixeur."""
+
+    def __init__(self, mixer, rate: int = VOLUME_UPDATE_RATE):
+        """
+        Args:
+            mixer: Mixeur recevant les lots (set_volume, set_master_volume)
+            rate: Nombre maximal de lots par seconde
+        """
+        self.mixer = mixer
+        self.interval = 1.0 / rate
+        self._volumes: Dict[str, float] = {}
+        self._master: Optional[float] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+        # Compteurs : demandes reçues, lots appliqués, appels au mixeur
+        self.requests = 0
+        self.batches = 0
+        self.mixer_calls = 0
+
+    def set_volume(self, sound_id: str, volume: float):
+        """Demande un changement de volume pour un son."""
+        with self._lock:
+            self._volumes[sound_id] = volume
+            self.requests += 1
+            self._ensure_thread()
+
+    def set_master_volume(self, volume: float):
+        """Demande un changement du volume principal."""
+        with self._lock:
+            self._master = volume
+            self.requests += 1
+            self._ensure_thread()
+
+    def discard(self, sound_id: str):
+        """Oublie le changement en attente d'un son (son arrêté)."""
+        with self._lock:
+            self._volumes.pop(sound_id, None)
+
+    def flush(self):
+        """Applique immédiatement les changements en attente."""
+        with self._lock:
+            volumes, self._volumes = self._volumes, {}
+            master, self._master = self._master, None
+        if not volumes and master is None:
+            return
+
+        if master is not None:
+            self.mixer.set_master_volume(master)
+        for sound_id, volume in volumes.items():
+            self.mixer.set_volume(sound_id, volume)
+        self.batches += 1
+        self.mixer_calls += len(volumes) + (master is not None)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Retourne les compteurs de demandes, de lots et d'appels au mixeur."""
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'mixer_calls': self.mixer_calls,
+        }
+
+    def reset_stats(self):
+        """Remet les compteurs à zéro."""
+        self.requests = self.batches = self.mixer_calls = 0
+
+    def _ensure_thread(self):
+        """Démarre le thread d'application des lots (appelé sous verrou)."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="blanket-volume", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        """Applique un lot par intervalle ; s'arrête dès qu'il n'y a plus rien à faire."""
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._volumes and self._master is None:
+                    self._thread = None
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Erreur lors de l'application des volumes: {e}")
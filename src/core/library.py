@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Bibliothèque de sons de l'utilisateur.
+
+Les fichiers audio des dossiers surveillés (et ceux ouverts un par un) sont
+ajoutés au catalogue à côté des sons inclus. L'analyse ne lit que l'en-tête
+de chaque fichier (durée, fréquence, canaux) ; ses résultats sont gardés
+dans un index, si bien qu'au lancement suivant seuls les fichiers nouveaux
+ou modifiés sont relus. Le parcours des dossiers se fait dans un thread
+d'arrière-plan et signale chaque son dès qu'il est trouvé.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from src.audio import decoder
+from src.audio.index import FileIndex
+from src.core.sounds import SOUNDS_DATA
+
+# Extensions des fichiers audio reconnus
+AUDIO_EXTENSIONS = ('.ogg', '.wav', '.flac', '.mp3')
+
+# Catégorie des sons de la bibliothèque (voir CATEGORIES)
+LIBRARY_CATEGORY = 'library'
+
+# Icône des cartes des sons de la bibliothèque
+LIBRARY_ICON = '🎧'
+
+
+def default_library_path() -> Path:
+    """Retourne le chemin de l'index de la bibliothèque dans les données de l'application."""
+    from PyQt6.QtCore import QStandardPaths
+
+    location = QStandardPaths.writableLocation(
+        QStandardPaths.StandardLocation.AppDataLocation
+    )
+    return Path(location) / 'library.json'
+
+
+def sound_id(file_path: str) -> str:
+    """Identifiant stable du son d'un fichier (dérivé de son chemin)."""
+    path = str(Path(file_path).resolve())
+    return 'user_' + hashlib.sha1(path.encode('utf-8')).hexdigest()[:12]
+
+
+def sound_data(file_path: str, info: dict) -> dict:
+    """
+    Décrit le son d'un fichier au format de SOUNDS_DATA.
+
+    Args:
+        file_path: Chemin vers le fichier audio
+        info: Caractéristiques enregistrées dans l'index (voir SoundLibrary)
+    """
+    path = Path(file_path)
+    minutes, seconds = divmod(int(round(info['duration'])), 60)
+    channels = "mono" if info['channels'] == 1 else f"{info['channels']} canaux"
+    return {
+        'name': path.stem.replace('_', ' ').replace('-', ' ').strip().capitalize() or path.name,
+        'icon': LIBRARY_ICON,
+        'category': LIBRARY_CATEGORY,
+        'file': str(path),
+        'description': f"{info['format']}, {minutes}:{seconds:02d}, "
+                       f"{info['samplerate']} Hz, {channels}",
+    }
+
+
+def register(sounds: Dict[str, dict]):
+    """
+    Ajoute des sons au catalogue partagé (SOUNDS_DATA), où presets, service
+    et rendu hors ligne les retrouvent comme les sons inclus.
+    """
+    SOUNDS_DATA.update(sounds)
+
+
+def unregister(sound_ids: Iterable[str]):
+    """Retire du catalogue partagé les sons dont le fichier a disparu."""
+    for key in sound_ids:
+        SOUNDS_DATA.pop(key, None)
+
+
+class SoundLibrary:
+    """Sons des dossiers surveillés et des fichiers ajoutés par l'utilisateur."""
+
+    def __init__(self, folders: Iterable[str] = (), files: Iterable[str] = (),
+                 path: Optional[Path] = None):
+        """
+        Args:
+            folders: Dossiers parcourus (sous-dossiers compris)
+            files: Fichiers ajoutés un par un
+            path: Fichier de l'index (par défaut dans les données de l'application)
+        """
+        self.folders = list(folders)
+        self.files = list(files)
+        self.index = FileIndex(path or default_library_path())
+        # Un seul parcours à la fois ; un parcours demandé pendant un autre attend sa fin
+        self._scan_lock = threading.Lock()
+
+    def cached_sounds(self) -> Dict[str, dict]:
+        """
+        Retourne les sons déjà indexés dont le fichier n'a pas changé.
+
+        Rien n'est relu : seule la date et la taille de chaque fichier sont
+        comparées à l'index, ce qui permet d'afficher la bibliothèque dès le
+        démarrage, avant la fin du parcours des dossiers.
+        """
+        sounds = {}
+        for file_path, _data in self.index.items():
+            info = self.index.get(file_path)
+            if info is not None and not info.get('unreadable') and self._wanted(file_path):
+                sounds[sound_id(file_path)] = sound_data(file_path, info)
+        return sounds
+
+    def add_folder(self, folder: str) -> bool:
+        """Ajoute un dossier surveillé ; False s'il l'est déjà."""
+        if folder in self.folders:
+            return False
+        self.folders.append(folder)
+        return True
+
+    def add_file(self, file_path: str) -> Optional[dict]:
+        """
+        Ajoute un fichier isolé à la bibliothèque.
+
+        Returns:
+            Le son du fichier au format de SOUNDS_DATA, None s'il est illisible
+        """
+        info = self._probe(file_path)
+        if info is None:
+            return None
+        if file_path not in self.files:
+            self.files.append(file_path)
+        self._save()
+        return sound_data(file_path, info)
+
+    def scan(self, on_found: Optional[Callable[[str, dict], None]] = None,
+             on_removed: Optional[Callable[[str], None]] = None) -> Dict[str, dict]:
+        """
+        Parcourt les dossiers et fichiers de la bibliothèque.
+
+        Seuls les fichiers absents de l'index ou modifiés sont relus ; les
+        entrées des fichiers disparus sont retirées de l'index.
+
+        Args:
+            on_found: Appelé avec (sound_id, son) pour chaque son trouvé,
+                dès qu'il l'est (depuis le thread du parcours)
+            on_removed: Appelé avec le sound_id de chaque fichier indexé
+                disparu ou sorti de la bibliothèque (depuis le thread du parcours)
+
+        Returns:
+            Les sons trouvés ({sound_id: son})
+        """
+        with self._scan_lock:
+            found = {}
+            seen = set()
+            for file_path in self._audio_files():
+                seen.add(str(Path(file_path).resolve()))
+                info = self._probe(file_path)
+                if info is None:
+                    continue
+                key, sound = sound_id(file_path), sound_data(file_path, info)
+                found[key] = sound
+                if on_found is not None:
+                    on_found(key, sound)
+            for file_path in self.index.keys():
+                if file_path not in seen:
+                    self.index.remove(file_path)
+                    if on_removed is not None:
+                        on_removed(sound_id(file_path))
+            self._save()
+            return found
+
+    def scan_async(self, on_found: Optional[Callable[[str, dict], None]] = None,
+                   on_done: Optional[Callable[[Dict[str, dict]], None]] = None,
+                   on_removed: Optional[Callable[[str], None]] = None):
+        """
+        Lance scan() dans un thread d'arrière-plan.
+
+        Args:
+            on_found: Voir scan()
+            on_done: Appelé avec les sons trouvés à la fin du parcours
+            on_removed: Voir scan()
+        """
+        def run():
+            try:
+                found = self.scan(on_found, on_removed)
+            except Exception as e:
+                print(f"Erreur lors du parcours de la bibliothèque: {e}")
+                found = {}
+            if on_done is not None:
+                on_done(found)
+
+        threading.Thread(target=run, name="blanket-library", daemon=True).start()
+
+    def _probe(self, file_path: str) -> Optional[dict]:
+        """Caractéristiques d'un fichier, relues seulement s'il a changé."""
+        info = self.index.get(file_path)
+        if info is not None:
+            return None if info.get('unreadable') else info
+        audio = decoder.probe(file_path)
+        if audio is None or not audio.frames:
+            # Retenu aussi : un fichier illisible n'est pas relu à chaque parcours
+            info = {'unreadable': True}
+        else:
+            info = {
+                'format': Path(file_path).suffix.lstrip('.').upper(),
+                'samplerate': audio.samplerate,
+                'channels': audio.channels,
+                'duration': audio.duration,
+            }
+        try:
+            self.index.put(file_path, info)
+        except OSError:
+            # Fichier disparu pendant l'analyse
+            return None
+        return None if info.get('unreadable') else info
+
+    def _audio_files(self) -> Iterator[str]:
+        """Fichiers audio des dossiers (triés) puis fichiers isolés encore présents."""
+        for folder in self.folders:
+            for root, dirs, names in os.walk(folder):
+                dirs.sort()
+                for name in sorted(names):
+                    if name.lower().endswith(AUDIO_EXTENSIONS):
+                        yield os.path.join(root, name)
+        for file_path in self.files:
+            if os.path.isfile(file_path):
+                yield file_path
+
+    def _wanted(self, file_path: str) -> bool:
+        """Indique si un fichier indexé fait encore partie de la bibliothèque."""
+        path = Path(file_path).resolve()
+        if any(Path(other).resolve() == path for other in self.files):
+            return True
+        for folder in self.folders:
+            try:
+                path.relative_to(Path(folder).resolve())
+                return True
+            except ValueError:
+                continue
+        return False
+
+    def _save(self):
+        try:
+            self.index.save()
+        except OSError as e:
+            print(f"Avertissement: impossible d'enregistrer l'index de la bibliothèque: {e}")
@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+"""
+Index de recherche des presets.
+
+Chaque preset est découpé en mots : ceux de son nom, ses tags (aussi indexés
+avec le préfixe '#', pour chercher uniquement dans les tags), les
+identifiants et noms des sons qu'il contient. Un terme de recherche
+correspond aux mots qui commencent par lui (recherche par préfixe dans le
+vocabulaire trié) ; s'il n'en trouve aucun, aux mots dont le début est à
+une faute de frappe de lui (lettre omise, ajoutée, remplacée ou deux lettres
+inversées : distance de Damerau-Levenshtein 1). Ces derniers sont trouvés
+par une table des variantes privées d'une lettre de chaque début de mot,
+construite d'avance (méthode SymSpell). Tous les termes doivent
+correspondre.
+
+Chaque mot garde aussi les rangs de récence de ses presets, triés : les
+résultats sont produits à la demande, du plus récemment utilisé au plus
+ancien, en parcourant les presets du terme le plus rare et en vérifiant les
+autres termes sur chacun. Afficher la première page ne coûte que ce qu'il
+faut parcourir pour la remplir, même pour un terme très large, et un tag
+seul se lit directement dans sa liste.
+"""
+
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from functools import lru_cache, partial
+from itertools import chain, groupby
+from operator import is_not, itemgetter
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from src.core.sounds import SOUNDS_DATA
+
+# Au-delà de ce nombre de mots commençant par un terme, il n'est plus énuméré :
+# les presets sont filtrés sur le préfixe lui-même
+MAX_EXPANSION = 64
+
+# Résultats affichés par page (chargement progressif de la liste)
+PAGE_SIZE = 100
+
+# Longueur minimale d'un terme pour la recherche approchée
+FUZZY_MIN_LENGTH = 3
+
+# Proportion d'entrées périmées d'une liste de récence déclenchant sa reconstruction
+COMPACT_RATIO = 0.5
+
+# Taille en dessous de laquelle une liste de récence n'est pas reconstruite
+COMPACT_MIN = 64
+
+WORD_PATTERN = re.compile(r'[#\w]+')
+
+
+def normalize(text: str) -> str:
+    """Met un texte en minuscules et retire ses accents."""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def words(text: str) -> List[str]:
+    """Découpe un texte en mots normalisés ('brown_noise' donne aussi 'brown', 'noise')."""
+    result = []
+    for word in WORD_PATTERN.findall(normalize(text)):
+        word = word.strip('#')
+        if word:
+            result.append(word)
+            if '_' in word:
+                result.extend(part for part in word.split('_') if part)
+    return result
+
+
+@lru_cache(maxsize=4096)
+def _tag_words(tag: str) -> Tuple[str, ...]:
+    """Mots d'un tag, aussi sous leur forme '#mot' (mémorisés : les tags reviennent)."""
+    tag_words = words(tag)
+    return tuple(tag_words) + tuple('#' + word for word in tag_words)
+
+
+@lru_cache(maxsize=4096)
+def _sound_words(sound_id: str) -> Tuple[str, ...]:
+    """Mots de l'identifiant et du nom d'un son."""
+    return tuple(words(sound_id) + words(SOUNDS_DATA.get(sound_id, {}).get('name', '')))
+
+
+def deletes(word: str) -> Set[str]:
+    """Un mot et ses variantes privées d'une lettre."""
+    variants = {word[:i] + word[i + 1:] for i in range(len(word))}
+    variants.add(word)
+    return variants
+
+
+def delete_keys(word: str) -> Set[str]:
+    """
+    Clés d'un mot dans la table de la recherche approchée.
+
+    Ce sont les variantes (voir deletes) de chacun de ses débuts : un terme
+    à une faute de frappe d'un début du mot partage l'une d'elles avec ses
+    propres variantes. Les clés plus courtes qu'un terme privé d'une lettre
+    ne servent jamais.
+    """
+    keys = set()
+    for end in range(FUZZY_MIN_LENGTH - 1, len(word) + 1):
+        keys.update(deletes(word[:end]))
+    return {key for key in keys if len(key) >= FUZZY_MIN_LENGTH - 1}
+
+
+def one_edit(first: str, second: str) -> bool:
+    """Indique si deux mots sont à une faute de frappe au plus (Damerau-Levenshtein)."""
+    if len(first) > len(second):
+        first, second = second, first
+    if len(second) - len(first) > 1:
+        return False
+    i = 0
+    while i < len(first) and first[i] == second[i]:
+        i += 1
+    if i == len(first):
+        return True
+    if len(first) < len(second):
+        return first[i:] == second[i + 1:]
+    if first[i + 1:] == second[i + 1:]:
+        return True
+    return (first[i + 2:] == second[i + 2:] and first[i] == second[i + 1:i + 2]
+            and first[i + 1:i + 2] == second[i])
+
+
+class PresetIndex:
+    """Index en mémoire des presets : mots, tags, sons et récence."""
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        # Nom normalisé -> nom, pour placer une correspondance exacte en tête
+        self._exact: Dict[str, str] = {}
+        self._names: List[Optional[str]] = []
+        self._words: List[Tuple[str, ...]] = []
+        # Rang de récence de chaque preset (croissant à chaque utilisation, -1 : retiré)
+        self._ranks: List[int] = []
+        self._clock = 0
+        # Rang courant -> preset : un rang absent est périmé
+        self._by_rank: Dict[int, int] = {}
+        # Rangs courants des presets de chaque mot
+        self._postings: Dict[str, Set[int]] = {}
+        # Rangs de tous les presets, puis de ceux de chaque mot, par ordre
+        # croissant. Un rang n'y est qu'ajouté ou périmé ; une liste modifiée
+        # autrement est remplacée, les parcours en cours gardent l'ancienne
+        self._recent: List[int] = []
+        self._ordered: Dict[str, List[int]] = {}
+        # Vocabulaire trié, construit à la première recherche puis tenu à jour
+        self._vocabulary: Optional[List[str]] = None
+        # Clés de la recherche approchée -> mots, construites par prepare() ou
+        # à la première recherche approchée
+        self._deletes: Optional[Dict[str, Set[str]]] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, name) -> bool:
+        return name in self._ids
+
+    def add(self, name: str, sounds: Iterable[str], tags: Iterable[str] = (),
+            touch: bool = True):
+        """
+        Ajoute ou met à jour un preset.
+
+        Args:
+            name: Nom du preset
+            sounds: Identifiants des sons du preset
+            tags: Tags du preset
+            touch: Le marquer comme le plus récent (toujours le cas d'un nouveau preset)
+        """
+        tokens = set(words(name))
+        for tag in tags:
+            tokens.update(_tag_words(tag))
+        for sound_id in sounds:
+            tokens.update(_sound_words(sound_id))
+
+        preset_id = self._ids.get(name)
+        if preset_id is None:
+            preset_id = len(self._names)
+            self._ids[name] = preset_id
+            self._exact[' '.join(normalize(name).split())] = name
+            self._names.append(name)
+            self._words.append(())
+            self._ranks.append(-1)
+            touch = True
+        else:
+            # Le rang d'un preset remis en tête est périmé : inutile de le
+            # retirer des listes de récence
+            self._unindex(preset_id, stale=touch)
+            if touch:
+                self._retire(preset_id)
+
+        rank = self._ranks[preset_id]
+        self._words[preset_id] = tuple(tokens)
+        for token in tokens:
+            ranks = self._postings.get(token)
+            if ranks is None:
+                self._postings[token] = ranks = set()
+                self._ordered[token] = []
+                self._add_word(token)
+            if rank >= 0:
+                ranks.add(rank)
+                ordered = list(self._ordered[token])
+                insort(ordered, rank)
+                self._ordered[token] = ordered
+        if touch:
+            self.touch(name)
+
+    def remove(self, name: str):
+        """Retire un preset de l'index."""
+        preset_id = self._ids.pop(name, None)
+        if preset_id is None:
+            return
+        self._unindex(preset_id, stale=True)
+        self._retire(preset_id)
+        key = ' '.join(normalize(name).split())
+        if self._exact.get(key) == name:
+            del self._exact[key]
+        self._names[preset_id] = None
+
+    def touch(self, name: str):
+        """Marque un preset comme le plus récemment utilisé."""
+        preset_id = self._ids.get(name)
+        if preset_id is None:
+            return
+        previous = self._ranks[preset_id]
+        self._by_rank.pop(previous, None)
+        self._clock += 1
+        rank = self._clock
+        self._ranks[preset_id] = rank
+        self._by_rank[rank] = preset_id
+
+        self._recent.append(rank)
+        if len(self._recent) > COMPACT_MIN and len(self._recent) * COMPACT_RATIO > len(self._ids):
+            self._recent = sorted(self._by_rank)
+        for token in self._words[preset_id]:
+            ranks = self._postings[token]
+            ranks.discard(previous)
+            ranks.add(rank)
+            self._ordered[token].append(rank)
+            self._compact(token)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Cherche les presets correspondant à une requête.
+
+        Args:
+            query: Termes séparés par des espaces ('#tag' : tags uniquement)
+            limit: Nombre maximal de résultats
+
+        Returns:
+            Les noms des presets, du plus récemment utilisé au plus ancien
+        """
+        results = self.iter_search(query)
+        if limit is None:
+            return list(results)
+        return [name for name, _ in zip(results, range(limit))]
+
+    def iter_search(self, query: str) -> Iterator[str]:
+        """Comme search(), mais produit les résultats au fur et à mesure."""
+        results = self._search(query)
+        exact = self._exact.get(' '.join(normalize(query).split()))
+        if exact is None:
+            return results
+        # Le nom exact passe avant les presets dont il n'est qu'un préfixe
+        return chain((exact,), (name for name in results if name != exact))
+
+    def _search(self, query: str) -> Iterator[str]:
+        # Chaque terme devient une liste de mots, ou un filtre sur le préfixe
+        # s'il en couvre trop pour être énuméré
+        groups: List[List[str]] = []
+        prefixes: List[str] = []
+        for term in self._terms(query):
+            tokens = self._expand(term)
+            if tokens is None:
+                prefixes.append(term)
+            elif not tokens:
+                return iter(())
+            else:
+                groups.append(tokens)
+        if not groups:
+            return self._walk(reversed(self._recent), [], prefixes)
+
+        # Le terme le plus rare est parcouru par récence, les autres vérifiés
+        # du plus rare au plus courant : un preset est écarté au plus tôt
+        groups.sort(key=lambda tokens: sum(len(self._postings[token]) for token in tokens))
+        sets = [self._postings[tokens[0]] for tokens in groups[1:] if len(tokens) == 1]
+        filters: List[Union[str, FrozenSet[str]]] = [
+            frozenset(tokens) for tokens in groups[1:] if len(tokens) > 1]
+        filters.extend(prefixes)
+
+        lists = [self._ordered[token] for token in groups[0]]
+        if len(lists) == 1:
+            ranks = reversed(lists[0])
+        else:
+            # Un preset présent dans plusieurs listes revient à la suite : une seule fois
+            merged = heapq.merge(*map(reversed, lists), reverse=True)
+            ranks = map(itemgetter(0), groupby(merged))
+        return self._walk(ranks, sets, filters)
+
+    # Recherche ---------------------------------------------------------------
+
+    def _terms(self, query: str) -> List[str]:
+        """Termes normalisés d'une requête ('#' conservé devant un tag)."""
+        terms = []
+        for raw in normalize(query).split():
+            tag = raw.startswith('#')
+            for word in WORD_PATTERN.findall(raw):
+                word = word.strip('#')
+                if word:
+                    terms.append('#' + word if tag else word)
+        return terms
+
+    def _expand(self, term: str) -> Optional[List[str]]:
+        """
+        Mots du vocabulaire correspondant à un terme.
+
+        Returns:
+            Les mots commençant par le terme (ou proches de lui), ou None si
+            ceux commençant par lui sont trop nombreux pour être énumérés
+        """
+        vocabulary = self._sorted_vocabulary()
+        start = bisect_left(vocabulary, term)
+        end = start
+        while end < len(vocabulary) and vocabulary[end].startswith(term):
+            end += 1
+            if end - start > MAX_EXPANSION:
+                return None
+        if end > start:
+            return vocabulary[start:end]
+        return self._fuzzy(term)
+
+    def prepare(self):
+        """
+        Construit d'avance le vocabulaire trié et la table de la recherche approchée.
+
+        À appeler hors du thread de l'interface : sans cela, la première
+        recherche (approchée) les construit, ce qui prend plusieurs centaines
+        de millisecondes pour 100 000 presets.
+        """
+        self._sorted_vocabulary()
+        self._delete_table()
+
+    def _fuzzy(self, term: str) -> List[str]:
+        """Mots dont le début est à une faute de frappe d'un terme sans correspondance exacte."""
+        tag = term.startswith('#')
+        bare = term.lstrip('#')
+        if len(bare) < FUZZY_MIN_LENGTH:
+            return []
+        table = self._delete_table()
+        candidates: Set[str] = set()
+        for key in deletes(bare):
+            candidates.update(table.get(key, ()))
+
+        # Les clés partagées ne sont qu'un indice : la distance est vérifiée
+        # sur les débuts de mot d'une lettre de moins à une lettre de plus
+        size = len(bare)
+        matches = (word for word in candidates
+                   if any(one_edit(word[:end], bare) for end in (size - 1, size, size + 1)))
+        if tag:
+            matches = ('#' + word for word in matches)
+        return sorted(word for word in matches if word in self._postings)
+
+    def _walk(self, ranks: Iterable[int], sets: List[Set[int]],
+              filters: List[Union[str, FrozenSet[str]]]) -> Iterator[str]:
+        """
+        Parcourt des rangs décroissants en gardant les presets qui correspondent.
+
+        Les rangs sont filtrés par les ensembles des autres termes, puis
+        par la table des rangs courants, dans des filter/map enchaînés : sans
+        code Python par preset parcouru.
+        """
+        for current in sets:
+            ranks = filter(current.__contains__, ranks)
+        candidates = filter(partial(is_not, None), map(self._by_rank.get, ranks))
+        if filters:
+            candidates = (i for i in candidates if self._matches(i, filters))
+        return map(self._names.__getitem__, candidates)
+
+    def _matches(self, preset_id: int, filters: List[Union[str, FrozenSet[str]]]) -> bool:
+        """Vérifie qu'un preset passe chaque filtre (préfixe, ou l'un des mots donnés)."""
+        tokens = self._words[preset_id]
+        for expected in filters:
+            if isinstance(expected, str):
+                if not any(token.startswith(expected) for token in tokens):
+                    return False
+            elif expected.isdisjoint(tokens):
+                return False
+        return True
+
+    # Vocabulaire -------------------------------------------------------------
+
+    def _retire(self, preset_id: int):
+        """Périme le rang d'un preset (ses listes de récence l'ignorent désormais)."""
+        self._by_rank.pop(self._ranks[preset_id], None)
+        self._ranks[preset_id] = -1
+
+    def _unindex(self, preset_id: int, stale: bool):
+        """
+        Retire les mots d'un preset des listes de l'index.
+
+        Args:
+            preset_id: Preset à retirer
+            stale: Son rang sera périmé : ses listes de récence peuvent le garder
+        """
+        rank = self._ranks[preset_id]
+        for token in self._words[preset_id]:
+            ranks = self._postings[token]
+            ranks.discard(rank)
+            if not ranks:
+                del self._postings[token]
+                del self._ordered[token]
+                self._remove_word(token)
+            elif stale:
+                self._compact(token)
+            else:
+                ordered = list(self._ordered[token])
+                del ordered[bisect_left(ordered, rank)]
+                self._ordered[token] = ordered
+        self._words[preset_id] = ()
+
+    def _compact(self, token: str):
+        """Reconstruit la liste de récence d'un mot si elle est surtout périmée."""
+        ordered = self._ordered[token]
+        ranks = self._postings[token]
+        if len(ordered) > COMPACT_MIN and len(ordered) * COMPACT_RATIO > len(ranks):
+            self._ordered[token] = sorted(ranks)
+
+    def _sorted_vocabulary(self) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        return self._vocabulary
+
+    def _delete_table(self) -> Dict[str, Set[str]]:
+        if self._deletes is None:
+            self._deletes = {}
+            for token in self._postings:
+                self._index_deletes(token)
+        return self._deletes
+
+    def _add_word(self, token: str):
+        if self._vocabulary is not None:
+            insort(self._vocabulary, token)
+        if self._deletes is not None:
+            self._index_deletes(token)
+
+    @staticmethod
+    def _fuzzy_word(token: str) -> bool:
+        # Les tags sont cherchés par leur forme sans '#', les nombres ne sont pas corrigés
+        return not token.startswith('#') and not any(char.isdigit() for char in token)
+
+    def _index_deletes(self, token: str):
+        if self._fuzzy_word(token):
+            for key in delete_keys(token):
+                self._deletes.setdefault(key, set()).add(token)
+
+    def _remove_word(self, token: str):
+        if self._vocabulary is not None:
+            del self._vocabulary[bisect_left(self._vocabulary, token)]
+        if self._deletes is not None and self._fuzzy_word(token):
+            for key in delete_keys(token):
+                words_with_key = self._deletes.get(key)
+                if words_with_key is not None:
+                    words_with_key.discard(token)
+                    if not words_with_key:
+                        del self._deletes[key]
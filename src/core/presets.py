@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+"""
+Stockage des presets.
+
+Chaque preset est une ligne d'une base SQLite : enregistrer ou supprimer un
+preset n'écrit que celui-ci, quel que soit leur nombre. Les écritures sont
+regroupées par un thread d'arrière-plan (au plus une transaction toutes les
+FLUSH_DELAY secondes) ; une transaction est atomique, une interruption ne
+laisse donc jamais la base à moitié écrite. Les modifications en attente
+restent visibles en lecture jusqu'à leur écriture.
+
+La recherche (nom, tags, sons, récence) passe par un index en mémoire (voir
+src/core/preset_index.py), construit à la première recherche ou en avance
+par prepare_index(), puis tenu à jour à chaque modification.
+"""
+
+import atexit
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.core.preset_index import PresetIndex
+
+# Délai de regroupement des écritures (secondes)
+FLUSH_DELAY = 0.5
+
+# Version du schéma (PRAGMA user_version)
+SCHEMA_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS presets (
+    name TEXT PRIMARY KEY,
+    sounds TEXT NOT NULL,
+    tags TEXT NOT NULL DEFAULT '[]',
+    last_used REAL NOT NULL DEFAULT 0,
+    effects TEXT NOT NULL DEFAULT '{}',
+    updated REAL NOT NULL
+)
+"""
+
+# Mises à jour du schéma : version de départ -> instructions
+MIGRATIONS = {
+    1: [
+        "ALTER TABLE presets ADD COLUMN tags TEXT NOT NULL DEFAULT '[]'",
+        "ALTER TABLE presets ADD COLUMN last_used REAL NOT NULL DEFAULT 0",
+    ],
+    2: [
+        "ALTER TABLE presets ADD COLUMN effects TEXT NOT NULL DEFAULT '{}'",
+    ],
+}
+
+# Colonnes d'un enregistrement, encodées en JSON ou non
+JSON_COLUMNS = ('sounds', 'tags', 'effects')
+
+
+def default_presets_path() -> Path:
+    """Retourne le chemin de la base des presets dans les données de l'application."""
+    from PyQt6.QtCore import QStandardPaths
+
+    location = QStandardPaths.writableLocation(
+        QStandardPaths.StandardLocation.AppDataLocation
+    )
+    return Path(location) / 'presets.db'
+
+
+class PresetStore(MutableMapping):
+    """
+    Presets ({nom: {sound_id: volume}}) persistés un par un dans SQLite.
+
+    Les effets des sons d'un preset ({sound_id: paramètres}, voir
+    src/audio/effects.py) sont enregistrés à côté des volumes.
+    """
+
+    def __init__(self, path: Optional[Path] = None, flush_delay: float = FLUSH_DELAY):
+        """
+        Args:
+            path: Fichier de la base (par défaut dans les données de l'application)
+            flush_delay: Délai de regroupement des écritures (secondes)
+        """
+        self.path = Path(path) if path else default_presets_path()
+        self.flush_delay = flush_delay
+        # Champs modifiés en attente (sounds, tags, effects, last_used) ; None marque une suppression
+        self._pending: Dict[str, Optional[Dict[str, Any]]] = {}
+        # Lot en cours d'écriture, encore visible en lecture
+        self._writing: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        # Un seul lot écrit à la fois (thread d'arrière-plan ou flush())
+        self._write_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._exit_registered = False
+
+        self._index: Optional[PresetIndex] = None
+        # Modifications survenues pendant la construction de l'index, rejouées ensuite
+        self._index_log: Optional[list] = None
+        self._index_ready = threading.Event()
+
+    # Lecture -----------------------------------------------------------------
+
+    def __getitem__(self, name: str) -> dict:
+        return dict(self._field(name, 'sounds'))
+
+    def __contains__(self, name) -> bool:
+        try:
+            self._field(name, 'sounds')
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.names())
+
+    def __len__(self) -> int:
+        return len(self.names())
+
+    def names(self) -> list:
+        """Retourne les noms des presets, dans l'ordre de création."""
+        with self._lock:
+            names = [row[0] for row in self._query("SELECT name FROM presets ORDER BY rowid")]
+            overlay = dict(self._writing)
+            overlay.update(self._pending)
+        if not overlay:
+            return names
+        deleted = {name for name, record in overlay.items() if record is None}
+        known = set(names)
+        names = [name for name in names if name not in deleted]
+        names.extend(name for name, record in overlay.items()
+                     if record is not None and 'sounds' in record and name not in known)
+        return names
+
+    def tags(self, name: str) -> List[str]:
+        """Retourne les tags d'un preset."""
+        return list(self._field(name, 'tags'))
+
+    def effects(self, name: str) -> Dict[str, dict]:
+        """Retourne les effets des sons d'un preset."""
+        return dict(self._field(name, 'effects'))
+
+    def last_used(self, name: str) -> float:
+        """Retourne l'heure de dernière utilisation d'un preset (0 : jamais)."""
+        return self._field(name, 'last_used')
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[str]:
+        """
+        Cherche des presets par nom, tag ('#tag') ou son contenu.
+
+        Args:
+            query: Termes de recherche (préfixes, fautes de frappe tolérées)
+            limit: Nombre maximal de résultats
+
+        Returns:
+            Les noms des presets, du plus récemment utilisé au plus ancien
+        """
+        index = self._ensure_index()
+        with self._lock:
+            return index.search(query, limit)
+
+    def iter_search(self, query: str) -> Iterator[str]:
+        """Comme search(), mais produit les résultats au fur et à mesure."""
+        index = self._ensure_index()
+        with self._lock:
+            return index.iter_search(query)
+
+    @property
+    def dirty(self) -> bool:
+        """Indique si des modifications attendent d'être écrites."""
+        with self._lock:
+            return bool(self._pending or self._writing)
+
+    # Écriture ----------------------------------------------------------------
+
+    def __setitem__(self, name: str, sounds: dict):
+        sounds = dict(sounds)
+        tags = self.tags(name) if name in self else []
+        with self._lock:
+            self._update(name, {'sounds': sounds})
+            self._apply_to_index('add', name, list(sounds), tags)
+
+    def __delitem__(self, name: str):
+        if name not in self:
+            raise KeyError(name)
+        with self._lock:
+            self._pending[name] = None
+            self._schedule()
+            self._apply_to_index('remove', name)
+
+    def set_tags(self, name: str, tags: List[str]):
+        """Remplace les tags d'un preset."""
+        sounds = self[name]
+        tags = [tag.strip() for tag in tags if tag.strip()]
+        with self._lock:
+            self._update(name, {'tags': tags})
+            self._apply_to_index('add', name, list(sounds), tags)
+
+    def set_effects(self, name: str, effects: Dict[str, dict]):
+        """Remplace les effets des sons d'un preset."""
+        if name not in self:
+            raise KeyError(name)
+        with self._lock:
+            self._update(name, {'effects': dict(effects)})
+
+    def touch(self, name: str):
+        """Marque un preset comme utilisé maintenant (tri par récence)."""
+        if name not in self:
+            raise KeyError(name)
+        with self._lock:
+            self._update(name, {'last_used': time.time()})
+            self._apply_to_index('touch', name)
+
+    def flush(self):
+        """Écrit immédiatement les modifications en attente (une transaction)."""
+        with self._write_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                self._writing, self._pending = self._pending, {}
+                batch = self._writing
+            try:
+                self._write(batch)
+            except sqlite3.Error as e:
+                print(f"Erreur lors de l'enregistrement des presets: {e}")
+                # Rien n'est perdu : le lot sera retenté avec le suivant
+                with self._lock:
+                    for name, record in self._pending.items():
+                        if record is None or batch.get(name) is None:
+                            batch[name] = record
+                        else:
+                            batch[name].update(record)
+                    self._pending = batch
+            finally:
+                with self._lock:
+                    self._writing = {}
+
+    def close(self):
+        """Écrit les modifications en attente et ferme la base."""
+        self.flush()
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def _update(self, name: str, fields: Dict[str, Any]):
+        """Fusionne des champs modifiés dans l'attente (appelé sous verrou)."""
+        record = self._pending.get(name, {})
+        if record is None:
+            # Supprimé puis recréé dans le même lot : l'ancienne ligne est remplacée
+            record = {'tags': [], 'last_used': 0.0, 'effects': {}}
+        record.update(fields)
+        self._pending[name] = record
+        self._schedule()
+
+    def _schedule(self):
+        """Démarre le thread d'écriture s'il ne tourne pas (appelé sous verrou)."""
+        if not self._exit_registered:
+            # Les modifications de dernière minute ne sont pas perdues à la sortie
+            atexit.register(self.flush)
+            self._exit_registered = True
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="blanket-presets",
+                                            daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Thread d'écriture : un lot par délai, s'arrête quand il n'y a plus rien."""
+        while True:
+            time.sleep(self.flush_delay)
+            self.flush()
+            with self._lock:
+                if not self._pending:
+                    self._thread = None
+                    return
+
+    def _write(self, batch: Dict[str, Optional[Dict[str, Any]]]):
+        """Écrit un lot dans une transaction (connexion propre au thread appelant)."""
+        now = time.time()
+        connection = self._connect()
+        try:
+            with connection:
+                for name, record in batch.items():
+                    if record is None:
+                        connection.execute("DELETE FROM presets WHERE name = ?", (name,))
+                        continue
+                    columns = list(record)
+                    values = [json.dumps(record[column]) if column in JSON_COLUMNS
+                              else record[column] for column in columns]
+                    if 'sounds' in record:
+                        # Création ou remplacement : seuls les champs fournis changent
+                        updates = ', '.join(f"{column} = excluded.{column}"
+                                            for column in columns + ['updated'])
+                        connection.execute(
+                            f"INSERT INTO presets (name, {', '.join(columns)}, updated) "
+                            f"VALUES (?, {', '.join('?' for _ in columns)}, ?) "
+                            f"ON CONFLICT(name) DO UPDATE SET {updates}",
+                            [name] + values + [now]
+                        )
+                    else:
+                        assignments = ', '.join(f"{column} = ?" for column in columns)
+                        connection.execute(
+                            f"UPDATE presets SET {assignments} WHERE name = ?",
+                            values + [name]
+                        )
+        finally:
+            connection.close()
+
+    # Index -------------------------------------------------------------------
+
+    def prepare_index(self):
+        """Construit l'index de recherche en arrière-plan, avant la première recherche."""
+        if self._claim_index_build():
+            threading.Thread(target=self._build_index, name="blanket-preset-index",
+                             daemon=True).start()
+
+    def _ensure_index(self) -> PresetIndex:
+        """Retourne l'index, en attendant ou en effectuant sa construction."""
+        if self._claim_index_build():
+            self._build_index()
+        self._index_ready.wait()
+        return self._index
+
+    def _claim_index_build(self) -> bool:
+        """Réserve la construction de l'index ; False si elle est faite ou en cours."""
+        with self._lock:
+            if self._index_log is not None or self._index is not None:
+                return False
+            self._index_log = []
+            return True
+
+    def _build_index(self):
+        """Charge tous les presets dans un nouvel index."""
+        with self._lock:
+            overlay = dict(self._writing)
+            overlay.update(self._pending)
+
+        index = PresetIndex()
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                "SELECT name, sounds, tags FROM presets ORDER BY last_used, rowid"
+            ).fetchall()
+        finally:
+            connection.close()
+        for name, sounds, tags in rows:
+            record = overlay.get(name, {})
+            if record is None:
+                continue
+            index.add(name, record.get('sounds') or json.loads(sounds),
+                      record.get('tags', json.loads(tags)))
+        for name, record in overlay.items():
+            if record is not None and name not in index and 'sounds' in record:
+                index.add(name, record['sounds'], record.get('tags', []))
+        index.prepare()
+
+        with self._lock:
+            for operation, args in self._index_log:
+                getattr(index, operation)(*args)
+            self._index_log = None
+            self._index = index
+        self._index_ready.set()
+
+    def _apply_to_index(self, operation: str, *args):
+        """Reporte une modification dans l'index (appelé sous verrou)."""
+        if self._index is not None:
+            getattr(self._index, operation)(*args)
+        elif self._index_log is not None:
+            self._index_log.append((operation, args))
+
+    # Base --------------------------------------------------------------------
+
+    def _field(self, name: str, column: str):
+        """Lit un champ d'un preset, modifications en attente comprises."""
+        with self._lock:
+            for overlay in (self._pending, self._writing):
+                if name in overlay:
+                    record = overlay[name]
+                    if record is None:
+                        raise KeyError(name)
+                    if column in record:
+                        return record[column]
+            row = self._query(f"SELECT {column} FROM presets WHERE name = ?",
+                              (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return json.loads(row[0]) if column in JSON_COLUMNS else row[0]
+
+    def _query(self, sql: str, params=()) -> sqlite3.Cursor:
+        """Exécute une lecture sur la connexion partagée (appelé sous verrou)."""
+        if self._connection is None:
+            self._connection = self._connect(check_same_thread=False)
+        return self._connection.execute(sql, params)
+
+    def _connect(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """Ouvre la base, en la créant ou la mettant à jour au besoin."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(str(self.path), timeout=10.0,
+                                     check_same_thread=check_same_thread)
+        # WAL : les lectures ne sont pas bloquées par une écriture en cours
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        version = connection.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            with connection:
+                if version == 0:
+                    connection.execute(SCHEMA)
+                for step in range(version or SCHEMA_VERSION, SCHEMA_VERSION):
+                    for statement in MIGRATIONS[step]:
+                        connection.execute(statement)
+                connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        return connection
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Mesure du temps de démarrage, phase par phase.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+
+
+class StartupProfiler:
+    """Chronomètre les phases successives du démarrage."""
+
+    def __init__(self, enabled: bool = True):
+        """
+        Args:
+            enabled: Si False, les mesures sont ignorées (coût nul)
+        """
+        self.enabled = enabled
+        self.started_at = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        """Chronomètre le bloc `with` sous le nom donné."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, time.perf_counter() - start))
+
+    def report(self) -> str:
+        """Retourne le détail des phases et le temps total écoulé."""
+        total = time.perf_counter() - self.started_at
+        width = max((len(name) for name, _ in self.phases), default=0)
+        lines = ["Temps de démarrage :"]
+        for name, elapsed in self.phases:
+            lines.append(f"  {name:<{width}}  {elapsed * 1000:8.1f} ms")
+        lines.append(f"  {'total':<{width}}  {total * 1000:8.1f} ms")
+        return "\n".join(lines)
@@ -1,88 +1,192 @@
 # -*- coding: utf-8 -*-
 """
 Gestion des paramètres de l'application.
+
+Seuls les paramètres modifiés depuis le dernier enregistrement sont écrits ;
+QSettings les reporte sur disque depuis la boucle d'évènements (ou à
+l'appel de flush()). Les presets sont stockés à part, un par un (voir
+src/core/presets.py).
 """
 
 from PyQt6.QtCore import QSettings
 import json
+import platform
+
+from src.core.presets import PresetStore
+
+# Paramètres simples : attribut -> (clé QSettings, valeur par défaut, type)
+FIELDS = {
+    # Interface
+    'dark_mode': ('ui/dark_mode', False, bool),
+    'minimize_to_tray': ('ui/minimize_to_tray', True, bool),
+    # Mesures du thread audio dans la barre d'état
+    'show_audio_metrics': ('ui/show_audio_metrics', False, bool),
+
+    # Audio
+    'master_volume': ('audio/master_volume', 1.0, float),
+    'auto_pause': ('audio/auto_pause', False, bool),
+    'fade_enabled': ('audio/fade_enabled', True, bool),
+    'fade_duration': ('audio/fade_duration', 1000, int),
+    'audio_engine': ('audio/engine', 'pygame', str),
+    # Périphérique ouvert à sa fréquence native, les sons rééchantillonnés une fois
+    'native_rate': ('audio/native_rate', True, bool),
+    # Fermeture du périphérique inactif (secondes, 0 : jamais) et PCM gardé (Mo)
+    'idle_timeout': ('audio/idle_timeout', 60, int),
+    'memory_budget': ('audio/memory_budget', 256, int),
+    # Sons ramenés à une sonie commune (voir audio/loudness.py)
+    'normalize_loudness': ('audio/normalize_loudness', True, bool),
+    # Taille des blocs de sortie réglée d'après les coupures, entre deux durées (ms)
+    'adaptive_buffer': ('audio/adaptive_buffer', True, bool),
+    'min_latency': ('audio/min_latency', 5, int),
+    'max_latency': ('audio/max_latency', 100, int),
+
+    # Bibliothèque : dossiers surveillés et fichiers ajoutés un par un
+    'library_folders': ('library/folders', [], list),
+    'library_files': ('library/files', [], list),
+
+    # Minuteur
+    'timer_enabled': ('timer/enabled', False, bool),
+    'timer_duration': ('timer/duration', 30, int),
+    'timer_fade': ('timer/fade', 5, int),
+}
+
+# Ancienne clé des presets (un seul JSON), migrée vers PresetStore
+LEGACY_PRESETS_KEY = 'presets/saved'
+
+# Taille de bloc apprise (trames), propre à chaque machine
+LEARNED_BUFFER_KEY = 'audio/learned_buffer/{host}'
+
+# Taille de bloc sans réglage ni valeur apprise (trames)
+DEFAULT_BUFFER = 512
 
 
 class Settings:
     """Gestionnaire des paramètres de l'application."""
-    
-    def __init__(self):
+
+    def __init__(self, presets: PresetStore = None):
+        """
+        Args:
+            presets: Stockage des presets (par défaut, celui de l'application)
+        """
         self.qsettings = QSettings()
+        self.presets = presets if presets is not None else PresetStore()
+        self._saved = {}
         self.load()
-    
+
     def load(self):
         """Charge les paramètres sauvegardés."""
-        # Interface
-        self.dark_mode = self.qsettings.value('ui/dark_mode', False, type=bool)
-        self.minimize_to_tray = self.qsettings.value('ui/minimize_to_tray', True, type=bool)
-        
-        # Audio
-        self.master_volume = self.qsettings.value('audio/master_volume', 1.0, type=float)
-        self.auto_pause = self.qsettings.value('audio/auto_pause', False, type=bool)
-        self.fade_enabled = self.qsettings.value('audio/fade_enabled', True, type=bool)
-        self.fade_duration = self.qsettings.value('audio/fade_duration', 1000, type=int)
-        
-        # Minuteur
-        self.timer_enabled = self.qsettings.value('timer/enabled', False, type=bool)
-        self.timer_duration = self.qsettings.value('timer/duration', 30, type=int)
-        
+        for attr, (key, default, value_type) in FIELDS.items():
+            value = self.qsettings.value(key, default, type=value_type)
+            setattr(self, attr, value)
+            self._saved[attr] = value
+
         # État des sons
         sound_states_json = self.qsettings.value('sounds/states', '{}')
         try:
             self.sound_states = json.loads(sound_states_json)
         except:
             self.sound_states = {}
-        
-        # Presets
-        presets_json = self.qsettings.value('presets/saved', '{}')
-        try:
-            self.presets = json.loads(presets_json)
-        except:
-            self.presets = {}
-    
+        self._saved['sound_states'] = json.dumps(self.sound_states)
+
+        self._migrate_presets()
+
     def save(self):
-        """Sauvegarde les paramètres."""
-        # Interface
-        self.qsettings.setValue('ui/dark_mode', self.dark_mode)
-        self.qsettings.setValue('ui/minimize_to_tray', self.minimize_to_tray)
-        
-        # Audio
-        self.qsettings.setValue('audio/master_volume', self.master_volume)
-        self.qsettings.setValue('audio/auto_pause', self.auto_pause)
-        self.qsettings.setValue('audio/fade_enabled', self.fade_enabled)
-        self.qsettings.setValue('audio/fade_duration', self.fade_duration)
-        
-        # Minuteur
-        self.qsettings.setValue('timer/enabled', self.timer_enabled)
-        self.qsettings.setValue('timer/duration', self.timer_duration)
-        
+        """Sauvegarde les paramètres modifiés depuis le dernier enregistrement."""
+        for attr, (key, default, value_type) in FIELDS.items():
+            value = getattr(self, attr)
+            if value != self._saved[attr]:
+                self.qsettings.setValue(key, value)
+                self._saved[attr] = value
+
         # État des sons
-        self.qsettings.setValue('sounds/states', json.dumps(self.sound_states))
-        
-        # Presets
-        self.qsettings.setValue('presets/saved', json.dumps(self.presets))
-        
+        sound_states_json = json.dumps(self.sound_states)
+        if sound_states_json != self._saved['sound_states']:
+            self.qsettings.setValue('sounds/states', sound_states_json)
+            self._saved['sound_states'] = sound_states_json
+
+    def flush(self):
+        """Écrit immédiatement sur disque les paramètres et presets en attente."""
+        self.save()
         self.qsettings.sync()
-    
-    def save_preset(self, name: str, sound_states: dict):
-        """Sauvegarde un preset."""
+        self.presets.flush()
+
+    def sound_library(self):
+        """Retourne la bibliothèque de sons de l'utilisateur (voir src/core/library.py)."""
+        from src.core.library import SoundLibrary
+        return SoundLibrary(self.library_folders, self.library_files)
+
+    def learned_buffer(self) -> int:
+        """Retourne la taille de bloc apprise sur cette machine (trames), 0 sans valeur."""
+        return self.qsettings.value(self._learned_buffer_key(), 0, type=int)
+
+    def save_learned_buffer(self, frames: int):
+        """Enregistre la taille de bloc apprise sur cette machine (voir audio/latency.py)."""
+        self.qsettings.setValue(self._learned_buffer_key(), frames)
+        self.qsettings.sync()
+
+    def mixer_options(self) -> dict:
+        """Retourne les paramètres du mixeur audio (voir create_mixer)."""
+        buffer = self.learned_buffer()
+        if not buffer:
+            # Sans valeur apprise, le réglage part de la plus faible latence
+            # permise ; pygame, qui ne signale pas ses coupures, garde la taille habituelle
+            if self.adaptive_buffer and self.audio_engine == 'numpy':
+                from src.audio.latency import latency_to_frames
+                buffer = latency_to_frames(self.min_latency, 44100)
+            else:
+                buffer = DEFAULT_BUFFER
+        return {
+            'buffer': buffer,
+            'idle_timeout': self.idle_timeout,
+            'memory_budget': self.memory_budget * 1024 * 1024,
+            'normalize_loudness': self.normalize_loudness,
+            'adaptive_buffer': self.adaptive_buffer,
+            'latency_bounds': (self.min_latency, self.max_latency),
+            'native_rate': self.native_rate,
+        }
+
+    def _learned_buffer_key(self) -> str:
+        # Les paramètres peuvent suivre l'utilisateur d'une machine à l'autre
+        return LEARNED_BUFFER_KEY.format(host=platform.node() or 'local')
+
+    def save_preset(self, name: str, sound_states: dict, tags: list = None,
+                    effects: dict = None):
+        """Sauvegarde un preset (ses tags et effets ne changent pas s'ils valent None)."""
         self.presets[name] = sound_states
-        self.save()
-    
+        if tags is not None:
+            self.presets.set_tags(name, tags)
+        if effects is not None:
+            self.presets.set_effects(name, effects)
+
     def load_preset(self, name: str) -> dict:
         """Charge un preset."""
         return self.presets.get(name, {})
-    
+
+    def load_preset_effects(self, name: str) -> dict:
+        """Charge les effets des sons d'un preset."""
+        return self.presets.effects(name) if name in self.presets else {}
+
     def delete_preset(self, name: str):
         """Supprime un preset."""
         if name in self.presets:
             del self.presets[name]
-            self.save()
-    
+
     def get_preset_names(self) -> list:
         """Retourne la liste des noms de presets."""
-        return list(self.presets.keys())
+        return self.presets.names()
+
+    def _migrate_presets(self):
+        """Déplace les presets de l'ancien format (un seul JSON) vers PresetStore."""
+        if not self.qsettings.contains(LEGACY_PRESETS_KEY):
+            return
+        try:
+            presets = json.loads(self.qsettings.value(LEGACY_PRESETS_KEY, '{}'))
+        except ValueError:
+            presets = {}
+        self.presets.update(presets)
+        self.presets.flush()
+        if self.presets.dirty:
+            # Écriture échouée : l'ancienne clé est gardée pour le prochain lancement
+            return
+        self.qsettings.remove(LEGACY_PRESETS_KEY)
+        self.qsettings.sync()
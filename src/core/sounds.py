@@ -10,6 +10,10 @@ RESOURCES_DIR = Path(__file__).parent.parent / "resources"
 SOUNDS_DIR = RESOURCES_DIR / "sounds"
 
 # Données des sons par catégorie
+# La clé optionnelle 'playback' force la lecture en flux ('stream') ou le
+# préchargement ('preload') ; par défaut le mixeur choisit selon la taille.
+# Un son sans fichier est synthétisé par le générateur indiqué par la clé
+# 'generator' (voir src.audio.generators.NOISE_TYPES).
 SOUNDS_DATA = {
     # Nature
     'rain': {
@@ -104,21 +108,29 @@ SOUNDS_DATA = {
         'name': 'Bruit blanc',
         'icon': '📡',
         'category': 'noise',
-        'file': str(SOUNDS_DIR / 'white-noise.ogg'),
+        'generator': 'white',
         'description': 'Bruit blanc pur'
     },
     'pink_noise': {
         'name': 'Bruit rose',
         'icon': '🎵',
         'category': 'noise',
-        'file': str(SOUNDS_DIR / 'pink-noise.ogg'),
+        'generator': 'pink',
         'description': 'Bruit rose'
     },
+    'brown_noise': {
+        'name': 'Bruit brun',
+        'icon': '🌫️',
+        'category': 'noise',
+        'generator': 'brown',
+        'description': 'Bruit brun, grave et profond'
+    },
 }
 
 # Catégories
 CATEGORIES = {
     'nature': 'Nature',
     'environment': 'Environnements',
-    'noise': 'Bruits blancs'
+    'noise': 'Bruits blancs',
+    'library': 'Bibliothèque'
 }
@@ -0,0 +1 @@
+"""Service audio sans interface, piloté par socket local."""
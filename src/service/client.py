@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+Client du service audio.
+
+MixerClient envoie les requêtes et associe les réponses par identifiant :
+plusieurs requêtes peuvent être en cours à la fois (un décodage long ne
+retarde pas un changement de volume). RemoteMixer présente ce client sous
+l'interface d'AudioMixer, pour que la fenêtre principale puisse piloter un
+service déjà lancé au lieu d'ouvrir son propre périphérique audio.
+"""
+
+import itertools
+import socket
+import threading
+from concurrent.futures import Future
+from typing import Dict, Iterable, Optional
+
+from src.audio.effects import normalize as normalize_effects
+from src.audio.transitions import PlaylistEntry
+from src.audio.volume import VolumeScheduler
+from src.service.protocol import Address, ServiceError, decode, default_address, encode
+
+# Délai maximal d'attente d'une réponse (secondes)
+REQUEST_TIMEOUT = 30.0
+
+
+class MixerClient:
+    """Connexion au service audio."""
+
+    def __init__(self, sock: socket.socket):
+        """
+        Args:
+            sock: Socket déjà connecté au service
+        """
+        self._sock = sock
+        self._reader = sock.makefile('rb')
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self.closed = False
+        self._thread = threading.Thread(target=self._receive, name="blanket-client",
+                                        daemon=True)
+        self._thread.start()
+
+    def request_async(self, cmd: str, **args) -> Future:
+        """Envoie une requête et retourne un Future résolu avec son résultat."""
+        future = Future()
+        with self._lock:
+            if self.closed:
+                raise ServiceError("Connexion au service fermée")
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            try:
+                self._sock.sendall(encode({'id': request_id, 'cmd': cmd, 'args': args}))
+            except OSError as e:
+                del self._pending[request_id]
+                raise ServiceError(f"Service injoignable: {e}")
+        return future
+
+    def request(self, cmd: str, **args):
+        """Envoie une requête et attend son résultat."""
+        return self.request_async(cmd, **args).result(REQUEST_TIMEOUT)
+
+    def close(self):
+        """Ferme la connexion ; les requêtes en attente échouent."""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+    def _receive(self):
+        """Thread de réception : résout le Future de chaque réponse."""
+        try:
+            for line in self._reader:
+                try:
+                    response = decode(line)
+                except ValueError:
+                    continue
+                with self._lock:
+                    future = self._pending.pop(response.get('id'), None)
+                if future is None:
+                    continue
+                if response.get('ok'):
+                    future.set_result(response.get('result'))
+                else:
+                    future.set_exception(ServiceError(response.get('error')))
+        except (OSError, ValueError):
+            pass
+        with self._lock:
+            self.closed = True
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(ServiceError("Connexion au service perdue"))
+
+
+def connect(address: Optional[Address] = None, timeout: float = 1.0) -> Optional[MixerClient]:
+    """
+    Se connecte au service audio.
+
+    Args:
+        address: Adresse du service (par défaut, celle de l'utilisateur)
+        timeout: Délai de connexion (secondes)
+
+    Returns:
+        Le client, ou None si aucun service n'écoute
+    """
+    address = address or default_address()
+    family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(address)
+    except OSError:
+        sock.close()
+        return None
+    sock.settimeout(None)
+    return MixerClient(sock)
+
+
+class RemoteMixer:
+    """Mixeur distant : même interface qu'AudioMixer, exécutée par le service."""
+
+    def __init__(self, client: MixerClient):
+        """
+        Args:
+            client: Connexion au service
+        """
+        self.client = client
+        self.master_volume = 1.0
+        self.paused = False
+        # Effets des sons, tels que demandés au service
+        self.effects: Dict[str, dict] = {}
+        self.volume_updates = VolumeScheduler(self)
+
+    def get_state(self) -> Optional[dict]:
+        """Retourne l'état du service (voir la commande 'status'), None s'il ne répond pas."""
+        state = self._request('status', None)
+        if state is not None:
+            self.master_volume = state['master']
+            self.paused = state['paused']
+            self.effects = {sound_id: sound['effects'] for sound_id, sound in state['sounds'].items()
+                            if sound.get('effects')}
+        return state
+
+    def load_async(self, sound_id: str, file_path: str, mode: str = 'auto') -> Future:
+        """Fait décoder un son par le service ; le Future est résolu avec True s'il est prêt."""
+        future = Future()
+        try:
+            request = self.client.request_async('load', sound_id=sound_id, file=file_path,
+                                                mode=mode)
+        except ServiceError as e:
+            print(f"Erreur lors du chargement du son {sound_id}: {e}")
+            future.set_result(False)
+            return future
+
+        def done(request):
+            error = request.exception()
+            if error is not None:
+                print(f"Erreur lors du chargement du son {sound_id}: {error}")
+            future.set_result(error is None and bool(request.result()))
+        request.add_done_callback(done)
+        return future
+
+    def play_sound(self, sound_id: str, file_path: str, volume: float = 0.5,
+                   mode: str = 'auto', category: Optional[str] = None) -> bool:
+        """Joue un son en boucle (voir AudioMixer.play_sound)."""
+        return bool(self._request('play', False, sound_id=sound_id, file=file_path,
+                                  volume=volume, mode=mode, category=category))
+
+    def play_generator(self, sound_id: str, kind: str, volume: float = 0.5,
+                       category: Optional[str] = None) -> bool:
+        """Joue un bruit synthétisé (voir AudioMixer.play_generator)."""
+        return bool(self._request('play', False, sound_id=sound_id, generator=kind,
+                                  volume=volume, category=category))
+
+    def stop_sound(self, sound_id: str):
+        """Arrête un son spécifique."""
+        self.volume_updates.discard(sound_id)
+        self._request('stop', None, sound_id=sound_id)
+
+    def set_volume(self, sound_id: str, volume: float):
+        """Définit le volume d'un son spécifique."""
+        self._send('volume', sound_id=sound_id, volume=volume)
+
+    def request_volume(self, sound_id: str, volume: float):
+        """Demande un changement de volume, envoyé avec le prochain lot."""
+        self.volume_updates.set_volume(sound_id, volume)
+
+    def request_master_volume(self, volume: float):
+        """Demande un changement du volume principal, envoyé avec le prochain lot."""
+        self.volume_updates.set_master_volume(volume)
+
+    def get_volume_stats(self) -> Dict[str, int]:
+        """Retourne les compteurs du regroupement des changements de volume."""
+        return self.volume_updates.get_stats()
+
+    def set_effects(self, sound_id: str, params: Optional[dict]):
+        """
+        Définit les effets d'un son (voir AudioMixer.set_effects).
+
+        Raises:
+            ValueError: Paramètre inconnu ou hors bornes (rien n'est envoyé)
+        """
+        params = normalize_effects(params)
+        self._remember_effects(sound_id, params)
+        self._send('effects', sound_id=sound_id, effects=params)
+
+    def get_effects(self, sound_id: str) -> dict:
+        """Retourne les effets d'un son ({} sans effet)."""
+        return dict(self.effects.get(sound_id, {}))
+
+    def set_master_volume(self, volume: float):
+        """Définit le volume principal."""
+        self.master_volume = max(0.0, min(1.0, volume))
+        self._send('master', volume=self.master_volume)
+
+    def set_category_volume(self, category: str, volume: float):
+        """Définit le volume de groupe d'une catégorie de sons."""
+        self._send('category_volume', category=category, volume=volume)
+
+    def pause_all(self):
+        """Met en pause tous les sons."""
+        self.paused = True
+        self._send('pause')
+
+    def resume_all(self):
+        """Reprend tous les sons en pause."""
+        self.paused = False
+        self._send('resume')
+
+    def stop_all(self):
+        """Arrête tous les sons."""
+        self._request('stop_all', None)
+
+    def is_playing(self, sound_id: str) -> bool:
+        """Vérifie si un son est en cours de lecture."""
+        state = self._request('status', None)
+        return bool(state and state['sounds'].get(sound_id, {}).get('playing'))
+
+    def get_memory_report(self) -> Dict[str, int]:
+        """Retourne le PCM résident (octets) de chaque son du service."""
+        return self._request('memory', {})
+
+    def get_idle_stats(self) -> Dict[str, float]:
+        """Retourne l'état du gestionnaire d'inactivité du service."""
+        return self._request('idle', {})
+
+    def get_audio_metrics(self, seconds: float = 5.0) -> Optional[dict]:
+        """Retourne les mesures du thread audio du service (voir AudioMixer.get_audio_metrics)."""
+        return self._request('metrics', None, seconds=seconds)
+
+    def fade_out(self, sound_id: str, duration_ms: int = 1000):
+        """Effectue un fondu de sortie sur un son."""
+        self._send('fade_out', sound_id=sound_id, duration_ms=duration_ms)
+
+    def fade_out_all(self, duration_ms: int = 1000):
+        """Effectue un fondu de sortie sur tous les sons."""
+        self._send('fade_out', duration_ms=duration_ms)
+
+    def transition_to(self, sounds: Dict[str, float], fade_ms: int = 1000,
+                      name: Optional[str] = None,
+                      effects: Optional[Dict[str, dict]] = None) -> Future:
+        """Fond le mix du service dans un preset ; le Future est résolu au lancement."""
+        if effects is not None:
+            for sound_id in sounds:
+                try:
+                    self._remember_effects(sound_id, normalize_effects(effects.get(sound_id)))
+                except ValueError as e:
+                    # Le service les écarte aussi : les effets du son restent inchangés
+                    print(f"Erreur: Effets invalides pour {sound_id}: {e}")
+        future = Future()
+        try:
+            request = self.client.request_async('transition', sounds=sounds, fade_ms=fade_ms,
+                                                name=name, effects=effects)
+        except ServiceError as e:
+            print(f"Erreur: {e}")
+            future.set_result(False)
+            return future
+
+        def done(request):
+            error = request.exception()
+            if error is not None:
+                print(f"Erreur: {error}")
+            future.set_result(error is None and bool(request.result()))
+        request.add_done_callback(done)
+        return future
+
+    def queue_playlist(self, entries: Iterable[PlaylistEntry], loop: bool = False):
+        """Enchaîne des presets dans le service, chacun pendant sa durée."""
+        self._send('playlist', entries=[entry._asdict() for entry in entries], loop=loop)
+
+    def clear_playlist(self):
+        """Abandonne la liste de lecture du service."""
+        self._send('playlist', entries=[])
+
+    def start_sleep_timer(self, duration: float, fade: float = 0.0):
+        """Lance le minuteur d'arrêt du service (durée et fondu en secondes)."""
+        self._send('sleep_timer', duration=duration, fade=fade)
+
+    def cancel_sleep_timer(self):
+        """Arrête le minuteur d'arrêt du service."""
+        self._send('sleep_timer')
+
+    def sleep_timer_remaining(self) -> Optional[float]:
+        """Temps de lecture restant avant l'arrêt (secondes), None sans minuteur."""
+        state = self._request('status', None)
+        return state.get('sleep_timer') if state else None
+
+    def cleanup(self):
+        """Se détache du service ; les sons continuent d'y être joués."""
+        self.volume_updates.flush()
+        self.client.close()
+
+    def _remember_effects(self, sound_id: str, params: dict):
+        """Retient des effets validés (voir effects.normalize)."""
+        if params:
+            self.effects[sound_id] = dict(params)
+        else:
+            self.effects.pop(sound_id, None)
+
+    def _send(self, cmd: str, **args):
+        """Envoie une requête sans attendre sa réponse."""
+        try:
+            self.client.request_async(cmd, **args)
+        except ServiceError as e:
+            print(f"Erreur: {e}")
+
+    def _request(self, cmd: str, default, **args):
+        """Envoie une requête et attend sa réponse ; `default` en cas d'erreur."""
+        try:
+            return self.client.request(cmd, **args)
+        except Exception as e:
+            print(f"Erreur: {e}")
+            return default
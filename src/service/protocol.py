@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Protocole du service audio : une requête ou une réponse JSON par ligne.
+
+Requête :  {"id": 1, "cmd": "play", "args": {"sound_id": "rain", "volume": 0.5}}
+Réponse :  {"id": 1, "ok": true, "result": true}
+Erreur :   {"id": 1, "ok": false, "error": "Commande inconnue: foo"}
+
+Les réponses portent l'identifiant de la requête : un client peut envoyer
+plusieurs requêtes sans attendre, les réponses arrivent dans l'ordre de
+leur achèvement.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Tuple, Union
+
+# Port local utilisé là où les sockets Unix ne sont pas disponibles (Windows)
+DEFAULT_PORT = 47631
+
+# Adresse : chemin d'un socket Unix, ou couple (hôte, port) TCP
+Address = Union[str, Tuple[str, int]]
+
+
+class ServiceError(Exception):
+    """Erreur renvoyée par le service ou connexion perdue."""
+
+
+def default_address() -> Address:
+    """Retourne l'adresse par défaut du service pour l'utilisateur courant."""
+    if sys.platform == 'win32':
+        return ('127.0.0.1', DEFAULT_PORT)
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return str(Path(runtime_dir) / 'blanket.sock')
+    return str(Path.home() / '.cache' / 'blanket' / 'blanket.sock')
+
+
+def encode(message: dict) -> bytes:
+    """Encode un message en une ligne JSON."""
+    return json.dumps(message, separators=(',', ':')).encode('utf-8') + b'\n'
+
+
+def decode(line: bytes) -> dict:
+    """Décode une ligne JSON ; lève ValueError si elle n'est pas un objet."""
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("Message JSON attendu")
+    return message
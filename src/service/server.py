@@ -0,0 +1,358 @@
+# -*- coding: utf-8 -*-
+"""
+Service audio : possède le mixeur et l'expose sur un socket local.
+
+Chaque ligne reçue est traitée dans sa propre tâche asyncio : un client lent
+ou un son long à décoder ne bloque ni les autres requêtes ni les autres
+clients. Les appels au mixeur passent tous par un unique thread dédié, ce qui
+les sérialise sans verrou supplémentaire ; les décodages, eux, restent dans
+le groupe de chargement du mixeur.
+"""
+
+import asyncio
+import functools
+import os
+import socket
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.audio.transitions import PlaylistEntry
+from src.core.sounds import SOUNDS_DATA
+from src.service.protocol import Address, ServiceError, decode, encode
+
+
+class MixerServer:
+    """Serveur JSON-lines pilotant un mixeur audio."""
+
+    def __init__(self, mixer, address: Address):
+        """
+        Args:
+            mixer: Mixeur audio (AudioMixer ou EngineMixer)
+            address: Chemin du socket Unix, ou couple (hôte, port) TCP
+        """
+        self.mixer = mixer
+        self.address = address
+        self.clients = 0
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="blanket-daemon")
+        self._stopped: Optional[asyncio.Event] = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def serve(self):
+        """Écoute jusqu'à la commande 'shutdown' (ou l'appel de stop())."""
+        self._stopped = asyncio.Event()
+        if isinstance(self.address, str):
+            self._remove_stale_socket()
+            Path(self.address).parent.mkdir(parents=True, exist_ok=True)
+            server = await asyncio.start_unix_server(self._handle, path=self.address)
+            # Seul l'utilisateur courant peut piloter son service
+            os.chmod(self.address, 0o600)
+        else:
+            host, port = self.address
+            server = await asyncio.start_server(self._handle, host, port)
+
+        try:
+            async with server:
+                await self._stopped.wait()
+                # Ferme les connexions restantes : leurs tâches se terminent d'elles-mêmes
+                connections = dict(self._connections)
+                for writer in connections.values():
+                    writer.close()
+                await asyncio.gather(*connections, return_exceptions=True)
+        finally:
+            if isinstance(self.address, str):
+                try:
+                    os.unlink(self.address)
+                except OSError:
+                    pass
+            await self._call(self.mixer.cleanup)
+            self._executor.shutdown(wait=False)
+
+    def stop(self):
+        """Demande l'arrêt du service."""
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Connexion d'un client : une tâche par requête."""
+        self.clients += 1
+        self._connections[asyncio.current_task()] = writer
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.ensure_future(self._respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients -= 1
+            self._connections.pop(asyncio.current_task(), None)
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter):
+        """Exécute une requête et écrit sa réponse."""
+        request_id = None
+        try:
+            request = decode(line)
+            request_id = request.get('id')
+            handler = getattr(self, f"cmd_{request.get('cmd')}", None)
+            if handler is None:
+                raise ServiceError(f"Commande inconnue: {request.get('cmd')}")
+            result = await handler(**request.get('args', {}))
+            response = {'id': request_id, 'ok': True, 'result': result}
+        except Exception as e:
+            response = {'id': request_id, 'ok': False, 'error': str(e)}
+        try:
+            writer.write(encode(response))
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _call(self, function, *args, **kwargs):
+        """Appelle le mixeur depuis son thread dédié."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(function, *args, **kwargs)
+        )
+
+    def _remove_stale_socket(self):
+        """Supprime le socket d'un service arrêté brutalement ; refuse s'il est actif."""
+        if not os.path.exists(self.address):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.address)
+        except OSError:
+            os.unlink(self.address)
+        else:
+            raise ServiceError(f"Un service écoute déjà sur {self.address}")
+        finally:
+            probe.close()
+
+    # Commandes ------------------------------------------------------------
+
+    async def cmd_ping(self) -> str:
+        """Vérifie que le service répond."""
+        return "pong"
+
+    async def cmd_load(self, sound_id: str, file: Optional[str] = None,
+                       mode: str = 'auto') -> bool:
+        """Décode un son en avance (voir AudioMixer.load_async)."""
+        sound_data = SOUNDS_DATA.get(sound_id, {})
+        if 'generator' in sound_data:
+            return True
+        file = file or sound_data.get('file')
+        if not file:
+            raise ServiceError(f"Son inconnu: {sound_id}")
+        future = self.mixer.load_async(sound_id, file, sound_data.get('playback', mode))
+        return await asyncio.wrap_future(future)
+
+    async def cmd_play(self, sound_id: str, volume: float = 0.5, file: Optional[str] = None,
+                       mode: str = 'auto', category: Optional[str] = None,
+                       generator: Optional[str] = None, restart: bool = False) -> bool:
+        """
+        Joue un son ; un son du catalogue n'a besoin que de son identifiant.
+
+        Un son déjà en lecture n'est pas relancé (seul son volume change),
+        sauf avec restart : une interface qui se rattache au service peut
+        ainsi rejouer son état sans coupure.
+        """
+        sound_data = SOUNDS_DATA.get(sound_id, {})
+        category = category or sound_data.get('category')
+        generator = generator or sound_data.get('generator')
+        if not restart and await self._call(self.mixer.is_playing, sound_id):
+            await self._call(self.mixer.set_volume, sound_id, volume)
+            return True
+        if generator:
+            return await self._call(self.mixer.play_generator, sound_id, generator,
+                                    volume, category)
+
+        if not await self.cmd_load(sound_id, file, mode):
+            return False
+        file = file or sound_data['file']
+        return await self._call(self.mixer.play_sound, sound_id, file, volume,
+                                sound_data.get('playback', mode), category)
+
+    async def cmd_stop(self, sound_id: str):
+        """Arrête un son."""
+        await self._call(self.mixer.stop_sound, sound_id)
+
+    async def cmd_stop_all(self):
+        """Arrête tous les sons."""
+        await self._call(self.mixer.stop_all)
+
+    async def cmd_volume(self, sound_id: str, volume: float):
+        """Définit le volume d'un son."""
+        await self._call(self.mixer.set_volume, sound_id, volume)
+
+    async def cmd_master(self, volume: float):
+        """Définit le volume principal."""
+        await self._call(self.mixer.set_master_volume, volume)
+
+    async def cmd_category_volume(self, category: str, volume: float):
+        """Définit le volume d'une catégorie."""
+        await self._call(self.mixer.set_category_volume, category, volume)
+
+    async def cmd_effects(self, sound_id: str, effects: Optional[dict] = None):
+        """Définit les effets d'un son (voir src/audio/effects.py) ; sans effets, les retire."""
+        try:
+            await self._call(self.mixer.set_effects, sound_id, effects)
+        except ValueError as e:
+            raise ServiceError(str(e))
+
+    async def cmd_pause(self):
+        """Met tous les sons en pause."""
+        await self._call(self.mixer.pause_all)
+
+    async def cmd_resume(self):
+        """Reprend tous les sons."""
+        await self._call(self.mixer.resume_all)
+
+    async def cmd_fade_out(self, sound_id: Optional[str] = None, duration_ms: int = 1000):
+        """Fondu de sortie d'un son, ou de tous si sound_id est absent."""
+        if sound_id is None:
+            await self._call(self.mixer.fade_out_all, duration_ms)
+        else:
+            await self._call(self.mixer.fade_out, sound_id, duration_ms)
+
+    async def cmd_preset(self, sounds: Optional[Dict[str, float]] = None,
+                         name: Optional[str] = None) -> bool:
+        """
+        Applique un preset ({sound_id: volume}) ou un preset enregistré par nom.
+
+        Les sons absents du preset sont arrêtés, les autres lancés ou
+        ajustés sans coupure.
+        """
+        if sounds is None:
+            if name is None:
+                raise ServiceError("Preset attendu (sounds ou name)")
+            sounds = await self._call(_load_saved_preset, name)
+            effects = await self._call(_load_saved_effects, name)
+            for sound_id in sounds:
+                await self.cmd_effects(sound_id, effects.get(sound_id))
+
+        status = await self.cmd_status()
+        for sound_id, state in status['sounds'].items():
+            if state['playing'] and sound_id not in sounds:
+                await self.cmd_stop(sound_id)
+        results = await asyncio.gather(*(
+            self.cmd_play(sound_id, volume) for sound_id, volume in sounds.items()
+        ))
+        return all(results)
+
+    async def cmd_transition(self, sounds: Optional[Dict[str, float]] = None,
+                             name: Optional[str] = None, fade_ms: int = 1000,
+                             effects: Optional[Dict[str, dict]] = None) -> bool:
+        """
+        Fond le mix dans un preset ({sound_id: volume}) ou un preset enregistré.
+
+        effects ({sound_id: paramètres}) remplace les effets des sons du
+        preset ; ceux d'un preset enregistré sont repris. La réponse arrive
+        une fois les sons chargés et la transition lancée.
+        """
+        if sounds is None:
+            if name is None:
+                raise ServiceError("Preset attendu (sounds ou name)")
+            sounds = await self._call(_load_saved_preset, name)
+            if effects is None:
+                effects = await self._call(_load_saved_effects, name)
+        future = await self._call(self.mixer.transition_to, sounds, fade_ms, name, effects)
+        return await asyncio.wrap_future(future)
+
+    async def cmd_playlist(self, entries: List[dict], loop: bool = False) -> int:
+        """
+        Remplace la liste de lecture ; une liste vide l'arrête.
+
+        Chaque entrée : {"sounds": {...} ou "name": ..., "duration": secondes,
+        "fade_ms": millisecondes, "effects": {...}}. Retourne le nombre de
+        presets en file.
+        """
+        playlist = []
+        for entry in entries:
+            sounds = entry.get('sounds')
+            name = entry.get('name')
+            effects = entry.get('effects')
+            if sounds is None:
+                if name is None:
+                    raise ServiceError("Preset attendu (sounds ou name)")
+                sounds = await self._call(_load_saved_preset, name)
+                if effects is None:
+                    effects = await self._call(_load_saved_effects, name)
+            if 'duration' not in entry:
+                raise ServiceError("Durée attendue pour chaque preset")
+            playlist.append(PlaylistEntry(sounds, float(entry['duration']),
+                                          int(entry.get('fade_ms', 1000)), name, effects))
+        await self._call(self.mixer.queue_playlist, playlist, loop)
+        return len(playlist)
+
+    async def cmd_sleep_timer(self, duration: Optional[float] = None,
+                              fade: float = 0.0) -> Optional[float]:
+        """
+        Lance le minuteur d'arrêt (secondes de lecture), ou l'arrête sans durée.
+
+        Retourne le temps restant.
+        """
+        if duration is None:
+            await self._call(self.mixer.cancel_sleep_timer)
+        else:
+            await self._call(self.mixer.start_sleep_timer, duration, fade)
+        return await self._call(self.mixer.sleep_timer_remaining)
+
+    async def cmd_status(self) -> dict:
+        """Retourne l'état du mixeur : sons, volumes, pause, clients."""
+        return await self._call(self._status)
+
+    async def cmd_memory(self) -> Dict[str, int]:
+        """Retourne le PCM résident de chaque son."""
+        return await self._call(self.mixer.get_memory_report)
+
+    async def cmd_idle(self) -> dict:
+        """Retourne l'état du gestionnaire d'inactivité et ses compteurs."""
+        return await self._call(self.mixer.get_idle_stats)
+
+    async def cmd_metrics(self, seconds: float = 5.0) -> Optional[dict]:
+        """Retourne les mesures du thread audio (None avec le moteur pygame)."""
+        return await self._call(self.mixer.get_audio_metrics, seconds)
+
+    async def cmd_shutdown(self):
+        """Arrête le service (les sons s'arrêtent avec lui)."""
+        self.stop()
+
+    def _status(self) -> dict:
+        mixer = self.mixer
+        return {
+            'master': mixer.master_volume,
+            'paused': mixer.paused,
+            'clients': self.clients,
+            'preset': mixer.transitions.current.name if mixer.transitions.current else None,
+            'sleep_timer': mixer.sleep_timer_remaining(),
+            'sounds': {
+                sound_id: {'playing': mixer.is_playing(sound_id), 'volume': volume,
+                           'effects': mixer.get_effects(sound_id),
+                           'normalization': mixer.normalization_gain(sound_id)}
+                for sound_id, volume in mixer.volumes.items()
+            },
+        }
+
+
+def _load_saved_preset(name: str) -> Dict[str, float]:
+    """Lit un preset enregistré par l'application."""
+    from src.core.settings import Settings
+
+    presets = Settings().presets
+    if name not in presets:
+        raise ServiceError(f"Preset introuvable: {name}")
+    return presets[name]
+
+
+def _load_saved_effects(name: str) -> Dict[str, dict]:
+    """Lit les effets d'un preset enregistré par l'application."""
+    from src.core.settings import Settings
+
+    return Settings().load_preset_effects(name)
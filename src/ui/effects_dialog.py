@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Dialogue des effets d'un son.
+"""
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel,
+    QSpinBox, QSlider, QPushButton, QFormLayout
+)
+from PyQt6.QtCore import Qt
+
+from src.audio import effects
+
+# Bandes de l'égaliseur réglées par les curseurs Graves et Aigus (Hz)
+BASS_FREQUENCY = 200.0
+TREBLE_FREQUENCY = 4000.0
+
+
+class EffectsDialog(QDialog):
+    """Règle les effets d'un son ; chaque changement est entendu aussitôt."""
+
+    def __init__(self, sound_id, sound_name, audio_mixer, parent=None):
+        super().__init__(parent)
+        self.sound_id = sound_id
+        self.audio_mixer = audio_mixer
+        params = audio_mixer.get_effects(sound_id)
+        # Bandes de l'égaliseur sans curseur ici (preset importé), conservées
+        self._other_bands = [band for band in params.get('eq', [])
+                             if self._shelf(band) is None]
+        self.init_ui(sound_name)
+        self.load_effects(params)
+
+    def init_ui(self, sound_name):
+        """Initialise l'interface du dialogue."""
+        self.setWindowTitle(f"Effets - {sound_name}")
+        self.setMinimumWidth(400)
+
+        layout = QVBoxLayout()
+        form = QFormLayout()
+
+        self.lowpass = QSpinBox()
+        self.lowpass.setRange(0, int(effects.MAX_FREQUENCY))
+        self.lowpass.setSingleStep(500)
+        self.lowpass.setSuffix(" Hz")
+        self.lowpass.setSpecialValueText("Désactivé")
+        self.lowpass.setToolTip("Coupe les aigus au-dessus de cette fréquence (assombrit le son)")
+        form.addRow("Passe-bas:", self.lowpass)
+
+        self.highpass = QSpinBox()
+        self.highpass.setRange(0, 2000)
+        self.highpass.setSingleStep(20)
+        self.highpass.setSuffix(" Hz")
+        self.highpass.setSpecialValueText("Désactivé")
+        self.highpass.setToolTip("Coupe les graves sous cette fréquence")
+        form.addRow("Passe-haut:", self.highpass)
+
+        self.bass = QSpinBox()
+        self.bass.setRange(-12, 12)
+        self.bass.setSuffix(" dB")
+        form.addRow("Graves:", self.bass)
+
+        self.treble = QSpinBox()
+        self.treble.setRange(-12, 12)
+        self.treble.setSuffix(" dB")
+        form.addRow("Aigus:", self.treble)
+
+        self.width_slider = QSlider(Qt.Orientation.Horizontal)
+        self.width_slider.setRange(0, 200)
+        self.width_slider.setToolTip("0 % : mono, 100 % : inchangée, 200 % : élargie")
+        form.addRow("Largeur stéréo:", self.width_slider)
+
+        self.pan_slider = QSlider(Qt.Orientation.Horizontal)
+        self.pan_slider.setRange(-100, 100)
+        form.addRow("Balance:", self.pan_slider)
+
+        layout.addLayout(form)
+
+        if not effects.filters_available():
+            for widget in (self.lowpass, self.highpass, self.bass, self.treble):
+                widget.setEnabled(False)
+            layout.addWidget(QLabel("Égaliseur et filtres indisponibles (scipy absent)"))
+        if not getattr(self.audio_mixer, 'applies_effects', True):
+            layout.addWidget(QLabel("Les effets ne sont entendus qu'avec le moteur NumPy"))
+
+        # Boutons
+        button_layout = QHBoxLayout()
+
+        reset_button = QPushButton("Réinitialiser")
+        reset_button.clicked.connect(self.reset)
+        button_layout.addWidget(reset_button)
+
+        close_button = QPushButton("Fermer")
+        close_button.clicked.connect(self.accept)
+        button_layout.addWidget(close_button)
+
+        layout.addLayout(button_layout)
+        self.setLayout(layout)
+
+        for spin_box in (self.lowpass, self.highpass, self.bass, self.treble):
+            spin_box.valueChanged.connect(self.apply_effects)
+        for slider in (self.width_slider, self.pan_slider):
+            slider.valueChanged.connect(self.apply_effects)
+
+    def load_effects(self, params):
+        """Affiche des paramètres d'effets sans les renvoyer au mixeur."""
+        shelves = {self._shelf(band): band['gain'] for band in params.get('eq', [])}
+        values = {
+            self.lowpass: params.get('lowpass', 0),
+            self.highpass: params.get('highpass', 0),
+            self.bass: shelves.get('bass', 0),
+            self.treble: shelves.get('treble', 0),
+            self.width_slider: params.get('width', 1.0) * 100,
+            self.pan_slider: params.get('pan', 0.0) * 100,
+        }
+        for widget, value in values.items():
+            widget.blockSignals(True)
+            widget.setValue(int(round(value)))
+            widget.blockSignals(False)
+
+    def get_effects(self):
+        """Retourne les paramètres d'effets réglés."""
+        params = {
+            'width': self.width_slider.value() / 100.0,
+            'pan': self.pan_slider.value() / 100.0,
+        }
+        # Une coupure sous 20 Hz n'a pas de sens : le filtre est désactivé
+        if self.lowpass.value() >= effects.MIN_FREQUENCY:
+            params['lowpass'] = self.lowpass.value()
+        if self.highpass.value() >= effects.MIN_FREQUENCY:
+            params['highpass'] = self.highpass.value()
+        bands = list(self._other_bands)
+        if self.bass.value():
+            bands.append({'type': 'lowshelf', 'freq': BASS_FREQUENCY, 'gain': self.bass.value()})
+        if self.treble.value():
+            bands.append({'type': 'highshelf', 'freq': TREBLE_FREQUENCY,
+                          'gain': self.treble.value()})
+        if bands:
+            params['eq'] = bands
+        return params
+
+    def apply_effects(self):
+        """Envoie les réglages au mixeur."""
+        try:
+            self.audio_mixer.set_effects(self.sound_id, self.get_effects())
+        except ValueError as e:
+            print(f"Erreur: Effets invalides pour {self.sound_id}: {e}")
+
+    def reset(self):
+        """Retire tous les effets du son."""
+        self._other_bands = []
+        self.load_effects({})
+        self.apply_effects()
+
+    @staticmethod
+    def _shelf(band):
+        """Retourne 'bass' ou 'treble' pour une bande réglée par un curseur, sinon None."""
+        if band.get('type') == 'lowshelf' and band.get('freq') == BASS_FREQUENCY:
+            return 'bass'
+        if band.get('type') == 'highshelf' and band.get('freq') == TREBLE_FREQUENCY:
+            return 'treble'
+        return None
@@ -5,32 +5,100 @@ Fenêtre principale de l'application Blanket.
 
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QScrollArea, QLabel, QPushButton, QSlider, QGridLayout,
-    QSystemTrayIcon, QMenu
+    QScrollArea, QLabel, QPushButton, QSlider,
+    QSystemTrayIcon, QMenu, QApplication
 )
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtCore import Qt, QTimer, QFileSystemWatcher, pyqtSignal
 from PyQt6.QtGui import QAction, QIcon
 
-from src.audio.mixer import AudioMixer
-from src.ui.sound_card import SoundCard
-from src.ui.preset_dialog import PresetDialog
-from src.ui.settings_dialog import SettingsDialog
+from src.audio.metrics import HISTOGRAM_EDGES
+from src.audio.mixer import create_mixer
+from src.ui.sound_grid import SoundGrid
+from src.core import library
 from src.core.settings import Settings
 from src.core.sounds import SOUNDS_DATA
 
+# Délai avant la construction de l'index de recherche des presets (ms)
+PRESET_INDEX_DELAY_MS = 2000
+
+# Intervalle de rafraîchissement du temps restant du minuteur (ms)
+SLEEP_TIMER_REFRESH_MS = 1000
+
+# Délai avant le parcours des dossiers de la bibliothèque (ms)
+LIBRARY_SCAN_DELAY_MS = 1000
+
+# Intervalle de rafraîchissement des mesures audio de la barre d'état (ms)
+METRICS_REFRESH_MS = 500
+
+# Sons les plus coûteux détaillés dans l'infobulle des mesures audio
+METRICS_TOP_LAYERS = 5
+
 
 class MainWindow(QMainWindow):
     """Fenêtre principale de l'application."""
     
-    def __init__(self):
+    # Émis depuis le thread du minuteur, reçu dans le thread de l'interface
+    sleep_timer_expired = pyqtSignal()
+    # Émis depuis le thread du parcours de la bibliothèque
+    library_sound_found = pyqtSignal(str, dict)
+    library_scan_finished = pyqtSignal(int)
+    library_sound_removed = pyqtSignal(str)
+    # Émis depuis le thread du réglage de la taille des blocs audio
+    buffer_resized = pyqtSignal(int)
+    
+    def __init__(self, settings=None, restore_state=True):
+        """
+        Args:
+            settings: Paramètres partagés (chargés ici si absents)
+            restore_state: Restaurer immédiatement les sons de la session précédente
+        """
         super().__init__()
-        self.settings = Settings()
-        self.audio_mixer = AudioMixer()
-        self.sound_cards = {}
+        self.settings = settings or Settings()
+        # Thème appliqué au lancement (voir main.py)
+        self._dark_mode = self.settings.dark_mode
+        self.audio_mixer = self.create_audio_mixer()
+        
+        # Sons de la bibliothèque déjà indexés : affichés dès le démarrage
+        self.library = self.settings.sound_library()
+        library.register(self.library.cached_sounds())
         
         self.init_ui()
         self.setup_tray_icon()
-        self.load_saved_state()
+        if restore_state:
+            self.load_saved_state()
+        
+        # Durée et fondu du décompte lancé par cette fenêtre
+        self._timer_settings = None
+        self.sleep_timer_expired.connect(self.on_sleep_timer_expired)
+        if not self.attached:
+            self.audio_mixer.sleep_timer.on_expired = self.sleep_timer_expired.emit
+            # Taille de bloc apprise, reprise au prochain lancement sur cette machine
+            self.buffer_resized.connect(self.settings.save_learned_buffer)
+            self.audio_mixer.buffer_tuner.on_change = self.buffer_resized.emit
+        self.apply_timer_settings()
+        self.apply_metrics_settings()
+        
+        # Index de recherche des presets construit après le démarrage
+        QTimer.singleShot(PRESET_INDEX_DELAY_MS, self.settings.presets.prepare_index)
+        
+        # Dossiers de la bibliothèque parcourus en arrière-plan, puis surveillés
+        self.library_sound_found.connect(self.add_library_sound)
+        self.library_scan_finished.connect(self.on_library_scanned)
+        self.library_sound_removed.connect(self.remove_library_sound)
+        self.library_watcher = QFileSystemWatcher(self)
+        self.library_watcher.directoryChanged.connect(self.scan_library)
+        self.watch_library_folders()
+        QTimer.singleShot(LIBRARY_SCAN_DELAY_MS, self.scan_library)
+        
+    def create_audio_mixer(self):
+        """Se rattache au service audio s'il est lancé, sinon crée un mixeur local."""
+        from src.service.client import RemoteMixer, connect
+        
+        client = connect()
+        self.attached = client is not None
+        if self.attached:
+            return RemoteMixer(client)
+        return create_mixer(self.settings.audio_engine, **self.settings.mixer_options())
         
     def init_ui(self):
         """Initialise l'interface utilisateur."""
@@ -48,24 +116,35 @@ class MainWindow(QMainWindow):
         # Contrôle du volume principal
         self.create_master_volume(main_layout)
         
-        # Grille de sons
+        # Grille de sons (cartes construites à la demande)
         scroll_area = QScrollArea()
         scroll_area.setWidgetResizable(True)
         scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
         
-        sounds_widget = QWidget()
-        self.sounds_layout = QGridLayout(sounds_widget)
-        self.sounds_layout.setSpacing(15)
-        
-        # Créer les cartes de sons
-        self.create_sound_cards()
+        self.sound_grid = SoundGrid(SOUNDS_DATA, self.audio_mixer, scroll_area)
         
-        scroll_area.setWidget(sounds_widget)
+        scroll_area.setWidget(self.sound_grid)
         main_layout.addWidget(scroll_area)
         
         # Barre d'état
         self.statusBar().showMessage("Prêt")
         
+        # Temps restant du minuteur d'arrêt
+        self.timer_label = QLabel()
+        self.timer_label.hide()
+        self.statusBar().addPermanentWidget(self.timer_label)
+        self.timer_refresh = QTimer(self)
+        self.timer_refresh.setInterval(SLEEP_TIMER_REFRESH_MS)
+        self.timer_refresh.timeout.connect(self.update_timer_label)
+        
+        # Mesures du thread audio (option des préférences)
+        self.metrics_label = QLabel()
+        self.metrics_label.hide()
+        self.statusBar().addPermanentWidget(self.metrics_label)
+        self.metrics_refresh = QTimer(self)
+        self.metrics_refresh.setInterval(METRICS_REFRESH_MS)
+        self.metrics_refresh.timeout.connect(self.update_metrics_label)
+        
         # Menu bar
         self.create_menu_bar()
         
@@ -81,6 +160,10 @@ class MainWindow(QMainWindow):
         open_action.triggered.connect(self.open_audio_file)
         file_menu.addAction(open_action)
         
+        folder_action = QAction("Ajouter un &dossier de sons...", self)
+        folder_action.triggered.connect(self.add_library_folder)
+        file_menu.addAction(folder_action)
+        
         file_menu.addSeparator()
         
         quit_action = QAction("&Quitter", self)
@@ -159,23 +242,6 @@ class MainWindow(QMainWindow):
         
         parent_layout.addLayout(volume_layout)
         
-    def create_sound_cards(self):
-        """Crée les cartes de sons."""
-        row = 0
-        col = 0
-        max_cols = 3
-        
-        for sound_id, sound_data in SOUNDS_DATA.items():
-            card = SoundCard(sound_id, sound_data, self.audio_mixer)
-            self.sound_cards[sound_id] = card
-            
-            self.sounds_layout.addWidget(card, row, col)
-            
-            col += 1
-            if col >= max_cols:
-                col = 0
-                row += 1
-                
     def setup_tray_icon(self):
         """Configure l'icône de la barre des tâches."""
         self.tray_icon = QSystemTrayIcon(self)
@@ -224,13 +290,12 @@ class MainWindow(QMainWindow):
             
     def reset_volumes(self):
         """Réinitialise tous les volumes."""
-        for card in self.sound_cards.values():
-            card.reset_volume()
+        self.sound_grid.reset_volumes()
             
     def on_master_volume_changed(self, value):
         """Gère le changement du volume principal."""
         self.volume_label.setText(f"{value}%")
-        self.audio_mixer.set_master_volume(value / 100.0)
+        self.audio_mixer.request_master_volume(value / 100.0)
         
     def open_audio_file(self):
         """Ouvre un fichier audio personnalisé."""
@@ -239,45 +304,244 @@ class MainWindow(QMainWindow):
             self,
             "Ouvrir un fichier audio",
             "",
-            "Fichiers audio (*.mp3 *.wav *.ogg);;Tous les fichiers (*.*)"
+            "Fichiers audio (*.mp3 *.wav *.ogg *.flac);;Tous les fichiers (*.*)"
         )
-        if file_path:
-            # TODO: Ajouter le fichier personnalisé
-            self.statusBar().showMessage(f"Fichier chargé: {file_path}", 3000)
-            
+        if not file_path:
+            return
+        sound_data = self.library.add_file(file_path)
+        if sound_data is None:
+            self.statusBar().showMessage(f"Fichier audio illisible: {file_path}", 3000)
+            return
+        self.settings.library_files = list(self.library.files)
+        self.settings.save()
+        self.add_library_sound(library.sound_id(file_path), sound_data)
+        self.statusBar().showMessage(f"Fichier chargé: {file_path}", 3000)
+        
+    def add_library_folder(self):
+        """Ajoute un dossier à la bibliothèque et le parcourt."""
+        from PyQt6.QtWidgets import QFileDialog
+        folder = QFileDialog.getExistingDirectory(self, "Ajouter un dossier de sons")
+        if not folder or not self.library.add_folder(folder):
+            return
+        self.settings.library_folders = list(self.library.folders)
+        self.settings.save()
+        self.watch_library_folders()
+        self.scan_library()
+        
+    def watch_library_folders(self):
+        """Surveille les dossiers de la bibliothèque : un changement relance le parcours."""
+        watched = set(self.library_watcher.directories())
+        folders = [folder for folder in self.library.folders if folder not in watched]
+        if folders:
+            self.library_watcher.addPaths(folders)
+        
+    def scan_library(self):
+        """Parcourt la bibliothèque en arrière-plan ; chaque son trouvé reçoit sa carte."""
+        if not (self.library.folders or self.library.files):
+            return
+        self.statusBar().showMessage("Recherche de sons dans la bibliothèque...")
+        self.library.scan_async(self.library_sound_found.emit,
+                                lambda found: self.library_scan_finished.emit(len(found)),
+                                self.library_sound_removed.emit)
+        
+    def add_library_sound(self, sound_id, sound_data):
+        """Ajoute (ou met à jour) la carte d'un son de la bibliothèque."""
+        library.register({sound_id: sound_data})
+        self.sound_grid.add_sound(sound_id, sound_data)
+        
+    def on_library_scanned(self, count):
+        """Fin du parcours de la bibliothèque."""
+        self.statusBar().showMessage(f"Bibliothèque : {count} son(s)", 3000)
+        
+    def remove_library_sound(self, sound_id):
+        """Retire la carte d'un son dont le fichier a disparu de la bibliothèque."""
+        if self.sound_grid.is_playing(sound_id):
+            self.audio_mixer.stop_sound(sound_id)
+        self.sound_grid.remove_sound(sound_id)
+        library.unregister([sound_id])
+        
     def show_preset_dialog(self):
         """Affiche le dialogue de sauvegarde de preset."""
+        from src.ui.preset_dialog import PresetDialog
         dialog = PresetDialog(self)
         if dialog.exec():
             preset_name = dialog.get_preset_name()
-            self.save_preset(preset_name)
+            self.save_preset(preset_name, dialog.get_tags())
             
-    def save_preset(self, name):
+    def save_preset(self, name, tags=None):
         """Sauvegarde le preset actuel."""
         preset_data = {}
-        for sound_id, card in self.sound_cards.items():
-            if card.is_playing():
-                preset_data[sound_id] = card.get_volume()
-        
-        self.settings.save_preset(name, preset_data)
+        effects = {}
+        for sound_id in self.sound_grid.sound_ids():
+            if self.sound_grid.is_playing(sound_id):
+                preset_data[sound_id] = self.sound_grid.get_volume(sound_id)
+                sound_effects = self.audio_mixer.get_effects(sound_id)
+                if sound_effects:
+                    effects[sound_id] = sound_effects
+        
+        self.settings.save_preset(name, preset_data, tags, effects)
         self.statusBar().showMessage(f"Preset '{name}' sauvegardé", 3000)
         
     def load_preset(self):
         """Charge un preset."""
-        # TODO: Implémenter le dialogue de sélection de preset
-        pass
+        from src.ui.preset_dialog import PresetLoadDialog
+        dialog = PresetLoadDialog(self.settings.presets, self)
+        if dialog.exec():
+            preset_name = dialog.get_selected_preset()
+            if preset_name:
+                self.apply_preset(preset_name)
+                
+    def apply_preset(self, name):
+        """Fond le mix courant dans celui d'un preset."""
+        sounds = self.settings.load_preset(name)
+        effects = self.settings.load_preset_effects(name)
+        fade_ms = self.settings.fade_duration if self.settings.fade_enabled else 0
+        self.audio_mixer.transition_to(sounds, fade_ms, name, effects)
+        
+        # Les cartes suivent le mixeur sans lui envoyer de commande
+        for sound_id in self.sound_grid.sound_ids():
+            if sound_id in sounds:
+                self.sound_grid.card(sound_id).show_state(True, sounds[sound_id])
+            else:
+                card = self.sound_grid.cards.get(sound_id)
+                if card is not None and (card.is_playing() or card.loading):
+                    card.show_state(False)
+        self.settings.presets.touch(name)
+        self.statusBar().showMessage(f"Preset '{name}' chargé", 3000)
         
     def show_settings(self):
         """Affiche le dialogue des paramètres."""
+        from src.ui.settings_dialog import SettingsDialog
         dialog = SettingsDialog(self, self.settings)
         if dialog.exec():
             # Recharger les paramètres
             self.apply_settings()
             
     def apply_settings(self):
-        """Applique les nouveaux paramètres."""
-        # TODO: Implémenter l'application des paramètres
-        pass
+        """
+        Applique les nouveaux paramètres.
+        
+        Le moteur audio et la fréquence native ne sont pris en compte qu'au
+        prochain démarrage : le mixeur est créé une seule fois.
+        """
+        self.apply_theme_settings()
+        self.apply_timer_settings()
+        self.apply_metrics_settings()
+        if not self.attached:
+            options = self.settings.mixer_options()
+            self.audio_mixer.idle.configure(options['idle_timeout'], options['memory_budget'])
+            self.audio_mixer.set_normalization(options['normalize_loudness'])
+            self.audio_mixer.buffer_tuner.configure(options['adaptive_buffer'],
+                                                    *options['latency_bounds'])
+        
+    def apply_theme_settings(self):
+        """Bascule entre thème clair et sombre si le choix a changé."""
+        dark = self.settings.dark_mode
+        if dark == self._dark_mode:
+            return
+        from src.ui.styles import apply_dark_theme, apply_light_theme
+        app = QApplication.instance()
+        if dark:
+            app.setStyle("Fusion")
+            apply_dark_theme(app)
+        else:
+            apply_light_theme(app)
+        self._dark_mode = dark
+        
+    def apply_timer_settings(self):
+        """Lance ou arrête le minuteur d'arrêt selon les paramètres."""
+        timer = (self.settings.timer_duration, self.settings.timer_fade)
+        if self.settings.timer_enabled:
+            # Le décompte n'est relancé que si sa durée ou son fondu a changé
+            if not self.timer_refresh.isActive() or timer != self._timer_settings:
+                minutes, fade = timer
+                self.audio_mixer.start_sleep_timer(minutes * 60, fade * 60)
+                self._timer_settings = timer
+                self.timer_refresh.start()
+                self.update_timer_label()
+                self.statusBar().showMessage(f"Arrêt automatique dans {minutes} min", 3000)
+        elif self.timer_refresh.isActive():
+            self.audio_mixer.cancel_sleep_timer()
+            self.timer_refresh.stop()
+            self.timer_label.hide()
+            
+    def update_timer_label(self):
+        """Affiche le temps de lecture restant avant l'arrêt."""
+        remaining = self.audio_mixer.sleep_timer_remaining()
+        if remaining is None:
+            self.timer_refresh.stop()
+            self.timer_label.hide()
+            return
+        minutes, seconds = divmod(int(remaining), 60)
+        self.timer_label.setText(f"⏾ {minutes:02d}:{seconds:02d}")
+        self.timer_label.show()
+        
+    def apply_metrics_settings(self):
+        """Affiche ou masque les mesures audio de la barre d'état."""
+        if self.settings.show_audio_metrics:
+            self.update_metrics_label()
+            self.metrics_label.show()
+        else:
+            self.metrics_refresh.stop()
+            self.metrics_label.hide()
+            
+    def update_metrics_label(self):
+        """Affiche la charge du thread audio, ses blocs et ses coupures."""
+        metrics = self.audio_mixer.get_audio_metrics()
+        if metrics is None:
+            # Le moteur pygame ne donne aucune mesure : rien à rafraîchir
+            self.metrics_refresh.stop()
+            self.metrics_label.setText("Mesures audio indisponibles (moteur pygame)")
+            self.metrics_label.setToolTip("")
+            return
+        self.metrics_refresh.start()
+        if not metrics['blocks']:
+            self.metrics_label.setText("Audio : aucun bloc rendu")
+            self.metrics_label.setToolTip("")
+            return
+        
+        render = metrics['render_ms']
+        text = (f"Audio {metrics['load'] * 100:.0f} % · "
+                f"p99 {render['p99']:.1f}/{metrics['block_ms']:.1f} ms · "
+                f"{metrics['underruns']} coupure(s)")
+        if metrics['buffered_ms'] is not None:
+            text += f" · tampon {metrics['buffered_ms']:.0f} ms"
+        self.metrics_label.setText(text)
+        
+        lines = [
+            f"{metrics['blocks']} blocs de {metrics['block_ms']:.1f} ms",
+            f"Rendu : moyenne {render['mean']:.2f} ms, p95 {render['p95']:.2f} ms, "
+            f"max {render['max']:.2f} ms",
+            f"Dépassements : {metrics['deadline_misses']} "
+            f"({metrics['total_deadline_misses']} depuis le lancement)",
+            f"Coupures : {metrics['underruns']} ({metrics['total_underruns']} depuis le lancement)",
+        ]
+        if metrics['min_buffered_ms'] is not None:
+            lines.append(f"Tampon minimal : {metrics['min_buffered_ms']:.0f} ms")
+        lines.append("Durée de rendu / durée du bloc :")
+        bounds = (0.0,) + HISTOGRAM_EDGES
+        for i, count in enumerate(metrics['histogram']):
+            if i < len(HISTOGRAM_EDGES):
+                label = f"{bounds[i] * 100:.0f}–{bounds[i + 1] * 100:.0f} %"
+            else:
+                label = f"> {bounds[i] * 100:.0f} %"
+            lines.append(f"  {label} : {count}")
+        layers = sorted(metrics['layers'].items(), key=lambda item: -item[1]['share'])
+        if layers:
+            lines.append("Part du rendu par son :")
+        for sound_id, layer in layers[:METRICS_TOP_LAYERS]:
+            name = SOUNDS_DATA.get(sound_id, {}).get('name', sound_id)
+            lines.append(f"  {name} : {layer['share'] * 100:.0f} % ({layer['ms']:.2f} ms)")
+        self.metrics_label.setToolTip("\n".join(lines))
+        
+    def on_sleep_timer_expired(self):
+        """Affiche l'arrêt de la lecture par le minuteur."""
+        for card in self.sound_grid.cards.values():
+            if card.is_playing() or card.loading:
+                card.show_state(False)
+        self.timer_refresh.stop()
+        self.timer_label.hide()
+        self.statusBar().showMessage("Minuteur écoulé : lecture arrêtée")
         
     def show_about(self):
         """Affiche la boîte de dialogue À propos."""
@@ -297,14 +561,24 @@ class MainWindow(QMainWindow):
         """Charge l'état sauvegardé."""
         # Charger le volume principal
         volume = self.settings.master_volume
+        sound_states = self.settings.sound_states
+        service_state = self.audio_mixer.get_state() if self.attached else None
+        if service_state is not None:
+            # Le service joue peut-être déjà : son état prime sur celui enregistré
+            volume = service_state['master']
+            sound_states = service_state['sounds']
         self.master_slider.setValue(int(volume * 100))
         
         # Charger l'état des sons
-        sound_states = self.settings.sound_states
         for sound_id, state in sound_states.items():
-            if sound_id in self.sound_cards:
-                card = self.sound_cards[sound_id]
+            if sound_id in self.sound_grid.sounds_data:
+                if state.get('effects') and not self.attached:
+                    try:
+                        self.audio_mixer.set_effects(sound_id, state['effects'])
+                    except ValueError as e:
+                        print(f"Erreur: Effets invalides pour {sound_id}: {e}")
                 if state.get('playing', False):
+                    card = self.sound_grid.card(sound_id)
                     card.set_volume(state.get('volume', 0.5))
                     card.toggle_sound()
                     
@@ -315,13 +589,16 @@ class MainWindow(QMainWindow):
         
         # Sauvegarder l'état des sons
         sound_states = {}
-        for sound_id, card in self.sound_cards.items():
+        for sound_id in self.sound_grid.sound_ids():
             sound_states[sound_id] = {
-                'playing': card.is_playing(),
-                'volume': card.get_volume()
+                'playing': self.sound_grid.is_playing(sound_id),
+                'volume': self.sound_grid.get_volume(sound_id)
             }
+            effects = self.audio_mixer.get_effects(sound_id)
+            if effects:
+                sound_states[sound_id]['effects'] = effects
         self.settings.sound_states = sound_states
-        self.settings.save()
+        self.settings.flush()
         
     def closeEvent(self, event):
         """Gère la fermeture de la fenêtre."""
@@ -3,11 +3,16 @@
 Dialogue de gestion des presets.
 """
 
+from itertools import islice
+
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, 
-    QLineEdit, QPushButton, QListWidget
+    QLineEdit, QPushButton, QListView
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex
+
+from src.core.preset_index import PAGE_SIZE
+from src.core.sounds import SOUNDS_DATA
 
 
 class PresetDialog(QDialog):
@@ -36,6 +41,12 @@ class PresetDialog(QDialog):
         self.name_input.textChanged.connect(self.on_text_changed)
         layout.addWidget(self.name_input)
         
+        # Tags
+        layout.addWidget(QLabel("Tags (séparés par des virgules):"))
+        self.tags_input = QLineEdit()
+        self.tags_input.setPlaceholderText("sommeil, pluie...")
+        layout.addWidget(self.tags_input)
+        
         # Boutons
         button_layout = QHBoxLayout()
         
@@ -59,6 +70,84 @@ class PresetDialog(QDialog):
     def get_preset_name(self):
         """Retourne le nom du preset."""
         return self.name_input.text().strip()
+        
+    def get_tags(self):
+        """Retourne les tags saisis."""
+        return [tag.strip() for tag in self.tags_input.text().split(',') if tag.strip()]
+
+
+class PresetListModel(QAbstractListModel):
+    """Résultats d'une recherche de presets, chargés page par page au défilement."""
+    
+    def __init__(self, presets, parent=None):
+        """
+        Args:
+            presets: Stockage des presets (PresetStore)
+            parent: Objet parent Qt
+        """
+        super().__init__(parent)
+        self.presets = presets
+        self._names = []
+        self._results = iter(())
+        self._exhausted = True
+        
+    def set_query(self, query):
+        """Remplace les résultats par ceux d'une nouvelle recherche."""
+        self.beginResetModel()
+        self._names = []
+        self._results = self.presets.iter_search(query)
+        self._exhausted = False
+        self.endResetModel()
+        # Première page tout de suite : la vue ne la demande qu'une fois affichée
+        self.fetchMore(QModelIndex())
+        
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._names)
+        
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._names):
+            return None
+        name = self._names[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return name
+        if role == Qt.ItemDataRole.ToolTipRole:
+            # Lu à la demande, au survol seulement
+            try:
+                sounds = self.presets[name]
+                tags = self.presets.tags(name)
+            except KeyError:
+                return None
+            lines = [", ".join(SOUNDS_DATA.get(sound_id, {}).get('name', sound_id)
+                               for sound_id in sounds)]
+            if tags:
+                lines.append(" ".join(f"#{tag}" for tag in tags))
+            return "\n".join(lines)
+        return None
+        
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+        
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        batch = list(islice(self._results, PAGE_SIZE))
+        if len(batch) < PAGE_SIZE:
+            self._exhausted = True
+        if batch:
+            first = len(self._names)
+            self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+            self._names.extend(batch)
+            self.endInsertRows()
+            
+    def name(self, row):
+        """Retourne le nom du preset d'une ligne."""
+        return self._names[row]
+        
+    def remove_row(self, row):
+        """Retire une ligne (preset supprimé)."""
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._names[row]
+        self.endRemoveRows()
 
 
 class PresetLoadDialog(QDialog):
@@ -82,11 +171,21 @@ class PresetLoadDialog(QDialog):
         label = QLabel("Sélectionnez un preset:")
         layout.addWidget(label)
         
-        # Liste des presets
-        self.preset_list = QListWidget()
-        self.preset_list.addItems(self.presets.keys())
-        self.preset_list.itemDoubleClicked.connect(self.on_preset_selected)
+        # Recherche
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Rechercher (nom, son, #tag)...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.textChanged.connect(self.on_search_changed)
+        layout.addWidget(self.search_input)
+        
+        # Liste des presets, remplie à la demande
+        self.model = PresetListModel(self.presets, self)
+        self.preset_list = QListView()
+        self.preset_list.setUniformItemSizes(True)
+        self.preset_list.setModel(self.model)
+        self.preset_list.doubleClicked.connect(self.on_preset_selected)
         layout.addWidget(self.preset_list)
+        self.on_search_changed("")
         
         # Boutons
         button_layout = QHBoxLayout()
@@ -107,29 +206,35 @@ class PresetLoadDialog(QDialog):
         
         self.setLayout(layout)
         
+    def on_search_changed(self, text):
+        """Relance la recherche et sélectionne le premier résultat."""
+        self.model.set_query(text)
+        if self.model.rowCount():
+            self.preset_list.setCurrentIndex(self.model.index(0))
+            
     def on_preset_selected(self):
         """Charge le preset sélectionné."""
-        current_item = self.preset_list.currentItem()
-        if current_item:
-            self.selected_preset = current_item.text()
+        current = self.preset_list.currentIndex()
+        if current.isValid():
+            self.selected_preset = self.model.name(current.row())
             self.accept()
             
     def delete_preset(self):
         """Supprime le preset sélectionné."""
-        current_item = self.preset_list.currentItem()
-        if current_item:
+        current = self.preset_list.currentIndex()
+        if current.isValid():
             from PyQt6.QtWidgets import QMessageBox
+            preset_name = self.model.name(current.row())
             reply = QMessageBox.question(
                 self,
                 "Confirmer la suppression",
-                f"Voulez-vous vraiment supprimer le preset '{current_item.text()}' ?",
+                f"Voulez-vous vraiment supprimer le preset '{preset_name}' ?",
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
             )
             
             if reply == QMessageBox.StandardButton.Yes:
-                preset_name = current_item.text()
                 del self.presets[preset_name]
-                self.preset_list.takeItem(self.preset_list.row(current_item))
+                self.model.remove_row(current.row())
                 
     def get_selected_preset(self):
         """Retourne le preset sélectionné."""
@@ -10,6 +10,8 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 
+from src.audio.mixer import ENGINES
+
 
 class SettingsDialog(QDialog):
     """Dialogue de configuration de l'application."""
@@ -38,6 +40,10 @@ class SettingsDialog(QDialog):
         self.minimize_tray_check = QCheckBox("Réduire dans la barre des tâches")
         ui_layout.addRow("Fermeture:", self.minimize_tray_check)
         
+        self.metrics_check = QCheckBox("Afficher les mesures audio dans la barre d'état")
+        self.metrics_check.setToolTip("Charge du thread audio, durée des blocs et coupures")
+        ui_layout.addRow("Diagnostic:", self.metrics_check)
+        
         ui_group.setLayout(ui_layout)
         layout.addWidget(ui_group)
         
@@ -57,6 +63,62 @@ class SettingsDialog(QDialog):
         self.fade_duration.setSuffix(" ms")
         audio_layout.addRow("Durée du fondu:", self.fade_duration)
         
+        self.engine_combo = QComboBox()
+        for engine, label in ENGINES.items():
+            self.engine_combo.addItem(label, engine)
+        self.engine_combo.setToolTip("Pris en compte au prochain démarrage")
+        audio_layout.addRow("Moteur audio:", self.engine_combo)
+        
+        self.native_rate_check = QCheckBox("Fréquence native du périphérique")
+        self.native_rate_check.setToolTip(
+            "Les sons sont rééchantillonnés une fois, en haute qualité ; "
+            "pris en compte au prochain démarrage"
+        )
+        audio_layout.addRow(self.native_rate_check)
+        
+        self.idle_timeout = QSpinBox()
+        self.idle_timeout.setRange(0, 3600)
+        self.idle_timeout.setSingleStep(30)
+        self.idle_timeout.setSuffix(" s")
+        self.idle_timeout.setSpecialValueText("Jamais")
+        self.idle_timeout.setToolTip("Ferme le périphérique audio quand rien n'est joué")
+        audio_layout.addRow("Libérer la sortie après:", self.idle_timeout)
+        
+        self.memory_budget = QSpinBox()
+        self.memory_budget.setRange(0, 4096)
+        self.memory_budget.setSingleStep(64)
+        self.memory_budget.setSuffix(" Mo")
+        self.memory_budget.setToolTip("Sons arrêtés gardés décodés en mémoire")
+        audio_layout.addRow("Mémoire des sons:", self.memory_budget)
+        
+        self.normalize_check = QCheckBox("Égaliser le volume des sons")
+        self.normalize_check.setToolTip("Un même volume donne le même niveau sur chaque son")
+        audio_layout.addRow(self.normalize_check)
+        
+        self.adaptive_buffer_check = QCheckBox("Adapter la latence aux coupures")
+        self.adaptive_buffer_check.setToolTip(
+            "Agrandit les blocs audio en cas de coupure, les réduit quand la sortie est stable "
+            "(moteur NumPy)"
+        )
+        audio_layout.addRow(self.adaptive_buffer_check)
+        
+        self.min_latency = QSpinBox()
+        self.min_latency.setRange(1, 500)
+        self.min_latency.setSuffix(" ms")
+        audio_layout.addRow("Latence minimale:", self.min_latency)
+        
+        self.max_latency = QSpinBox()
+        self.max_latency.setRange(1, 500)
+        self.max_latency.setSuffix(" ms")
+        audio_layout.addRow("Latence maximale:", self.max_latency)
+        # Bornes toujours ordonnées
+        self.min_latency.valueChanged.connect(
+            lambda value: self.max_latency.setValue(max(value, self.max_latency.value()))
+        )
+        self.max_latency.valueChanged.connect(
+            lambda value: self.min_latency.setValue(min(value, self.min_latency.value()))
+        )
+        
         audio_group.setLayout(audio_layout)
         layout.addWidget(audio_group)
         
@@ -72,6 +134,12 @@ class SettingsDialog(QDialog):
         self.timer_duration.setSuffix(" minutes")
         timer_layout.addRow("Durée:", self.timer_duration)
         
+        self.timer_fade = QSpinBox()
+        self.timer_fade.setRange(0, 30)
+        self.timer_fade.setSuffix(" minutes")
+        self.timer_fade.setToolTip("Baisse progressive du volume avant l'arrêt")
+        timer_layout.addRow("Fondu final:", self.timer_fade)
+        
         timer_group.setLayout(timer_layout)
         layout.addWidget(timer_group)
         
@@ -97,22 +165,43 @@ class SettingsDialog(QDialog):
         if self.settings:
             self.dark_mode_check.setChecked(self.settings.dark_mode)
             self.minimize_tray_check.setChecked(self.settings.minimize_to_tray)
+            self.metrics_check.setChecked(self.settings.show_audio_metrics)
             self.auto_pause_check.setChecked(self.settings.auto_pause)
             self.fade_check.setChecked(self.settings.fade_enabled)
             self.fade_duration.setValue(self.settings.fade_duration)
+            index = self.engine_combo.findData(self.settings.audio_engine)
+            self.engine_combo.setCurrentIndex(max(index, 0))
+            self.native_rate_check.setChecked(self.settings.native_rate)
+            self.idle_timeout.setValue(self.settings.idle_timeout)
+            self.memory_budget.setValue(self.settings.memory_budget)
+            self.normalize_check.setChecked(self.settings.normalize_loudness)
+            self.adaptive_buffer_check.setChecked(self.settings.adaptive_buffer)
+            self.min_latency.setValue(self.settings.min_latency)
+            self.max_latency.setValue(self.settings.max_latency)
             self.timer_enabled_check.setChecked(self.settings.timer_enabled)
             self.timer_duration.setValue(self.settings.timer_duration)
+            self.timer_fade.setValue(self.settings.timer_fade)
             
     def save_and_close(self):
         """Sauvegarde les paramètres et ferme le dialogue."""
         if self.settings:
             self.settings.dark_mode = self.dark_mode_check.isChecked()
             self.settings.minimize_to_tray = self.minimize_tray_check.isChecked()
+            self.settings.show_audio_metrics = self.metrics_check.isChecked()
             self.settings.auto_pause = self.auto_pause_check.isChecked()
             self.settings.fade_enabled = self.fade_check.isChecked()
             self.settings.fade_duration = self.fade_duration.value()
+            self.settings.audio_engine = self.engine_combo.currentData()
+            self.settings.native_rate = self.native_rate_check.isChecked()
+            self.settings.idle_timeout = self.idle_timeout.value()
+            self.settings.memory_budget = self.memory_budget.value()
+            self.settings.normalize_loudness = self.normalize_check.isChecked()
+            self.settings.adaptive_buffer = self.adaptive_buffer_check.isChecked()
+            self.settings.min_latency = self.min_latency.value()
+            self.settings.max_latency = self.max_latency.value()
             self.settings.timer_enabled = self.timer_enabled_check.isChecked()
             self.settings.timer_duration = self.timer_duration.value()
+            self.settings.timer_fade = self.timer_fade.value()
             self.settings.save()
         
         self.accept()
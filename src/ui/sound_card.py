@@ -6,19 +6,25 @@ Carte de son individuelle avec contrôles.
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QSlider, QPushButton, QFrame
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont
 
 
 class SoundCard(QFrame):
     """Widget représentant un son individuel."""
     
+    # Émis depuis le thread de chargement, reçu dans le thread de l'interface
+    sound_loaded = pyqtSignal(bool)
+    
     def __init__(self, sound_id, sound_data, audio_mixer):
         super().__init__()
         self.sound_id = sound_id
         self.sound_data = sound_data
         self.audio_mixer = audio_mixer
         self.playing = False
+        self.loading = False
+        
+        self.sound_loaded.connect(self.on_sound_loaded)
         
         self.init_ui()
         self.setFrameStyle(QFrame.Shape.StyledPanel | QFrame.Shadow.Raised)
@@ -65,6 +71,11 @@ class SoundCard(QFrame):
         self.play_button.clicked.connect(self.toggle_sound)
         layout.addWidget(self.play_button)
         
+        # Bouton des effets
+        effects_button = QPushButton("🎛 Effets")
+        effects_button.clicked.connect(self.show_effects)
+        layout.addWidget(effects_button)
+        
         self.setLayout(layout)
         self.setMinimumWidth(200)
         self.setMaximumWidth(280)
@@ -73,39 +84,114 @@ class SoundCard(QFrame):
         """Active/désactive le son."""
         if self.playing:
             self.stop_sound()
+        elif self.loading:
+            self.cancel_loading()
         else:
             self.start_sound()
             
     def start_sound(self):
-        """Démarre la lecture du son."""
-        success = self.audio_mixer.play_sound(
+        """Lance le chargement du son en arrière-plan ; la lecture suit."""
+        self.loading = True
+        self.play_button.setText("⏳ Chargement...")
+        self.play_button.setChecked(True)
+        
+        if 'generator' in self.sound_data:
+            # Bruit synthétisé : rien à charger
+            self.on_sound_loaded(True)
+            return
+        
+        future = self.audio_mixer.load_async(
             self.sound_id,
             self.sound_data['file'],
-            self.volume_slider.value() / 100.0
+            self.sound_data.get('playback', 'auto')
+        )
+        future.add_done_callback(
+            lambda done: self.sound_loaded.emit(not done.cancelled() and done.result())
         )
         
+    def cancel_loading(self):
+        """Abandonne la lecture demandée ; le chargement se termine en arrière-plan."""
+        self.loading = False
+        self.play_button.setText("▶ Lecture")
+        self.play_button.setChecked(False)
+        
+    def on_sound_loaded(self, loaded):
+        """Démarre la lecture une fois le son chargé."""
+        if not self.loading:
+            return
+        self.loading = False
+        if not loaded:
+            self.cancel_loading()
+            return
+        
+        volume = self.volume_slider.value() / 100.0
+        if 'generator' in self.sound_data:
+            success = self.audio_mixer.play_generator(
+                self.sound_id,
+                self.sound_data['generator'],
+                volume,
+                self.sound_data.get('category')
+            )
+        else:
+            success = self.audio_mixer.play_sound(
+                self.sound_id,
+                self.sound_data['file'],
+                volume,
+                self.sound_data.get('playback', 'auto'),
+                self.sound_data.get('category')
+            )
+        
         if success:
-            self.playing = True
-            self.play_button.setText("⏸ Pause")
-            self.play_button.setChecked(True)
-            self.volume_slider.setEnabled(True)
-            self.setStyleSheet("QFrame { background-color: #e3f2fd; border: 2px solid #2196f3; }")
+            self._show_playing(True)
+        else:
+            self.cancel_loading()
         
     def stop_sound(self):
         """Arrête la lecture du son."""
         self.audio_mixer.stop_sound(self.sound_id)
-        self.playing = False
-        self.play_button.setText("▶ Lecture")
-        self.play_button.setChecked(False)
-        self.volume_slider.setEnabled(False)
-        self.setStyleSheet("")
+        self._show_playing(False)
+        
+    def show_state(self, playing, volume=None):
+        """
+        Affiche l'état d'un son piloté par le mixeur (transition de preset),
+        sans rien lui demander.
+        
+        Args:
+            playing: Le son est en lecture
+            volume: Volume (0-1), inchangé si None
+        """
+        self.loading = False
+        if volume is not None:
+            self.volume_slider.blockSignals(True)
+            self.volume_slider.setValue(int(volume * 100))
+            self.volume_slider.blockSignals(False)
+            self.volume_label.setText(f"{self.volume_slider.value()}%")
+        self._show_playing(playing)
+        
+    def _show_playing(self, playing):
+        """Met à jour le bouton, le curseur et le style selon l'état de lecture."""
+        self.playing = playing
+        self.play_button.setChecked(playing)
+        self.volume_slider.setEnabled(playing)
+        if playing:
+            self.play_button.setText("⏸ Pause")
+            self.setStyleSheet("QFrame { background-color: #e3f2fd; border: 2px solid #2196f3; }")
+        else:
+            self.play_button.setText("▶ Lecture")
+            self.setStyleSheet("")
         
     def on_volume_changed(self, value):
         """Gère le changement de volume."""
         self.volume_label.setText(f"{value}%")
         if self.playing:
-            self.audio_mixer.set_volume(self.sound_id, value / 100.0)
+            self.audio_mixer.request_volume(self.sound_id, value / 100.0)
             
+    def show_effects(self):
+        """Affiche le dialogue des effets du son."""
+        from src.ui.effects_dialog import EffectsDialog
+        dialog = EffectsDialog(self.sound_id, self.sound_data['name'], self.audio_mixer, self)
+        dialog.exec()
+        
     def reset_volume(self):
         """Réinitialise le volume à 50%."""
         self.volume_slider.setValue(50)
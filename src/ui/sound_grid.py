@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+Grille de sons virtualisée.
+
+Seules les cartes des lignes visibles (plus une marge) sont construites : le
+temps de création de la fenêtre et la mémoire occupée par les widgets restent
+proportionnels à ce qui est affiché, quelle que soit la taille du catalogue.
+"""
+
+from typing import Dict, List
+
+from PyQt6.QtWidgets import QWidget, QScrollArea
+
+from src.ui.sound_card import SoundCard
+
+
+class SoundGrid(QWidget):
+    """Grille de cartes de sons construites à la demande."""
+
+    SPACING = 15
+    # Lignes construites au-delà de la zone visible, en haut et en bas
+    OVERSCAN_ROWS = 1
+
+    def __init__(self, sounds_data, audio_mixer, scroll_area: QScrollArea, columns=3):
+        """
+        Args:
+            sounds_data: Sons à afficher, au format de SOUNDS_DATA
+            audio_mixer: Mixeur transmis aux cartes
+            scroll_area: Zone de défilement contenant la grille
+            columns: Nombre de cartes par ligne
+        """
+        super().__init__()
+        self.sounds_data = dict(sounds_data)
+        self.audio_mixer = audio_mixer
+        self.scroll_area = scroll_area
+        self.columns = columns
+
+        self.cards: Dict[str, SoundCard] = {}
+        self._sound_ids: List[str] = list(self.sounds_data)
+        self._positions: Dict[str, int] = {sound_id: i for i, sound_id in enumerate(self._sound_ids)}
+        self._volumes: Dict[str, float] = {}
+        self._row_height = 0
+
+        scroll_area.verticalScrollBar().valueChanged.connect(self.update_visible)
+
+    def sound_ids(self) -> List[str]:
+        """Retourne les identifiants des sons, dans l'ordre d'affichage."""
+        return list(self._sound_ids)
+
+    def add_sound(self, sound_id, sound_data):
+        """Ajoute un son à la fin de la grille."""
+        if sound_id not in self.sounds_data:
+            self._positions[sound_id] = len(self._sound_ids)
+            self._sound_ids.append(sound_id)
+        self.sounds_data[sound_id] = sound_data
+        self.update_visible()
+
+    def remove_sound(self, sound_id):
+        """Retire un son de la grille ; les suivants remontent d'une cellule."""
+        if sound_id not in self.sounds_data:
+            return
+        del self.sounds_data[sound_id]
+        self._volumes.pop(sound_id, None)
+        self._sound_ids.remove(sound_id)
+        self._positions = {other: i for i, other in enumerate(self._sound_ids)}
+        card = self.cards.pop(sound_id, None)
+        if card is not None:
+            card.deleteLater()
+        for other, other_card in self.cards.items():
+            self._place(other, other_card)
+        self.update_visible()
+
+    def card(self, sound_id) -> SoundCard:
+        """Retourne la carte d'un son, en la construisant au besoin."""
+        card = self.cards.get(sound_id)
+        if card is None:
+            card = SoundCard(sound_id, self.sounds_data[sound_id], self.audio_mixer)
+            card.setParent(self)
+            if sound_id in self._volumes:
+                card.set_volume(self._volumes.pop(sound_id))
+            self.cards[sound_id] = card
+            self._place(sound_id, card)
+            card.show()
+        return card
+
+    def is_playing(self, sound_id) -> bool:
+        """Indique si un son est en lecture (un son sans carte ne l'est jamais)."""
+        card = self.cards.get(sound_id)
+        return card is not None and card.is_playing()
+
+    def get_volume(self, sound_id) -> float:
+        """Retourne le volume d'un son (0-1)."""
+        card = self.cards.get(sound_id)
+        if card is not None:
+            return card.get_volume()
+        return self._volumes.get(sound_id, 0.5)
+
+    def set_volume(self, sound_id, volume):
+        """Définit le volume d'un son (0-1)."""
+        card = self.cards.get(sound_id)
+        if card is not None:
+            card.set_volume(volume)
+        else:
+            self._volumes[sound_id] = volume
+
+    def reset_volumes(self):
+        """Réinitialise le volume de tous les sons."""
+        self._volumes.clear()
+        for card in self.cards.values():
+            card.reset_volume()
+
+    def update_visible(self):
+        """Construit les cartes des lignes visibles et libère les autres."""
+        row_height = self._measure_row_height()
+        if row_height == 0:
+            return
+
+        rows = (len(self._sound_ids) + self.columns - 1) // self.columns
+        self.setMinimumHeight(rows * row_height + self.SPACING)
+
+        top = self.scroll_area.verticalScrollBar().value()
+        bottom = top + self.scroll_area.viewport().height()
+        first_row = max(0, top // row_height - self.OVERSCAN_ROWS)
+        last_row = min(rows - 1, bottom // row_height + self.OVERSCAN_ROWS)
+
+        visible = self._sound_ids[first_row * self.columns:(last_row + 1) * self.columns]
+        for sound_id in visible:
+            self._place(sound_id, self.card(sound_id))
+
+        # Les cartes hors de vue sont détruites, sauf si leur son est actif
+        visible_ids = set(visible)
+        for sound_id, card in list(self.cards.items()):
+            if sound_id not in visible_ids and not (card.is_playing() or card.loading):
+                self._volumes[sound_id] = card.get_volume()
+                del self.cards[sound_id]
+                card.deleteLater()
+
+    def resizeEvent(self, event):
+        """Replace les cartes lorsque la largeur change."""
+        super().resizeEvent(event)
+        for sound_id, card in self.cards.items():
+            self._place(sound_id, card)
+        self.update_visible()
+
+    def showEvent(self, event):
+        """Construit les premières cartes à l'affichage."""
+        super().showEvent(event)
+        self.update_visible()
+
+    def _measure_row_height(self) -> int:
+        """Hauteur d'une ligne, mesurée sur la première carte construite."""
+        if self._row_height == 0 and self._sound_ids:
+            card = self.card(self._sound_ids[0])
+            self._row_height = card.sizeHint().height() + self.SPACING
+        return self._row_height
+
+    def _place(self, sound_id, card):
+        """Positionne une carte dans sa cellule."""
+        if self._row_height == 0:
+            return
+        row, col = divmod(self._positions[sound_id], self.columns)
+        cell_width = max(1, (self.width() - self.SPACING) // self.columns)
+        width = max(card.minimumWidth(), min(card.maximumWidth(), cell_width - self.SPACING))
+        x = self.SPACING + col * cell_width + (cell_width - self.SPACING - width) // 2
+        y = self.SPACING + row * self._row_height
+        card.setGeometry(x, y, width, self._row_height - self.SPACING)